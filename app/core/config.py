@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, Optional
 
 
 class Settings(BaseSettings):
@@ -8,15 +8,117 @@ class Settings(BaseSettings):
     # MongoDB
     MONGODB_URL: str = "mongodb://localhost:27017"
     MASTER_DB_NAME: str = "master_db"
+    MONGODB_MAX_POOL_SIZE: int = 100
+    # Serve right away and connect / build indexes in the background
+    # (/readyz is 503 until done); False blocks startup on both instead
+    MONGODB_LAZY_CONNECT: bool = True
+    MONGODB_READY_RETRY_SECONDS: float = 2.0
+    # Extra clusters for tenant data, as a JSON object {"name": "mongodb://..."};
+    # new tenants are spread across them by consistent hashing
+    MONGODB_CLUSTERS: Dict[str, str] = {}
+    # Tenant data layout: "database" (org_<name> per tenant), "collection"
+    # (tenant_<name>.<collection> in TENANT_DB_NAME) or "shared" (shared
+    # collections in TENANT_DB_NAME keyed by tenant_id)
+    TENANCY_STRATEGY: str = "database"
+    TENANT_DB_NAME: str = "tenants"
+    # Write new organizations in a transaction when connected to a replica set
+    USE_TRANSACTIONS: bool = True
+    
+    # Tenant data migration ("stream", "merge" or "out")
+    MIGRATION_MODE: str = "stream"
+    MIGRATION_BATCH_SIZE: int = 1000
+    # Measure each copy's peak Python allocations with tracemalloc (slow)
+    MIGRATION_TRACE_MEMORY: bool = False
+    
+    # Bulk organization provisioning
+    BULK_CREATE_MAX_ITEMS: int = 10000
+    BULK_PROVISION_CONCURRENCY: int = 16
+    # Password pool workers all bulk creates together may keep busy
+    # (0 = half of them), so logins and single creates keep capacity
+    BULK_HASH_CONCURRENCY: int = 0
+    
+    # Background jobs
+    JOB_WORKERS: int = 2
+    JOB_LEASE_SECONDS: int = 300
+    JOB_POLL_INTERVAL_SECONDS: float = 1.0
+    
+    # Tenant teardown after organization deletes
+    REAPER_CONCURRENCY: int = 2
+    REAPER_POLL_INTERVAL_SECONDS: float = 5.0
+    REAPER_MAX_BACKOFF_SECONDS: float = 600.0
+    
+    # Organization listing (/org/list)
+    ORG_LIST_DEFAULT_LIMIT: int = 50
+    ORG_LIST_MAX_LIMIT: int = 1000
+    
+    # Organization metadata cache
+    ORG_CACHE_SIZE: int = 10000
+    ORG_CACHE_TTL_SECONDS: float = 60.0
+    # Cache-Control of /org/get responses and 304s (empty = no header);
+    # "no-cache" lets clients keep the body but revalidate it with the ETag
+    ORG_GET_CACHE_CONTROL: str = "private, no-cache"
     
     # JWT
     SECRET_KEY: str = "your-secret-key-change-in-production"
+    # "HS256" signs with SECRET_KEY; "RS256" signs with the rotating RSA
+    # keys in JWT_KEYS_DIR, published at /.well-known/jwks.json
     ALGORITHM: str = "HS256"
+    JWT_KEYS_DIR: str = "keys"
+    JWT_KEY_SIZE: int = 2048
+    # Create the next key when the active one is this old (0 = manual rotation)
+    JWT_KEY_ROTATION_DAYS: float = 30
+    # A new key is published this long before it signs; keep it above JWKS_MAX_AGE_SECONDS
+    JWT_KEY_ACTIVATION_DELAY_SECONDS: int = 600
+    JWT_KEYS_RELOAD_SECONDS: float = 60.0
+    JWKS_MAX_AGE_SECONDS: int = 300
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Opaque rotating refresh tokens (/admin/refresh)
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 14
+    TOKEN_CACHE_SIZE: int = 10000
+    
+    # Password hashing pool ("thread" or "process"; 0 workers = one per core)
+    PASSWORD_POOL_KIND: str = "thread"
+    PASSWORD_POOL_WORKERS: int = 0
+    PASSWORD_POOL_MAX_QUEUE: int = 64
+    PASSWORD_POOL_RETRY_AFTER: int = 1
+    # bcrypt cost factor for new hashes (2^rounds iterations; pick with
+    # `python -m app.core.password --target-ms 250`); stored hashes with
+    # another cost are rehashed on the next successful login
+    BCRYPT_ROUNDS: int = 12
+    
+    # Login throttling: token buckets per client IP and per email (rate in
+    # attempts per second), and lockout after LOGIN_LOCKOUT_THRESHOLD
+    # failures, doubling per further failure. Backend "memory" (per
+    # process) or "mongodb" (shared by all workers)
+    LOGIN_THROTTLE_ENABLED: bool = True
+    LOGIN_THROTTLE_BACKEND: str = "memory"
+    LOGIN_THROTTLE_MAX_KEYS: int = 100000
+    LOGIN_IP_RATE: float = 1.0
+    LOGIN_IP_BURST: int = 20
+    LOGIN_EMAIL_RATE: float = 0.1
+    LOGIN_EMAIL_BURST: int = 5
+    LOGIN_LOCKOUT_THRESHOLD: int = 5
+    LOGIN_LOCKOUT_BASE_SECONDS: float = 1.0
+    LOGIN_LOCKOUT_MAX_SECONDS: float = 900.0
+    LOGIN_FAILURE_WINDOW_SECONDS: float = 900.0
+    
+    # Production launcher (python -m app.server); 0 workers = one per core.
+    # Workers restart after WEB_MAX_REQUESTS requests (0 = never), staggered
+    # by up to WEB_MAX_REQUESTS_JITTER so they don't all restart together
+    WEB_HOST: str = "0.0.0.0"
+    WEB_PORT: int = 8000
+    WEB_WORKERS: int = 0
+    WEB_MAX_REQUESTS: int = 0
+    WEB_MAX_REQUESTS_JITTER: int = 0
+    WEB_GRACEFUL_TIMEOUT: float = 30.0
     
     # App
     APP_NAME: str = "Multi-Tenant Organization Service"
     DEBUG: bool = False
+    # Serialize typed responses straight to JSON bytes with pydantic-core
+    FAST_JSON_RESPONSES: bool = False
+    # Prometheus metrics at /metrics
+    METRICS_ENABLED: bool = True
     
     class Config:
         env_file = ".env"
@@ -0,0 +1,22 @@
+from typing import Optional
+from fastapi import Header, HTTPException, status
+from app.core.security import decode_token_cached
+
+
+async def get_token_payload(authorization: Optional[str] = Header(None)) -> dict:
+    """Validate the Bearer token and return its claims (protected routes)"""
+    if not authorization:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Missing authorization header",
+        )
+    
+    token = authorization[7:] if authorization.startswith("Bearer ") else authorization
+    payload = decode_token_cached(token)
+    if not payload:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token",
+        )
+    
+    return payload
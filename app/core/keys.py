@@ -0,0 +1,328 @@
+import hashlib
+import json
+import os
+import secrets
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from jose import jwk
+from app.core.config import settings
+
+
+# Key ids are "<activation time>-<random>", so the schedule travels with
+# the key file (<kid>.pem) when JWT_KEYS_DIR is copied between hosts
+KID_TIME_FORMAT = "%Y%m%dT%H%M%SZ"
+
+# A stale rotation lock (crashed worker) is ignored after this long
+ROTATION_LOCK_SECONDS = 600
+
+
+def generate_private_key_pem(bits: int) -> bytes:
+    """New RSA private key, PEM encoded (uses cryptography when installed)"""
+    try:
+        from cryptography.hazmat.primitives import serialization
+        from cryptography.hazmat.primitives.asymmetric import rsa as crypto_rsa
+    except ImportError:
+        import rsa
+
+        _, private_key = rsa.newkeys(bits)
+        return private_key.save_pkcs1()
+    private_key = crypto_rsa.generate_private_key(public_exponent=65537, key_size=bits)
+    return private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.TraditionalOpenSSL,
+        serialization.NoEncryption(),
+    )
+
+
+def _activation_time(kid: str) -> Optional[float]:
+    try:
+        stamp = datetime.strptime(kid.split("-", 1)[0], KID_TIME_FORMAT)
+    except ValueError:
+        return None
+    return stamp.replace(tzinfo=timezone.utc).timestamp()
+
+
+class SigningKey:
+    """One RSA key pair of the key ring"""
+
+    __slots__ = ("kid", "activates_at", "private", "public", "jwk")
+
+    def __init__(self, kid: str, activates_at: float, pem: bytes):
+        self.kid = kid
+        self.activates_at = activates_at
+        self.private = jwk.construct(pem, settings.ALGORITHM)
+        self.public = self.private.public_key()
+        self.jwk = {**self.public.to_dict(), "kid": kid, "use": "sig"}
+
+
+class KeyRing:
+    """
+    RSA keys for signing and verifying access tokens (ALGORITHM=RS256)
+
+    Keys are PEM files in `directory`, named after their key id, which
+    starts with the key's activation time. The newest active key signs;
+    every key that may still have live tokens verifies and is published
+    in the JWKS:
+
+      - rotation creates the next key `activation_delay` seconds ahead,
+        so verifiers that cache the JWKS see it before it signs anything
+      - a key is retired (unpublished, file removed) once its successor
+        has been signing for longer than an access token lives plus the
+        JWKS cache lifetime
+
+    With `rotation_days` > 0 a background thread rotates the key when
+    the active one reaches that age, and reloads the directory every
+    `reload_interval` seconds to pick up keys written by other workers.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        key_size: int,
+        rotation_days: float,
+        activation_delay: float,
+        reload_interval: float,
+    ):
+        self.directory = directory
+        self.key_size = key_size
+        self.rotation_days = rotation_days
+        self.activation_delay = activation_delay
+        self.reload_interval = reload_interval
+        # Sorted by activation time; replaced as a whole on reload
+        self._keys: Tuple[SigningKey, ...] = ()
+        self._by_kid: Dict[str, SigningKey] = {}
+        self._jwks: Tuple[bytes, str] = (b'{"keys": []}', "")
+        self._lock = threading.Lock()
+        self._last_reload = 0.0
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._rotations = 0
+
+    @property
+    def retire_after(self) -> float:
+        """Seconds a replaced key keeps verifying"""
+        return settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60 + settings.JWKS_MAX_AGE_SECONDS
+
+    def load(self):
+        """(Re)read the key files; already parsed keys are reused"""
+        with self._lock:
+            keys = []
+            if os.path.isdir(self.directory):
+                for entry in os.scandir(self.directory):
+                    kid, ext = os.path.splitext(entry.name)
+                    activates_at = _activation_time(kid)
+                    if ext != ".pem" or activates_at is None:
+                        continue
+                    key = self._by_kid.get(kid)
+                    if key is None:
+                        with open(entry.path, "rb") as f:
+                            key = SigningKey(kid, activates_at, f.read())
+                    keys.append(key)
+            keys.sort(key=lambda k: k.activates_at)
+            self._keys = tuple(keys)
+            self._by_kid = {key.kid: key for key in keys}
+            self._last_reload = time.monotonic()
+            self._jwks = self._render_jwks()
+
+    def _render_jwks(self) -> Tuple[bytes, str]:
+        now = time.time()
+        published = [key.jwk for key in self._keys if not self._retired(key, now)]
+        body = json.dumps({"keys": published}, separators=(",", ":")).encode()
+        return body, '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+    def _retired(self, key: SigningKey, now: float) -> bool:
+        """Whether a newer key has been signing for longer than retire_after"""
+        for newer in self._keys:
+            if newer.activates_at > key.activates_at and newer.activates_at <= now - self.retire_after:
+                return True
+        return False
+
+    def signing_key(self) -> SigningKey:
+        """Newest key whose activation time has passed"""
+        now = time.time()
+        for key in reversed(self._keys):
+            if key.activates_at <= now:
+                return key
+        if self._keys:
+            # Only future keys (e.g. restored from a copy): use the oldest
+            return self._keys[0]
+        raise LookupError(f"No signing keys in {self.directory}")
+
+    def verification_key(self, kid: Optional[str]):
+        """Public key for a token's `kid`, re-reading the directory at most once per reload_interval"""
+        key = self._by_kid.get(kid) if kid else None
+        if key is None and kid and time.monotonic() - self._last_reload > self.reload_interval:
+            self.load()
+            key = self._by_kid.get(kid)
+        if key is None or self._retired(key, time.time()):
+            return None
+        return key.public
+
+    def jwks(self) -> Tuple[bytes, str]:
+        """JWKS document of the published keys and its ETag"""
+        return self._jwks
+
+    def rotate(self, activation_delay: Optional[float] = None) -> str:
+        """Write a new key that starts signing after `activation_delay` seconds"""
+        delay = self.activation_delay if activation_delay is None else activation_delay
+        activates = datetime.fromtimestamp(time.time() + delay, timezone.utc)
+        kid = f"{activates.strftime(KID_TIME_FORMAT)}-{secrets.token_hex(4)}"
+        pem = generate_private_key_pem(self.key_size)
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        fd = os.open(os.path.join(self.directory, f"{kid}.pem"), os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(pem)
+        self._rotations += 1
+        self.load()
+        return kid
+
+    def ensure_key(self):
+        """Load the keys, creating an immediately active one if there are none"""
+        self.load()
+        if not self._keys and self._acquire_rotation_lock():
+            try:
+                self.load()
+                if not self._keys:
+                    self.rotate(activation_delay=0)
+            finally:
+                self._release_rotation_lock()
+        if not self._keys:
+            # Another worker holds the lock and is writing the first key
+            for _ in range(50):
+                time.sleep(0.1)
+                self.load()
+                if self._keys:
+                    break
+
+    def rotate_if_due(self) -> Optional[str]:
+        """Rotate when the newest key is older than rotation_days; returns the new kid"""
+        if self.rotation_days <= 0 or not self._keys:
+            return None
+        if time.time() - self._keys[-1].activates_at < self.rotation_days * 86400:
+            return None
+        if not self._acquire_rotation_lock():
+            return None
+        try:
+            self.load()
+            if time.time() - self._keys[-1].activates_at < self.rotation_days * 86400:
+                return None
+            return self.rotate()
+        finally:
+            self._release_rotation_lock()
+
+    def prune(self) -> List[str]:
+        """Remove the files of retired keys"""
+        now = time.time()
+        removed = []
+        for key in self._keys:
+            if self._retired(key, now):
+                try:
+                    os.remove(os.path.join(self.directory, f"{key.kid}.pem"))
+                except FileNotFoundError:
+                    pass
+                removed.append(key.kid)
+        if removed:
+            self.load()
+        return removed
+
+    def _lock_path(self) -> str:
+        return os.path.join(self.directory, ".rotating")
+
+    def _acquire_rotation_lock(self) -> bool:
+        """Cross-process lock so only one worker writes a new key"""
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        try:
+            if time.time() - os.path.getmtime(self._lock_path()) > ROTATION_LOCK_SECONDS:
+                os.remove(self._lock_path())
+        except FileNotFoundError:
+            pass
+        try:
+            os.close(os.open(self._lock_path(), os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600))
+            return True
+        except FileExistsError:
+            return False
+
+    def _release_rotation_lock(self):
+        try:
+            os.remove(self._lock_path())
+        except FileNotFoundError:
+            pass
+
+    def start(self):
+        """Load (or create) the keys and start the reload/rotation thread"""
+        self.ensure_key()
+        if self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="jwt-key-rotation", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the reload/rotation thread"""
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self):
+        while not self._stopping.wait(self.reload_interval):
+            try:
+                self.load()
+                kid = self.rotate_if_due()
+                if kid:
+                    print(f"✓ Created JWT signing key {kid}")
+                self.prune()
+            except Exception as e:
+                print(f"Warning: JWT key rotation error: {e}")
+
+    def stats(self) -> dict:
+        """Key ids by state"""
+        now = time.time()
+        active = self.signing_key().kid if self._keys else None
+        return {
+            "algorithm": settings.ALGORITHM,
+            "active_kid": active,
+            "published": [key.kid for key in self._keys if not self._retired(key, now)],
+            "pending": [key.kid for key in self._keys if key.activates_at > now],
+            "rotations": self._rotations,
+        }
+
+
+signing_keys = KeyRing(
+    directory=settings.JWT_KEYS_DIR,
+    key_size=settings.JWT_KEY_SIZE,
+    rotation_days=settings.JWT_KEY_ROTATION_DAYS,
+    activation_delay=settings.JWT_KEY_ACTIVATION_DELAY_SECONDS,
+    reload_interval=settings.JWT_KEYS_RELOAD_SECONDS,
+)
+
+
+def uses_key_ring() -> bool:
+    """Whether tokens are signed with the RSA key ring instead of SECRET_KEY"""
+    return settings.ALGORITHM.startswith("RS")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Manage the RS256 JWT signing keys in JWT_KEYS_DIR")
+    commands = parser.add_subparsers(dest="command", required=True)
+    rotate = commands.add_parser("rotate", help="create the next signing key")
+    rotate.add_argument(
+        "--activate-in", type=float, default=None,
+        help=f"seconds until it signs (default JWT_KEY_ACTIVATION_DELAY_SECONDS={settings.JWT_KEY_ACTIVATION_DELAY_SECONDS})",
+    )
+    commands.add_parser("list", help="show the keys and their state")
+    commands.add_parser("prune", help="remove retired keys")
+    args = parser.parse_args()
+
+    signing_keys.load()
+    if args.command == "rotate":
+        print(signing_keys.rotate(args.activate_in))
+    elif args.command == "prune":
+        for kid in signing_keys.prune():
+            print(f"removed {kid}")
+    else:
+        print(json.dumps(signing_keys.stats(), indent=2))
@@ -0,0 +1,336 @@
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Sequence, Tuple
+from pymongo import monitoring
+from starlette.routing import Match
+from app.core.config import settings
+
+
+# Seconds; spans a cached read (~1ms) up to a slow bcrypt or migration query
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _NoLock:
+    """Stands in for the lock of metrics only touched from the event loop"""
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc):
+        pass
+
+
+class _Metric:
+    """
+    Labelled metric
+
+    labels(*values) returns the child holding one series; callers on hot
+    paths keep the child instead of looking it up on every update.
+    Metrics created with threadsafe=False skip locking and must only be
+    updated from the event loop thread.
+    """
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), threadsafe: bool = True):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.threadsafe = threadsafe
+        self._lock = threading.Lock()
+        self._children: Dict[Tuple[str, ...], object] = {}
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *labelvalues: str):
+        child = self._children.get(labelvalues)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(labelvalues, self._new_child())
+        return child
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        return lines + self._samples()
+
+
+class _Value:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self, lock: threading.Lock):
+        self.value = 0.0
+        self._lock = lock
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        with self._lock:
+            self.value -= amount
+
+
+class _LoopValue(_Value):
+    __slots__ = ()
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        self.value -= amount
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self) -> _Value:
+        if self.threadsafe:
+            return _Value(self._lock)
+        return _LoopValue(self._lock)
+
+    def inc(self, *labelvalues: str, amount: float = 1.0):
+        self.labels(*labelvalues).inc(amount)
+
+    def _samples(self) -> List[str]:
+        with self._lock if self.threadsafe else _NoLock():
+            values = [(labels, child.value) for labels, child in self._children.items()]
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {value}" for labels, value in values]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labelvalues: str, amount: float = 1.0):
+        self.labels(*labelvalues).dec(amount)
+
+
+class _HistogramValue:
+    __slots__ = ("buckets", "counts", "sum", "_lock")
+
+    def __init__(self, buckets: Tuple[float, ...], lock: threading.Lock):
+        self.buckets = buckets
+        # Per-bucket (not cumulative) counts; the last one is +Inf
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self._lock = lock
+
+    def observe(self, value: float):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+
+class _LoopHistogramValue(_HistogramValue):
+    __slots__ = ()
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets=DEFAULT_BUCKETS,
+        threadsafe: bool = True,
+    ):
+        super().__init__(name, documentation, labelnames, threadsafe)
+        self.buckets = tuple(buckets)
+
+    def _new_child(self) -> _HistogramValue:
+        if self.threadsafe:
+            return _HistogramValue(self.buckets, self._lock)
+        return _LoopHistogramValue(self.buckets, self._lock)
+
+    def observe(self, value: float, *labelvalues: str):
+        self.labels(*labelvalues).observe(value)
+
+    def _samples(self) -> List[str]:
+        with self._lock if self.threadsafe else _NoLock():
+            values = [(labels, list(child.counts), child.sum) for labels, child in self._children.items()]
+        lines = []
+        for labels, counts, total in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound!r}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """The service's own metrics, rendered in the Prometheus text format"""
+
+    # Starlette appends "; charset=utf-8"
+    CONTENT_TYPE = "text/plain; version=0.0.4"
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+http_request_duration = registry.register(Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ("method", "route", "status"),
+    # Updated by MetricsMiddleware on the event loop only
+    threadsafe=False,
+))
+http_requests_in_flight = registry.register(Gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being handled",
+    ("method", "route"),
+    threadsafe=False,
+))
+mongodb_command_duration = registry.register(Histogram(
+    "mongodb_command_duration_seconds",
+    "MongoDB command round trip time",
+    ("database", "command"),
+))
+mongodb_command_failures = registry.register(Counter(
+    "mongodb_command_failures_total",
+    "MongoDB commands that returned an error",
+    ("database", "command"),
+))
+password_hash_duration = registry.register(Histogram(
+    "password_hash_duration_seconds",
+    "bcrypt run time on the password pool",
+    ("operation",),
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+))
+login_throttled = registry.register(Counter(
+    "login_throttled_total",
+    "Login attempts refused before bcrypt, by reason (ip, email or lockout)",
+    ("reason",),
+))
+jwt_duration = registry.register(Histogram(
+    "jwt_duration_seconds",
+    "JWT signing and verification time",
+    ("operation",),
+    buckets=(0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.01),
+))
+
+
+def _database_label(name: str) -> str:
+    """Collapse per-tenant databases into one label value"""
+    if name in (settings.MASTER_DB_NAME, settings.TENANT_DB_NAME, "admin"):
+        return name
+    return "tenant"
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Feeds MongoDB command timings into mongodb_command_duration_seconds"""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        mongodb_command_duration.observe(
+            event.duration_micros / 1e6, _database_label(event.database_name), event.command_name
+        )
+
+    def failed(self, event):
+        labels = (_database_label(event.database_name), event.command_name)
+        mongodb_command_duration.observe(event.duration_micros / 1e6, *labels)
+        mongodb_command_failures.inc(*labels)
+
+
+mongo_command_metrics = MongoCommandMetrics()
+
+
+def command_listeners() -> list:
+    """event_listeners for new MongoDB clients"""
+    return [mongo_command_metrics] if settings.METRICS_ENABLED else []
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request latency and in-flight requests
+
+    Requests are labelled with the matching route template (`/jobs/{job_id}`),
+    so path parameters do not create new series; paths matching no route
+    share the `<unmatched>` label.
+    """
+
+    MAX_CACHED_PATHS = 1024
+
+    def __init__(self, app, router):
+        self.app = app
+        self.router = router
+        # (method, path) -> (route template, in-flight child, {status: latency child})
+        self._routes: Dict[Tuple[str, str], tuple] = {}
+
+    def _resolve(self, method: str, path: str, scope) -> tuple:
+        template = "<unmatched>"
+        for route in self.router.routes:
+            match, _ = route.matches(scope)
+            if match != Match.NONE:
+                template = route.path
+                if match == Match.FULL:
+                    break
+        resolved = (template, http_requests_in_flight.labels(method, template), {})
+        if len(self._routes) < self.MAX_CACHED_PATHS:
+            self._routes[(method, path)] = resolved
+        return resolved
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        method, path = scope["method"], scope["path"]
+        route, in_flight, latencies = self._routes.get((method, path)) or self._resolve(method, path, scope)
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            latency = latencies.get(status_code)
+            if latency is None:
+                latency = latencies[status_code] = http_request_duration.labels(method, route, str(status_code))
+            latency.observe(elapsed)
+            in_flight.dec()
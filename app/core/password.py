@@ -1,12 +1,220 @@
+import asyncio
+import math
+import os
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
 import bcrypt
+from app.core.config import settings
+from app.core.metrics import password_hash_duration
 
 
 def hash_password(password: str) -> str:
-    """Hash password using bcrypt"""
-    salt = bcrypt.gensalt()
+    """Hash password using bcrypt at BCRYPT_ROUNDS"""
+    salt = bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
     return bcrypt.hashpw(password.encode("utf-8"), salt).decode("utf-8")
 
 
 def verify_password(password: str, hashed_password: str) -> bool:
     """Verify password against hash"""
     return bcrypt.checkpw(password.encode("utf-8"), hashed_password.encode("utf-8"))
+
+
+def hash_rounds(hashed_password: str) -> int:
+    """Cost factor of a bcrypt hash ("$2b$12$..." -> 12), 0 if unreadable"""
+    try:
+        return int(hashed_password.split("$")[2])
+    except (IndexError, ValueError):
+        return 0
+
+
+def needs_rehash(hashed_password: str) -> bool:
+    """Whether a stored hash was made with a cost other than BCRYPT_ROUNDS"""
+    return hash_rounds(hashed_password) != settings.BCRYPT_ROUNDS
+
+
+def calibrate_rounds(target_ms: float, min_rounds: int = 4, max_rounds: int = 16, repeat: int = 3):
+    """
+    Highest cost whose hash time stays within `target_ms` on this machine
+    
+    Each extra round doubles the work, so rounds are tried upwards until
+    the best of `repeat` hashes exceeds the target. Returns (rounds,
+    {rounds: milliseconds}); rounds is min_rounds if even that is too slow.
+    """
+    password = b"calibration-password"
+    timings = {}
+    best = min_rounds
+    for rounds in range(min_rounds, max_rounds + 1):
+        salt = bcrypt.gensalt(rounds=rounds)
+        elapsed = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            bcrypt.hashpw(password, salt)
+            elapsed.append((time.perf_counter() - start) * 1000)
+        timings[rounds] = round(min(elapsed), 2)
+        if timings[rounds] > target_ms:
+            break
+        best = rounds
+    return best, timings
+
+
+class PasswordPoolBusy(Exception):
+    """Raised when the password hashing pool has no queue space left"""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Password hashing pool is saturated")
+        self.retry_after = retry_after
+
+
+def _timed_call(func, *args):
+    """Run func in the worker and report how long it ran"""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+class PasswordHasherPool:
+    """Bounded thread/process pool that runs bcrypt off the event loop
+
+    At most `workers` calls run at once and at most `max_queue` more wait
+    for a worker; anything beyond that is rejected with PasswordPoolBusy
+    instead of piling up behind a login burst.
+    """
+
+    def __init__(self, workers: int, max_queue: int, kind: str = "thread"):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.kind = kind
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._total_run = 0.0
+
+    def _get_executor(self) -> Executor:
+        """Create the executor on first use"""
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    if self.kind == "process":
+                        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                    else:
+                        self._executor = ThreadPoolExecutor(
+                            max_workers=self.workers, thread_name_prefix="bcrypt"
+                        )
+        return self._executor
+
+    @property
+    def queue_depth(self) -> int:
+        """Calls waiting for a free worker"""
+        return max(0, self._pending - self.workers)
+
+    def _retry_after(self) -> int:
+        """Seconds until the current backlog should have drained"""
+        avg_run = self._total_run / self._completed if self._completed else 0.25
+        backlog = math.ceil(self._pending * avg_run / self.workers)
+        return max(settings.PASSWORD_POOL_RETRY_AFTER, backlog)
+
+    def _release(self, _future):
+        with self._lock:
+            self._pending -= 1
+
+    async def run(self, func, *args, block: bool = False):
+        """Run func(*args) on the pool, raising PasswordPoolBusy when full
+
+        With block=True the call is queued even when the pool is full;
+        callers using it must bound their own concurrency.
+        """
+        with self._lock:
+            if not block and self._pending >= self.workers + self.max_queue:
+                self._rejected += 1
+                raise PasswordPoolBusy(self._retry_after())
+            self._pending += 1
+
+        submitted = time.perf_counter()
+        try:
+            future = self._get_executor().submit(_timed_call, func, *args)
+        except Exception:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+        result, run_time = await asyncio.wrap_future(future)
+
+        wait = time.perf_counter() - submitted - run_time
+        if settings.METRICS_ENABLED:
+            password_hash_duration.observe(run_time, func.__name__)
+        with self._lock:
+            self._completed += 1
+            self._total_wait += wait
+            self._total_run += run_time
+            self._max_wait = max(self._max_wait, wait)
+        return result
+
+    def stats(self) -> dict:
+        """Pool sizing statistics"""
+        completed = self._completed
+        return {
+            "kind": self.kind,
+            "bcrypt_rounds": settings.BCRYPT_ROUNDS,
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": self._pending,
+            "queue_depth": self.queue_depth,
+            "completed": completed,
+            "rejected": self._rejected,
+            "avg_wait_ms": round(self._total_wait / completed * 1000, 2) if completed else 0.0,
+            "max_wait_ms": round(self._max_wait * 1000, 2),
+            "avg_run_ms": round(self._total_run / completed * 1000, 2) if completed else 0.0,
+        }
+
+    def shutdown(self):
+        """Stop the worker pool"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def reset_after_fork(self):
+        """Start over in a forked worker (the parent's pool threads don't exist there)"""
+        self._executor = None
+        self._lock = threading.Lock()
+        self._pending = 0
+
+
+password_pool = PasswordHasherPool(
+    workers=settings.PASSWORD_POOL_WORKERS,
+    max_queue=settings.PASSWORD_POOL_MAX_QUEUE,
+    kind=settings.PASSWORD_POOL_KIND,
+)
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=password_pool.reset_after_fork)
+
+
+async def hash_password_async(password: str, block: bool = False) -> str:
+    """Hash password on the password pool"""
+    return await password_pool.run(hash_password, password, block=block)
+
+
+async def verify_password_async(password: str, hashed_password: str) -> bool:
+    """Verify password on the password pool"""
+    return await password_pool.run(verify_password, password, hashed_password)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Pick BCRYPT_ROUNDS for a target hash time on this machine")
+    parser.add_argument("--target-ms", type=float, default=250.0, help="longest acceptable hash time")
+    parser.add_argument("--min-rounds", type=int, default=4)
+    parser.add_argument("--max-rounds", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=3, help="hashes per cost (the fastest counts)")
+    args = parser.parse_args()
+
+    rounds, timings = calibrate_rounds(args.target_ms, args.min_rounds, args.max_rounds, args.repeat)
+    for cost, ms in timings.items():
+        print(f"rounds={cost:<3}{ms:>10.1f} ms")
+    print(f"\nBCRYPT_ROUNDS={rounds}  (target {args.target_ms:g} ms, currently {settings.BCRYPT_ROUNDS})")
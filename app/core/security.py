@@ -1,11 +1,25 @@
+import hashlib
+import secrets
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 from jose import JWTError, jwt
 from app.core.config import settings
+from app.core.keys import signing_keys, uses_key_ring
+from app.core.metrics import jwt_duration
+from app.utils.cache import TTLCache
+
+
+# Already-verified token payloads, keyed by SHA-256 of the raw token
+token_cache = TTLCache(maxsize=settings.TOKEN_CACHE_SIZE)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
-    """Create JWT access token"""
+    """Create JWT access token
+    
+    With ALGORITHM=RS256 the token is signed with the key ring's active
+    key and carries its `kid`; otherwise it is signed with SECRET_KEY.
+    """
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.now(timezone.utc) + expires_delta
@@ -14,18 +28,71 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
             minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
         )
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(
-        to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM
-    )
+    start = time.perf_counter()
+    if uses_key_ring():
+        key = signing_keys.signing_key()
+        encoded_jwt = jwt.encode(
+            to_encode, key.private, algorithm=settings.ALGORITHM, headers={"kid": key.kid}
+        )
+    else:
+        encoded_jwt = jwt.encode(
+            to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM
+        )
+    if settings.METRICS_ENABLED:
+        jwt_duration.observe(time.perf_counter() - start, "encode")
     return encoded_jwt
 
 
 def decode_token(token: str) -> Optional[dict]:
     """Decode and validate JWT token"""
+    start = time.perf_counter()
     try:
+        if uses_key_ring():
+            key = signing_keys.verification_key(jwt.get_unverified_header(token).get("kid"))
+            if key is None:
+                return None
+        else:
+            key = settings.SECRET_KEY
         payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
+            token, key, algorithms=[settings.ALGORITHM]
         )
         return payload
     except JWTError:
         return None
+    finally:
+        if settings.METRICS_ENABLED:
+            jwt_duration.observe(time.perf_counter() - start, "decode")
+
+
+def decode_token_cached(token: str) -> Optional[dict]:
+    """Decode JWT token, reusing the payload of an already-verified token
+    
+    Entries expire when the token's `exp` passes, so an expired token is
+    always re-verified (and rejected) by decode_token. The returned
+    payload is shared between requests and must not be mutated.
+    """
+    key = hashlib.sha256(token.encode("utf-8")).digest()
+    payload = token_cache.get(key)
+    if payload is not None:
+        return payload
+    
+    payload = decode_token(token)
+    if payload:
+        ttl = payload.get("exp", 0) - time.time()
+        if ttl > 0:
+            token_cache.set(key, payload, ttl=ttl)
+    return payload
+
+
+def create_refresh_token() -> str:
+    """New opaque refresh token (256 random bits)"""
+    return secrets.token_urlsafe(32)
+
+
+def hash_refresh_token(token: str) -> str:
+    """Lookup key of a refresh token; only this hash is stored
+
+    Refresh tokens are random, so a fast hash is enough: unlike
+    passwords there is nothing to brute-force.
+    """
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
@@ -0,0 +1,236 @@
+import time
+import tracemalloc
+from typing import Callable, List, Optional
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
+from pymongo.collection import Collection
+from pymongo.errors import BulkWriteError
+from app.core.config import settings
+from app.db.tenancy import TenantScopedCollection
+
+
+RAW_CODEC_OPTIONS = CodecOptions(document_class=RawBSONDocument)
+
+MIGRATION_MODES = ("stream", "merge", "out")
+
+
+class MigrationResult:
+    """Outcome of a tenant collection copy"""
+
+    def __init__(self, mode: str, source: str, target: str):
+        self.mode = mode
+        self.source = source
+        self.target = target
+        self.documents = 0
+        self.batches = 0
+        self.duplicates = 0
+        self.removed = 0
+        # Encoded size of the largest batch: a proxy for what the copy
+        # holds, not a measurement (decoding, driver buffers not included)
+        self.peak_batch_bytes = 0
+        # Peak Python allocations during the copy, with trace_memory only
+        self.peak_memory_bytes: Optional[int] = None
+        self.elapsed_seconds = 0.0
+
+    @property
+    def docs_per_second(self) -> float:
+        """Copy throughput"""
+        if not self.elapsed_seconds:
+            return 0.0
+        return self.documents / self.elapsed_seconds
+
+    def to_dict(self):
+        """Convert to dictionary"""
+        return {
+            "mode": self.mode,
+            "source": self.source,
+            "target": self.target,
+            "documents": self.documents,
+            "batches": self.batches,
+            "duplicates": self.duplicates,
+            "removed": self.removed,
+            "peak_batch_bytes": self.peak_batch_bytes,
+            "peak_memory_bytes": self.peak_memory_bytes,
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+            "docs_per_second": round(self.docs_per_second, 1),
+        }
+
+    def __str__(self):
+        return (
+            f"{self.source} -> {self.target} [{self.mode}]: {self.documents} docs "
+            + (f"and {self.removed} removed " if self.removed else "")
+            + f"in {self.elapsed_seconds:.2f}s ({self.docs_per_second:.0f} docs/s, "
+            f"peak batch {self.peak_batch_bytes} bytes"
+            + (f", peak memory {self.peak_memory_bytes} bytes" if self.peak_memory_bytes is not None else "")
+            + ")"
+        )
+
+
+class TenantMigrator:
+    """
+    Copies one tenant collection into another with bounded memory
+
+    Modes:
+        stream: cursor is read in `batch_size` batches of raw (undecoded)
+                BSON and written with unordered insert_many, so at most one
+                batch is held in memory. Documents already present in the
+                target are skipped, which makes re-runs safe.
+        merge:  server-side `$merge` into the target; documents never pass
+                through Python.
+        out:    server-side `$out`, replacing the target collection.
+
+    `progress_callback`, if given, is called with the number of source
+    documents handled so far after every batch. With `trace_memory`
+    (default: MIGRATION_TRACE_MEMORY), copy() measures the peak of Python
+    allocations with tracemalloc. That slows allocation down and counts
+    every thread of the process, so it is meant for test runs.
+
+    sync() brings an earlier copy up to date (see its docstring).
+    """
+
+    def __init__(
+        self,
+        batch_size: Optional[int] = None,
+        mode: Optional[str] = None,
+        progress_callback: Optional[Callable[[int], None]] = None,
+        trace_memory: Optional[bool] = None,
+    ):
+        self.batch_size = batch_size or settings.MIGRATION_BATCH_SIZE
+        self.mode = mode or settings.MIGRATION_MODE
+        self.progress_callback = progress_callback
+        self.trace_memory = settings.MIGRATION_TRACE_MEMORY if trace_memory is None else trace_memory
+        if self.mode not in MIGRATION_MODES:
+            raise ValueError(f"Unknown migration mode: {self.mode}")
+
+    def copy(self, source: Collection, target: Collection) -> MigrationResult:
+        """Copy all documents from source into target"""
+        result = MigrationResult(
+            mode=self.mode,
+            source=source.full_name,
+            target=target.full_name,
+        )
+        started_tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        elif self.trace_memory:
+            tracemalloc.reset_peak()
+        traced_before = tracemalloc.get_traced_memory()[0] if self.trace_memory else 0
+        start = time.perf_counter()
+        try:
+            if self.mode == "stream":
+                self._stream_copy(source, target, result)
+            else:
+                self._server_side_copy(source, target, result)
+        finally:
+            if self.trace_memory:
+                result.peak_memory_bytes = tracemalloc.get_traced_memory()[1] - traced_before
+            if started_tracing:
+                tracemalloc.stop()
+        result.elapsed_seconds = time.perf_counter() - start
+        return result
+
+    def sync(self, source: Collection, target: Collection) -> MigrationResult:
+        """
+        Apply to target what changed in source since it was copied
+
+        Source documents are read in raw batches and compared byte for byte
+        with the target documents of the same `_id`: missing ones are
+        inserted, different ones replaced. Target `_id`s no longer in the
+        source are then deleted. Memory stays bounded by one batch.
+        """
+        result = MigrationResult(mode="sync", source=source.full_name, target=target.full_name)
+        start = time.perf_counter()
+        raw_source = source.with_options(codec_options=RAW_CODEC_OPTIONS)
+        raw_target = target.with_options(codec_options=RAW_CODEC_OPTIONS)
+
+        def apply(batch: List[RawBSONDocument]):
+            existing = {
+                doc["_id"]: doc.raw
+                for doc in raw_target.find({"_id": {"$in": [d["_id"] for d in batch]}})
+            }
+            missing = [doc for doc in batch if doc["_id"] not in existing]
+            if missing:
+                self._flush(target, missing, sum(len(doc.raw) for doc in missing), result)
+            for doc in batch:
+                if doc["_id"] in existing and existing[doc["_id"]] != doc.raw:
+                    target.replace_one({"_id": doc["_id"]}, doc)
+                    result.documents += 1
+
+        def prune(ids: list):
+            present = {doc["_id"] for doc in source.find({"_id": {"$in": ids}}, {"_id": 1})}
+            gone = [_id for _id in ids if _id not in present]
+            if gone:
+                result.removed += target.delete_many({"_id": {"$in": gone}}).deleted_count
+
+        for reader, handle, projection in ((raw_source, apply, None), (target, prune, {"_id": 1})):
+            cursor = reader.find({}, projection, batch_size=self.batch_size)
+            batch = []
+            try:
+                for doc in cursor:
+                    batch.append(doc if projection is None else doc["_id"])
+                    if len(batch) >= self.batch_size:
+                        handle(batch)
+                        batch = []
+                if batch:
+                    handle(batch)
+            finally:
+                cursor.close()
+        result.elapsed_seconds = time.perf_counter() - start
+        return result
+
+    def _stream_copy(self, source: Collection, target: Collection, result: MigrationResult):
+        """Batched client-side copy using raw BSON documents"""
+        raw_source = source.with_options(codec_options=RAW_CODEC_OPTIONS)
+        cursor = raw_source.find({}, batch_size=self.batch_size)
+        batch: List[RawBSONDocument] = []
+        batch_bytes = 0
+        try:
+            for doc in cursor:
+                batch.append(doc)
+                batch_bytes += len(doc.raw)
+                if len(batch) >= self.batch_size:
+                    self._flush(target, batch, batch_bytes, result)
+                    batch, batch_bytes = [], 0
+            if batch:
+                self._flush(target, batch, batch_bytes, result)
+        finally:
+            cursor.close()
+
+    def _flush(self, target: Collection, batch: list, batch_bytes: int, result: MigrationResult):
+        """Write one batch, tolerating documents that already exist"""
+        result.peak_batch_bytes = max(result.peak_batch_bytes, batch_bytes)
+        result.batches += 1
+        try:
+            target.insert_many(batch, ordered=False)
+            result.documents += len(batch)
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors", [])
+            if any(error.get("code") != 11000 for error in errors):
+                raise
+            result.documents += e.details.get("nInserted", 0)
+            result.duplicates += len(errors)
+        if self.progress_callback:
+            self.progress_callback(result.documents + result.duplicates)
+
+    def _server_side_copy(self, source: Collection, target: Collection, result: MigrationResult):
+        """Copy inside the server with $merge or $out"""
+        if self.mode == "out" and isinstance(source, TenantScopedCollection):
+            raise ValueError("$out would replace a shared collection; use merge or stream mode")
+        db_name, coll_name = target.full_name.split(".", 1)
+        destination = {"db": db_name, "coll": coll_name}
+        if self.mode == "merge":
+            stage = {
+                "$merge": {
+                    "into": destination,
+                    "on": "_id",
+                    "whenMatched": "keepExisting",
+                    "whenNotMatched": "insert",
+                }
+            }
+        else:
+            stage = {"$out": destination}
+        source.aggregate([stage], allowDiskUse=True)
+        result.batches = 1
+        result.documents = source.count_documents({})
+        if self.progress_callback:
+            self.progress_callback(result.documents)
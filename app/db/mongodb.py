@@ -1,7 +1,73 @@
-from pymongo import MongoClient
-from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
+import os
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import IndexModel, MongoClient
+from pymongo.errors import CollectionInvalid, ConnectionFailure, ServerSelectionTimeoutError
 from app.core.config import settings
-from typing import Optional
+from app.core.metrics import command_listeners
+from app.db.placement import DEFAULT_CLUSTER, HashRing, cluster_urls, placement_clusters
+from app.db.tenancy import FrozenTenantCollection, get_tenancy_strategy
+from app.utils.cache import TTLCache
+from typing import Dict, List, Optional, Tuple
+
+
+# Tenant name -> (cluster, writes frozen), shared by both clients. Expires
+# like the organization cache so a rebalanced tenant is picked up everywhere.
+tenant_placements = TTLCache(maxsize=settings.ORG_CACHE_SIZE, ttl=settings.ORG_CACHE_TTL_SECONDS)
+
+# Organization fields a placement is read from
+PLACEMENT_PROJECTION = {"cluster": 1, "moving_to": 1}
+
+
+# Indexes of the master database, by collection. Only the ones the server
+# doesn't have yet are sent, so a restart costs one listIndexes per collection.
+MASTER_DB_INDEXES: Dict[str, List[IndexModel]] = {
+    "organizations": [
+        IndexModel("organization_name", unique=True),
+        # Tenant placement (rebalancing scans by cluster)
+        IndexModel("cluster"),
+        # Tombstoned organizations waiting for the tenant reaper
+        IndexModel("reap_after", partialFilterExpression={"deleted_at": {"$type": "date"}}),
+    ],
+    "admin_users": [
+        IndexModel("email", unique=True),
+        IndexModel("organization_id"),
+    ],
+    # Background jobs
+    "jobs": [
+        IndexModel([("status", 1), ("created_at", 1)]),
+    ],
+    # Refresh tokens: looked up by hash (_id), revoked per family,
+    # organization or admin, removed once expired
+    "refresh_tokens": [
+        IndexModel("expires_at", expireAfterSeconds=0),
+        IndexModel("family_id"),
+        IndexModel([("organization_id", 1), ("email", 1)]),
+    ],
+    # Shared login throttle state (LOGIN_THROTTLE_BACKEND=mongodb)
+    "login_throttle": [
+        IndexModel("expires_at", expireAfterSeconds=0),
+    ],
+}
+
+
+def missing_indexes(existing: Dict[str, dict], models: List[IndexModel]) -> List[IndexModel]:
+    """Index models whose name is not in `existing` (index_information())"""
+    return [model for model in models if model.document["name"] not in existing]
+
+
+def placement_of(org_data: Optional[dict]) -> Tuple[str, bool]:
+    """(cluster, writes frozen) of an organization document
+
+    Tenants created before multi-cluster placement live on the default
+    cluster. A tenant being moved (`moving_to`) is read-only.
+    """
+    org_data = org_data or {}
+    return org_data.get("cluster") or DEFAULT_CLUSTER, bool(org_data.get("moving_to"))
+
+
+def _supports_transactions(hello: dict) -> bool:
+    """Replica set member or mongos"""
+    return bool(hello.get("setName")) or hello.get("msg") == "isdbgrid"
 
 
 class MongoDBClient:
@@ -10,57 +76,327 @@ class MongoDBClient:
     def __init__(self):
         self.client: Optional[MongoClient] = None
         self.master_db = None
+        self.supports_transactions = False
+        self.tenancy = get_tenancy_strategy()
+        self.ring = HashRing(placement_clusters())
+        self._cluster_clients: Dict[str, MongoClient] = {}
+        self._shared_indexes = set()
     
-    def connect(self):
-        """Connect to MongoDB"""
+    def connect(self, wait: bool = True):
+        """Connect to MongoDB
+        
+        The driver connects in the background. With `wait` the server is
+        checked and the master indexes are ensured before returning;
+        without it the first query (or DatabaseReadiness) does that.
+        """
+        self.client = MongoClient(
+            settings.MONGODB_URL,
+            serverSelectionTimeoutMS=5000,
+            connectTimeoutMS=5000,
+            maxPoolSize=settings.MONGODB_MAX_POOL_SIZE,
+            event_listeners=command_listeners(),
+        )
+        self.master_db = self.client[settings.MASTER_DB_NAME]
+        if not wait:
+            return
         try:
-            self.client = MongoClient(
-                settings.MONGODB_URL,
-                serverSelectionTimeoutMS=5000,
-                connectTimeoutMS=5000,
-            )
-            # Verify connection
-            self.client.admin.command("ping")
-            self.master_db = self.client[settings.MASTER_DB_NAME]
-            
-            # Create indexes for master database
-            self._create_master_db_indexes()
+            self.check_server()
+            self.ensure_master_indexes()
             print("✓ Connected to MongoDB")
         except (ConnectionFailure, ServerSelectionTimeoutError) as e:
             print(f"✗ Failed to connect to MongoDB: {e}")
             raise
     
+    def check_server(self) -> dict:
+        """Verify the connection and detect replica set / mongos (transactions)"""
+        hello = self.client.admin.command("hello")
+        self.supports_transactions = _supports_transactions(hello)
+        return hello
+    
+    def ensure_master_indexes(self) -> int:
+        """Create the missing master database indexes; returns how many were created"""
+        created = 0
+        for name, models in MASTER_DB_INDEXES.items():
+            collection = self.master_db[name]
+            missing = missing_indexes(collection.index_information(), models)
+            if missing:
+                collection.create_indexes(missing)
+                created += len(missing)
+        return created
+    
     def disconnect(self):
         """Disconnect from MongoDB"""
+        for client in self._cluster_clients.values():
+            client.close()
+        self._cluster_clients.clear()
         if self.client:
             self.client.close()
             print("✓ Disconnected from MongoDB")
     
-    def _create_master_db_indexes(self):
-        """Create indexes for master database collections"""
-        # Organizations collection
-        organizations = self.master_db["organizations"]
-        organizations.create_index("organization_name", unique=True)
+    def get_master_db(self):
+        """Get master database instance"""
+        return self.master_db
+    
+    def get_cluster_client(self, cluster: str) -> MongoClient:
+        """Client for a tenant data cluster, connected on first use"""
+        if cluster == DEFAULT_CLUSTER:
+            return self.client
+        if cluster not in self._cluster_clients:
+            urls = cluster_urls()
+            if cluster not in urls:
+                raise LookupError(f"Unknown cluster: {cluster}")
+            self._cluster_clients[cluster] = MongoClient(
+                urls[cluster],
+                serverSelectionTimeoutMS=5000,
+                connectTimeoutMS=5000,
+                maxPoolSize=settings.MONGODB_MAX_POOL_SIZE,
+                event_listeners=command_listeners(),
+            )
+        return self._cluster_clients[cluster]
+    
+    def place_tenant(self, org_name: str) -> str:
+        """Cluster a new tenant should be created on"""
+        return self.ring.node_for(org_name)
+    
+    def get_tenant_placement(self, org_name: str, refresh: bool = False) -> Tuple[str, bool]:
+        """(cluster holding a tenant's data, whether its writes are frozen)"""
+        placement = None if refresh else tenant_placements.get(org_name)
+        if placement is None:
+            org_data = self.master_db["organizations"].find_one(
+                {"organization_name": org_name}, PLACEMENT_PROJECTION
+            )
+            placement = placement_of(org_data)
+            if org_data:
+                tenant_placements.set(org_name, placement)
+        return placement
+    
+    def get_tenant_cluster(self, org_name: str, refresh: bool = False) -> str:
+        """Cluster currently holding a tenant's data"""
+        return self.get_tenant_placement(org_name, refresh)[0]
+    
+    def _tenant_client(self, org_name: str, cluster: Optional[str]) -> MongoClient:
+        return self.get_cluster_client(cluster or self.get_tenant_cluster(org_name))
+    
+    def get_tenant_db(self, org_name: str, cluster: Optional[str] = None):
+        """Get database holding the tenant's collections"""
+        return self._tenant_client(org_name, cluster)[self.tenancy.database_name(org_name)]
+    
+    def get_tenant_collection(
+        self, org_name: str, collection_name: str = "data", cluster: Optional[str] = None
+    ):
+        """Get tenant collection (scoped to the tenant for shared collections)
         
-        # Admin users collection
-        admin_users = self.master_db["admin_users"]
-        admin_users.create_index("email", unique=True)
-        admin_users.create_index("organization_id")
+        Routed by placement unless `cluster` is given; while the tenant is
+        being moved, the routed collection is read-only.
+        """
+        frozen = False
+        if cluster is None:
+            cluster, frozen = self.get_tenant_placement(org_name)
+        client = self.get_cluster_client(cluster)
+        db_name, coll_name = self.tenancy.locate(org_name, collection_name)
+        collection = self.tenancy.scope(client[db_name][coll_name], org_name)
+        return FrozenTenantCollection(collection, org_name) if frozen else collection
+    
+    def list_tenant_collections(self, org_name: str, cluster: Optional[str] = None) -> List[str]:
+        """Names of the tenant's collections"""
+        return self.tenancy.collection_names(self._tenant_client(org_name, cluster), org_name)
+    
+    def provision_tenant(
+        self, org_name: str, collection_name: str = "data", cluster: Optional[str] = None
+    ):
+        """Create the storage for a tenant collection (idempotent)"""
+        client = self._tenant_client(org_name, cluster)
+        db_name, coll_name = self.tenancy.locate(org_name, collection_name)
+        if self.tenancy.shared:
+            key = (cluster or self.get_tenant_cluster(org_name), db_name, coll_name)
+            if key not in self._shared_indexes:
+                client[db_name][coll_name].create_index(self.tenancy.index_keys)
+                self._shared_indexes.add(key)
+            return
+        try:
+            client[db_name].create_collection(coll_name)
+        except CollectionInvalid:
+            pass  # Collection already exists
+    
+    def drop_tenant(self, org_name: str, cluster: Optional[str] = None):
+        """Remove all of a tenant's data"""
+        self.tenancy.drop(self._tenant_client(org_name, cluster), org_name)
+
+
+class AsyncMongoDBClient:
+    """Async (Motor) MongoDB client wrapper for master and tenant databases
+    
+    Mirrors MongoDBClient so request handlers can await database calls
+    instead of blocking the event loop. After a lazy startup it also
+    builds the master indexes (DatabaseReadiness), off the event loop's
+    critical path.
+    """
+    
+    def __init__(self):
+        self.client: Optional[AsyncIOMotorClient] = None
+        self.master_db = None
+        self.supports_transactions = False
+        self.tenancy = get_tenancy_strategy()
+        self.ring = HashRing(placement_clusters())
+        self._cluster_clients: Dict[str, AsyncIOMotorClient] = {}
+        self._shared_indexes = set()
+    
+    async def connect(self, wait: bool = True):
+        """Connect to MongoDB (checks the server first with `wait`)"""
+        self.client = AsyncIOMotorClient(
+            settings.MONGODB_URL,
+            serverSelectionTimeoutMS=5000,
+            connectTimeoutMS=5000,
+            maxPoolSize=settings.MONGODB_MAX_POOL_SIZE,
+            event_listeners=command_listeners(),
+        )
+        self.master_db = self.client[settings.MASTER_DB_NAME]
+        if not wait:
+            return
+        try:
+            await self.check_server()
+            print("✓ Connected to MongoDB (async)")
+        except (ConnectionFailure, ServerSelectionTimeoutError) as e:
+            print(f"✗ Failed to connect to MongoDB (async): {e}")
+            raise
+    
+    async def check_server(self) -> dict:
+        """Verify the connection and detect replica set / mongos (transactions)"""
+        hello = await self.client.admin.command("hello")
+        self.supports_transactions = _supports_transactions(hello)
+        return hello
+    
+    async def ensure_master_indexes(self) -> int:
+        """Create the missing master database indexes; returns how many were created"""
+        created = 0
+        for name, models in MASTER_DB_INDEXES.items():
+            collection = self.master_db[name]
+            missing = missing_indexes(await collection.index_information(), models)
+            if missing:
+                await collection.create_indexes(missing)
+                created += len(missing)
+        return created
+    
+    def is_ready(self) -> bool:
+        """Whether the driver currently sees a writable server (no I/O)"""
+        return self.client is not None and self.client.topology_description.has_writable_server()
+    
+    def disconnect(self):
+        """Disconnect from MongoDB"""
+        for client in self._cluster_clients.values():
+            client.close()
+        self._cluster_clients.clear()
+        if self.client:
+            self.client.close()
+            print("✓ Disconnected from MongoDB (async)")
     
     def get_master_db(self):
         """Get master database instance"""
         return self.master_db
     
-    def get_tenant_db(self, org_name: str):
-        """Get tenant database instance"""
-        db_name = f"org_{org_name}"
-        return self.client[db_name]
+    def get_cluster_client(self, cluster: str) -> AsyncIOMotorClient:
+        """Client for a tenant data cluster, connected on first use"""
+        if cluster == DEFAULT_CLUSTER:
+            return self.client
+        if cluster not in self._cluster_clients:
+            urls = cluster_urls()
+            if cluster not in urls:
+                raise LookupError(f"Unknown cluster: {cluster}")
+            self._cluster_clients[cluster] = AsyncIOMotorClient(
+                urls[cluster],
+                serverSelectionTimeoutMS=5000,
+                connectTimeoutMS=5000,
+                maxPoolSize=settings.MONGODB_MAX_POOL_SIZE,
+                event_listeners=command_listeners(),
+            )
+        return self._cluster_clients[cluster]
+    
+    def place_tenant(self, org_name: str) -> str:
+        """Cluster a new tenant should be created on"""
+        return self.ring.node_for(org_name)
+    
+    async def get_tenant_placement(self, org_name: str) -> Tuple[str, bool]:
+        """(cluster holding a tenant's data, whether its writes are frozen)"""
+        placement = tenant_placements.get(org_name)
+        if placement is None:
+            org_data = await self.master_db["organizations"].find_one(
+                {"organization_name": org_name}, PLACEMENT_PROJECTION
+            )
+            placement = placement_of(org_data)
+            if org_data:
+                tenant_placements.set(org_name, placement)
+        return placement
+    
+    async def get_tenant_cluster(self, org_name: str) -> str:
+        """Cluster currently holding a tenant's data"""
+        return (await self.get_tenant_placement(org_name))[0]
+    
+    def _resolved_placement(self, org_name: str) -> Tuple[str, bool]:
+        # Resolving a placement needs a query, which can't happen in a sync
+        # accessor; callers pass the cluster or await get_tenant_cluster first
+        placement = tenant_placements.get(org_name)
+        if placement is None:
+            raise LookupError(f"Placement of tenant {org_name} is not resolved")
+        return placement
+    
+    def _tenant_client(self, org_name: str, cluster: Optional[str]) -> AsyncIOMotorClient:
+        return self.get_cluster_client(cluster or self._resolved_placement(org_name)[0])
     
-    def get_tenant_collection(self, org_name: str, collection_name: str = "data"):
-        """Get tenant collection"""
-        db = self.get_tenant_db(org_name)
-        return db[collection_name]
+    def get_tenant_db(self, org_name: str, cluster: Optional[str] = None):
+        """Get database holding the tenant's collections"""
+        return self._tenant_client(org_name, cluster)[self.tenancy.database_name(org_name)]
+    
+    def get_tenant_collection(
+        self, org_name: str, collection_name: str = "data", cluster: Optional[str] = None
+    ):
+        """Get tenant collection (scoped to the tenant for shared collections)
+        
+        Routed by placement unless `cluster` is given; while the tenant is
+        being moved, the routed collection is read-only.
+        """
+        frozen = False
+        if cluster is None:
+            cluster, frozen = self._resolved_placement(org_name)
+        client = self.get_cluster_client(cluster)
+        db_name, coll_name = self.tenancy.locate(org_name, collection_name)
+        collection = self.tenancy.scope(client[db_name][coll_name], org_name)
+        return FrozenTenantCollection(collection, org_name) if frozen else collection
+    
+    async def provision_tenant(
+        self, org_name: str, collection_name: str = "data", cluster: Optional[str] = None
+    ):
+        """Create the storage for a tenant collection (idempotent)"""
+        cluster = cluster or await self.get_tenant_cluster(org_name)
+        client = self.get_cluster_client(cluster)
+        db_name, coll_name = self.tenancy.locate(org_name, collection_name)
+        if self.tenancy.shared:
+            if (cluster, db_name, coll_name) not in self._shared_indexes:
+                await client[db_name][coll_name].create_index(self.tenancy.index_keys)
+                self._shared_indexes.add((cluster, db_name, coll_name))
+            return
+        try:
+            await client[db_name].create_collection(coll_name)
+        except CollectionInvalid:
+            pass  # Collection already exists
 
 
-# Global MongoDB client instance
+# Global MongoDB client instances
 mongodb_client = MongoDBClient()
+async_mongodb_client = AsyncMongoDBClient()
+
+
+def _reset_after_fork():
+    """Forget the parent's clients in a forked worker (app.server)
+
+    MongoClient is not fork-safe: its pool sockets and monitor threads
+    belong to the parent. The worker connects its own clients in the
+    startup event.
+    """
+    for db_client in (mongodb_client, async_mongodb_client):
+        db_client.client = None
+        db_client.master_db = None
+        db_client._cluster_clients = {}
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -0,0 +1,50 @@
+import bisect
+import hashlib
+from typing import Dict, List
+from app.core.config import settings
+
+
+DEFAULT_CLUSTER = "default"
+
+
+def cluster_urls() -> Dict[str, str]:
+    """Connection URL of every known cluster
+    
+    `default` is the MONGODB_URL deployment, which also hosts the master
+    database and any tenant placed before multi-cluster routing existed.
+    """
+    return {DEFAULT_CLUSTER: settings.MONGODB_URL, **settings.MONGODB_CLUSTERS}
+
+
+def placement_clusters() -> List[str]:
+    """Clusters that receive new tenants"""
+    return sorted(settings.MONGODB_CLUSTERS) or [DEFAULT_CLUSTER]
+
+
+class HashRing:
+    """Consistent hash ring mapping tenant names to clusters
+    
+    Each cluster owns `vnodes` points on the ring, so adding or removing a
+    cluster only moves roughly 1/N of the tenants.
+    """
+    
+    def __init__(self, nodes: List[str], vnodes: int = 160):
+        self.nodes = list(nodes)
+        self.vnodes = vnodes
+        self._ring = sorted(
+            (self._hash(f"{node}#{i}"), node)
+            for node in self.nodes
+            for i in range(vnodes)
+        )
+        self._keys = [key for key, _ in self._ring]
+    
+    @staticmethod
+    def _hash(value: str) -> int:
+        return int.from_bytes(hashlib.md5(value.encode("utf-8")).digest()[:8], "big")
+    
+    def node_for(self, key: str) -> str:
+        """Cluster owning a key"""
+        if not self._ring:
+            raise LookupError("Hash ring has no nodes")
+        index = bisect.bisect(self._keys, self._hash(key)) % len(self._ring)
+        return self._ring[index][1]
@@ -0,0 +1,101 @@
+import asyncio
+import time
+from typing import Optional
+from app.core.config import settings
+from app.db.mongodb import mongodb_client, async_mongodb_client
+
+
+class DatabaseReadiness:
+    """
+    Brings the database up behind a lazily started application
+
+    With MONGODB_LAZY_CONNECT the app serves (and answers /livez) as soon
+    as the clients exist. This task then checks the server and creates
+    the missing master indexes, retrying every `retry_seconds` until both
+    succeed. The service is ready (/readyz) once that has happened and
+    the driver sees a writable server, so losing the primary later turns
+    /readyz back to 503 without a probe query.
+    """
+
+    def __init__(self, retry_seconds: float):
+        self.retry_seconds = retry_seconds
+        self._task: Optional[asyncio.Task] = None
+        self._prepared: Optional[asyncio.Event] = None
+        self._started_at = time.monotonic()
+        self._prepared_after: Optional[float] = None
+        self._attempts = 0
+        self._indexes_created = 0
+        self._last_error: Optional[str] = None
+
+    def start(self):
+        """Start preparing the database in the background (on the running loop)"""
+        if self._task is not None:
+            return
+        self._started_at = time.monotonic()
+        self._prepared = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self):
+        """Cancel the background preparation if it's still retrying"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def mark_prepared(self):
+        """Record a database prepared in the foreground (eager startup)"""
+        if self._prepared is None:
+            self._prepared = asyncio.Event()
+        self._prepared_after = time.monotonic() - self._started_at
+        self._last_error = None
+        self._prepared.set()
+
+    async def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait until the database is prepared; False on timeout"""
+        if self._prepared is None:
+            return False
+        try:
+            await asyncio.wait_for(self._prepared.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    @property
+    def prepared(self) -> bool:
+        return self._prepared is not None and self._prepared.is_set()
+
+    @property
+    def ready(self) -> bool:
+        return self.prepared and async_mongodb_client.is_ready()
+
+    async def _run(self):
+        while True:
+            self._attempts += 1
+            try:
+                await async_mongodb_client.check_server()
+                mongodb_client.supports_transactions = async_mongodb_client.supports_transactions
+                self._indexes_created += await async_mongodb_client.ensure_master_indexes()
+            except Exception as e:
+                if self._last_error is None:
+                    print(f"⚠ MongoDB not ready yet, retrying every {self.retry_seconds}s: {e}")
+                self._last_error = str(e)
+                await asyncio.sleep(self.retry_seconds)
+                continue
+            self.mark_prepared()
+            self._task = None
+            print(f"✓ MongoDB ready ({self._indexes_created} indexes created)")
+            return
+
+    def stats(self) -> dict:
+        """Preparation progress and current readiness"""
+        return {
+            "ready": self.ready,
+            "prepared": self.prepared,
+            "prepared_after_seconds": round(self._prepared_after, 3) if self._prepared_after is not None else None,
+            "attempts": self._attempts,
+            "indexes_created": self._indexes_created,
+            "supports_transactions": async_mongodb_client.supports_transactions,
+            "last_error": self._last_error,
+        }
+
+
+database_readiness = DatabaseReadiness(retry_seconds=settings.MONGODB_READY_RETRY_SECONDS)
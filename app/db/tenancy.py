@@ -0,0 +1,283 @@
+import copy
+import re
+from typing import List, Optional, Tuple
+from bson.raw_bson import RawBSONDocument
+from pymongo import IndexModel, InsertOne, ReplaceOne
+from app.core.config import settings
+
+
+TENANT_KEY = "tenant_id"
+
+
+class TenantScopedCollection:
+    """
+    Collection view restricted to one tenant's documents
+
+    Used by the shared-collection strategy: every filter gets a
+    `tenant_id` clause, inserted documents are stamped with the tenant id
+    and aggregations start with a `$match` on it. Works over both pymongo
+    and Motor collections, since calls are delegated unchanged (Motor
+    returns awaitables).
+
+    Only the methods below and the read-only attributes in PASSTHROUGH
+    exist. Anything else (rename, drop_indexes, watch, database, ...)
+    would reach the whole shared collection and raises AttributeError.
+    """
+
+    PASSTHROUGH = frozenset(
+        ("name", "full_name", "codec_options", "read_preference", "read_concern", "write_concern")
+    )
+
+    def __init__(self, collection, tenant_id: str):
+        self._collection = collection
+        self.tenant_id = tenant_id
+
+    def __getattr__(self, name):
+        if name not in self.PASSTHROUGH:
+            raise AttributeError(f"{name} is not available on a tenant-scoped collection")
+        return getattr(self._collection, name)
+
+    def _scope(self, filter: Optional[dict]) -> dict:
+        scoped = dict(filter or {})
+        scoped[TENANT_KEY] = self.tenant_id
+        return scoped
+
+    def _stamp(self, document):
+        # Raw documents are copied verbatim from a scoped source and
+        # already carry the tenant id
+        if not isinstance(document, RawBSONDocument):
+            document[TENANT_KEY] = self.tenant_id
+        return document
+
+    def _scope_request(self, request):
+        """Scoped copy of a bulk_write request (InsertOne, UpdateOne, ...)"""
+        request = copy.copy(request)
+        if isinstance(request, (InsertOne, ReplaceOne)):
+            request._doc = self._stamp(copy.copy(request._doc))
+        if not isinstance(request, InsertOne):
+            request._filter = self._scope(request._filter)
+        return request
+
+    def _scope_index(self, model: IndexModel) -> IndexModel:
+        # The generated name would describe the keys without the tenant key
+        options = {k: v for k, v in model.document.items() if k not in ("key", "name")}
+        return IndexModel([(TENANT_KEY, 1)] + list(model.document["key"].items()), **options)
+
+    def with_options(self, **kwargs) -> "TenantScopedCollection":
+        return TenantScopedCollection(self._collection.with_options(**kwargs), self.tenant_id)
+
+    def find(self, filter: Optional[dict] = None, *args, **kwargs):
+        return self._collection.find(self._scope(filter), *args, **kwargs)
+
+    def find_one(self, filter: Optional[dict] = None, *args, **kwargs):
+        return self._collection.find_one(self._scope(filter), *args, **kwargs)
+
+    def find_one_and_update(self, filter: dict, update, *args, **kwargs):
+        return self._collection.find_one_and_update(self._scope(filter), update, *args, **kwargs)
+
+    def find_one_and_replace(self, filter: dict, replacement: dict, *args, **kwargs):
+        return self._collection.find_one_and_replace(
+            self._scope(filter), self._stamp(replacement), *args, **kwargs
+        )
+
+    def find_one_and_delete(self, filter: dict, *args, **kwargs):
+        return self._collection.find_one_and_delete(self._scope(filter), *args, **kwargs)
+
+    def distinct(self, key: str, filter: Optional[dict] = None, **kwargs):
+        return self._collection.distinct(key, self._scope(filter), **kwargs)
+
+    def count_documents(self, filter: Optional[dict] = None, **kwargs):
+        return self._collection.count_documents(self._scope(filter), **kwargs)
+
+    def estimated_document_count(self, **kwargs):
+        # Metadata counts cover every tenant; count this tenant's documents
+        return self._collection.count_documents(self._scope(None), **kwargs)
+
+    def insert_one(self, document, *args, **kwargs):
+        return self._collection.insert_one(self._stamp(document), *args, **kwargs)
+
+    def insert_many(self, documents, *args, **kwargs):
+        return self._collection.insert_many([self._stamp(d) for d in documents], *args, **kwargs)
+
+    def update_one(self, filter: dict, update, *args, **kwargs):
+        return self._collection.update_one(self._scope(filter), update, *args, **kwargs)
+
+    def update_many(self, filter: dict, update, *args, **kwargs):
+        return self._collection.update_many(self._scope(filter), update, *args, **kwargs)
+
+    def replace_one(self, filter: dict, replacement: dict, *args, **kwargs):
+        return self._collection.replace_one(self._scope(filter), self._stamp(replacement), *args, **kwargs)
+
+    def delete_one(self, filter: dict, *args, **kwargs):
+        return self._collection.delete_one(self._scope(filter), *args, **kwargs)
+
+    def delete_many(self, filter: dict, *args, **kwargs):
+        return self._collection.delete_many(self._scope(filter), *args, **kwargs)
+
+    def bulk_write(self, requests, *args, **kwargs):
+        return self._collection.bulk_write([self._scope_request(r) for r in requests], *args, **kwargs)
+
+    def aggregate(self, pipeline: List[dict], *args, **kwargs):
+        return self._collection.aggregate(
+            [{"$match": {TENANT_KEY: self.tenant_id}}] + list(pipeline), *args, **kwargs
+        )
+
+    def create_index(self, keys, **kwargs):
+        if isinstance(keys, str):
+            keys = [(keys, 1)]
+        return self._collection.create_index([(TENANT_KEY, 1)] + list(keys), **kwargs)
+
+    def create_indexes(self, indexes: List[IndexModel], **kwargs):
+        return self._collection.create_indexes([self._scope_index(model) for model in indexes], **kwargs)
+
+    def drop(self, *args, **kwargs):
+        return self._collection.delete_many(self._scope(None), *args, **kwargs)
+
+
+class TenantWritesFrozen(Exception):
+    """The tenant is being moved to another cluster; retry the write later"""
+
+
+class FrozenTenantCollection:
+    """
+    Read-only view of a tenant collection while the tenant is being moved
+
+    A rebalance freezes the tenant's writes before its final catch-up
+    copy, so nothing written to the source can be missed. Reads pass
+    through; every other method raises TenantWritesFrozen.
+    """
+
+    READS = frozenset(
+        (
+            "find", "find_one", "count_documents", "estimated_document_count", "distinct",
+            "name", "full_name", "codec_options", "read_preference", "read_concern", "write_concern",
+        )
+    )
+
+    def __init__(self, collection, tenant_id: str):
+        self._collection = collection
+        self.tenant_id = tenant_id
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if name not in self.READS:
+            raise TenantWritesFrozen(f"Tenant {self.tenant_id} is being moved; {name} is not allowed")
+        return getattr(self._collection, name)
+
+    def with_options(self, **kwargs) -> "FrozenTenantCollection":
+        return FrozenTenantCollection(self._collection.with_options(**kwargs), self.tenant_id)
+
+    def aggregate(self, pipeline: List[dict], *args, **kwargs):
+        if any("$out" in stage or "$merge" in stage for stage in pipeline):
+            raise TenantWritesFrozen(f"Tenant {self.tenant_id} is being moved; $out/$merge are not allowed")
+        return self._collection.aggregate(pipeline, *args, **kwargs)
+
+
+class TenancyStrategy:
+    """Where a tenant's collections live in MongoDB"""
+
+    name = ""
+    shared = False
+
+    def locate(self, org_name: str, collection_name: str) -> Tuple[str, str]:
+        """(database name, collection name) holding a tenant collection"""
+        raise NotImplementedError
+
+    def database_name(self, org_name: str) -> str:
+        """Database holding the tenant's collections"""
+        return self.locate(org_name, "data")[0]
+
+    def scope(self, collection, org_name: str):
+        """Restrict a located collection to the tenant"""
+        return collection
+
+    def collection_names(self, client, org_name: str) -> List[str]:
+        """Logical names of the tenant's collections (sync client)"""
+        raise NotImplementedError
+
+    def drop(self, client, org_name: str):
+        """Remove all of the tenant's data (sync client)"""
+        raise NotImplementedError
+
+
+class DatabasePerTenant(TenancyStrategy):
+    """One database (`org_<name>`) per tenant"""
+
+    name = "database"
+
+    def locate(self, org_name: str, collection_name: str) -> Tuple[str, str]:
+        return f"org_{org_name}", collection_name
+
+    def collection_names(self, client, org_name: str) -> List[str]:
+        return client[self.database_name(org_name)].list_collection_names()
+
+    def drop(self, client, org_name: str):
+        client.drop_database(self.database_name(org_name))
+
+
+class CollectionPerTenant(TenancyStrategy):
+    """Tenant collections named `tenant_<name>.<collection>` in one shared database"""
+
+    name = "collection"
+
+    def _prefix(self, org_name: str) -> str:
+        return f"tenant_{org_name}."
+
+    def locate(self, org_name: str, collection_name: str) -> Tuple[str, str]:
+        return settings.TENANT_DB_NAME, f"{self._prefix(org_name)}{collection_name}"
+
+    def _physical_names(self, client, org_name: str) -> List[str]:
+        pattern = f"^{re.escape(self._prefix(org_name))}"
+        return client[settings.TENANT_DB_NAME].list_collection_names(
+            filter={"name": {"$regex": pattern}}
+        )
+
+    def collection_names(self, client, org_name: str) -> List[str]:
+        prefix = self._prefix(org_name)
+        return [name[len(prefix):] for name in self._physical_names(client, org_name)]
+
+    def drop(self, client, org_name: str):
+        db = client[settings.TENANT_DB_NAME]
+        for name in self._physical_names(client, org_name):
+            db.drop_collection(name)
+
+
+class SharedCollection(TenancyStrategy):
+    """All tenants in shared collections, keyed by `tenant_id`"""
+
+    name = "shared"
+    shared = True
+    index_keys = [(TENANT_KEY, 1), ("_id", 1)]
+
+    def locate(self, org_name: str, collection_name: str) -> Tuple[str, str]:
+        return settings.TENANT_DB_NAME, collection_name
+
+    def scope(self, collection, org_name: str):
+        return TenantScopedCollection(collection, org_name)
+
+    def collection_names(self, client, org_name: str) -> List[str]:
+        db = client[settings.TENANT_DB_NAME]
+        return [
+            name for name in db.list_collection_names()
+            if db[name].find_one({TENANT_KEY: org_name}, {"_id": 1}) is not None
+        ]
+
+    def drop(self, client, org_name: str):
+        db = client[settings.TENANT_DB_NAME]
+        for name in db.list_collection_names():
+            db[name].delete_many({TENANT_KEY: org_name})
+
+
+TENANCY_STRATEGIES = {
+    strategy.name: strategy
+    for strategy in (DatabasePerTenant, CollectionPerTenant, SharedCollection)
+}
+
+
+def get_tenancy_strategy(name: Optional[str] = None) -> TenancyStrategy:
+    """Instantiate the configured tenancy strategy"""
+    name = name or settings.TENANCY_STRATEGY
+    if name not in TENANCY_STRATEGIES:
+        raise ValueError(f"Unknown tenancy strategy: {name}")
+    return TENANCY_STRATEGIES[name]()
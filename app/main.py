@@ -1,8 +1,19 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
 from app.core.config import settings
-from app.db.mongodb import mongodb_client
-from app.routes import organizations, auth
+from app.core.keys import signing_keys, uses_key_ring
+from app.core.metrics import MetricsMiddleware, registry
+from app.core.password import password_pool, PasswordPoolBusy
+from app.core.responses import etag_matches, serialization_stats
+from app.core.security import token_cache
+from app.db.mongodb import mongodb_client, async_mongodb_client
+from app.db.readiness import database_readiness
+from app.services.cache import organization_cache
+from app.services.jobs import job_runner
+from app.services.reaper import tenant_reaper
+from app.services.throttle import login_throttle, LoginThrottled
+from app.routes import organizations, auth, jobs
 
 # Create FastAPI app
 app = FastAPI(
@@ -20,37 +31,149 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request latency / in-flight metrics (outermost, so CORS time is included)
+app.add_middleware(MetricsMiddleware, router=app.router)
+
 
 # Startup event
 @app.on_event("startup")
 async def startup_event():
     """Initialize database connection on startup"""
+    # Token signing must work, with or without MongoDB
+    if uses_key_ring():
+        signing_keys.start()
+    if settings.MONGODB_LAZY_CONNECT:
+        # Serve right away; /readyz turns 200 once the server answered and
+        # the missing master indexes were created in the background
+        mongodb_client.connect(wait=False)
+        await async_mongodb_client.connect(wait=False)
+        job_runner.start()
+        tenant_reaper.start()
+        database_readiness.start()
+        print("✓ Application started, connecting to MongoDB in the background")
+        return
     try:
         mongodb_client.connect()
+        await async_mongodb_client.connect()
+        database_readiness.mark_prepared()
+        job_runner.start()
+        tenant_reaper.start()
         print("✓ Application started successfully with MongoDB connected")
     except Exception as e:
         print(f"⚠ Application started but MongoDB connection failed: {e}")
-        print("  The API is running but database operations will fail until MongoDB is available")
+        print("  The API is running but /readyz reports 503 until MongoDB is available")
+        job_runner.start()
+        tenant_reaper.start()
+        database_readiness.start()
 
 
 # Shutdown event
 @app.on_event("shutdown")
 async def shutdown_event():
     """Close database connection on shutdown"""
+    database_readiness.stop()
+    tenant_reaper.stop()
+    job_runner.stop()
+    signing_keys.stop()
     mongodb_client.disconnect()
+    async_mongodb_client.disconnect()
+    password_pool.shutdown()
     print("✓ Application shut down successfully")
 
 
+# Password pool saturation -> fast 503 instead of queueing behind bcrypt
+@app.exception_handler(PasswordPoolBusy)
+async def password_pool_busy_handler(request: Request, exc: PasswordPoolBusy):
+    """Reject requests while the password hashing pool is saturated"""
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Server is busy, please retry later"},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+# Login throttle -> 429 before any database read or bcrypt call
+@app.exception_handler(LoginThrottled)
+async def login_throttled_handler(request: Request, exc: LoginThrottled):
+    """Reject login attempts over the rate limit or during a lockout"""
+    return JSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content={"detail": "Too many login attempts, please retry later"},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
 # Health check endpoint
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
-    return {"status": "healthy", "app": settings.APP_NAME}
+    """Health check endpoint (always 200; see /readyz for routing decisions)"""
+    return {
+        "status": "healthy" if database_readiness.ready else "degraded",
+        "app": settings.APP_NAME,
+        "database": "ready" if database_readiness.ready else "unavailable",
+    }
+
+
+# Liveness probe: the process serves requests
+@app.get("/livez", include_in_schema=False)
+async def livez():
+    """Liveness probe (never touches the database)"""
+    return {"status": "ok"}
+
+
+# Readiness probe: the database is reachable and prepared
+@app.get("/readyz", include_in_schema=False)
+async def readyz():
+    """Readiness probe: 200 once MongoDB answered and the master indexes exist, else 503"""
+    readiness = database_readiness.stats()
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if readiness["ready"] else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"status": "ready" if readiness["ready"] else "not ready", "database": readiness},
+    )
+
+
+# Runtime statistics endpoint
+@app.get("/stats")
+async def runtime_stats():
+    """Runtime statistics for sizing worker pools and caches"""
+    return {
+        "database": database_readiness.stats(),
+        "password_pool": password_pool.stats(),
+        "token_cache": token_cache.stats(),
+        "organization_cache": organization_cache.stats(),
+        "jobs": job_runner.stats(),
+        "tenant_reaper": tenant_reaper.stats(),
+        "login_throttle": login_throttle.stats(),
+        "signing_keys": signing_keys.stats() if uses_key_ring() else {"algorithm": settings.ALGORITHM},
+        "serialization": serialization_stats.stats(),
+    }
+
+
+# Prometheus metrics endpoint
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Request, MongoDB command, bcrypt and JWT metrics in Prometheus text format"""
+    return Response(content=registry.render(), media_type=registry.CONTENT_TYPE)
+
+
+# Public keys for verifying access tokens without calling this service
+@app.get("/.well-known/jwks.json", include_in_schema=False)
+async def jwks(request: Request):
+    """JSON Web Key Set of the RS256 signing keys (empty with HS256)"""
+    body, etag = signing_keys.jwks() if uses_key_ring() else (b'{"keys":[]}', '"empty"')
+    headers = {
+        "Cache-Control": f"public, max-age={settings.JWKS_MAX_AGE_SECONDS}",
+        "ETag": etag,
+    }
+    if etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 # Include routers
 app.include_router(organizations.router)
 app.include_router(auth.router)
+app.include_router(jobs.router)
 
 
 # Root endpoint
@@ -62,14 +185,25 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "health": "/health",
+            "livez": "/livez",
+            "readyz": "/readyz",
+            "stats": "/stats",
+            "metrics": "/metrics",
+            "jwks": "/.well-known/jwks.json",
             "organizations": {
                 "create": "POST /org/create",
+                "bulk_create": "POST /org/bulk-create",
                 "get": "GET /org/get",
+                "list": "GET /org/list",
                 "update": "PUT /org/update",
                 "delete": "DELETE /org/delete",
             },
             "admin": {
                 "login": "POST /admin/login",
+                "refresh": "POST /admin/refresh",
+            },
+            "jobs": {
+                "get": "GET /jobs/{job_id}",
             },
         },
     }
@@ -1,11 +1,67 @@
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Tuple
+import bson
 from bson import ObjectId
+from bson.raw_bson import RawBSONDocument
 
 
-class Organization:
+def utcnow_ms() -> datetime:
+    """Current UTC time at the millisecond precision BSON dates store
+
+    Models keep the value they were built with (and the organization cache
+    serves it), so it must equal what a read back from MongoDB returns.
+    """
+    now = datetime.utcnow()
+    return now.replace(microsecond=now.microsecond // 1000 * 1000)
+
+
+class LazyDocument:
+    """
+    Base for compact models stored in `__slots__`
+    
+    A model can also wrap an undecoded RawBSONDocument (see `wrap`); the
+    BSON is decoded on first field access and the raw bytes are then
+    released. Fields missing from the document (projected out) read as
+    None.
+    """
+    
+    __slots__ = ("_raw",)
+    FIELDS: Tuple[str, ...] = ()
+    
+    @classmethod
+    def wrap(cls, raw: RawBSONDocument):
+        """Model backed by a raw document, decoded lazily"""
+        obj = cls.__new__(cls)
+        obj._raw = raw
+        return obj
+    
+    def __getattr__(self, name):
+        # Only reached for slots that have not been assigned yet
+        if name in self.FIELDS and self._raw is not None:
+            return self._decode().get(name)
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+    
+    def _decode(self) -> dict:
+        data = bson.decode(self._raw.raw)
+        self._raw = None
+        for field in self.FIELDS:
+            setattr(self, field, data.get(field))
+        return data
+
+
+class Organization(LazyDocument):
     """Organization model for master database"""
     
+    __slots__ = FIELDS = (
+        "_id",
+        "organization_name",
+        "collection_name",
+        "admin_id",
+        "created_at",
+        "cluster",
+        "version",
+    )
+    
     def __init__(
         self,
         organization_name: str,
@@ -13,12 +69,22 @@ class Organization:
         admin_id: str,
         created_at: Optional[datetime] = None,
         _id: Optional[ObjectId] = None,
+        cluster: Optional[str] = None,
+        version: Optional[int] = 1,
     ):
+        self._raw = None
         self._id = _id or ObjectId()
         self.organization_name = organization_name
         self.collection_name = collection_name
         self.admin_id = admin_id
-        self.created_at = created_at or datetime.utcnow()
+        self.created_at = created_at or utcnow_ms()
+        self.cluster = cluster
+        self.version = version
+    
+    @property
+    def etag(self) -> str:
+        """Entity tag of this version (organizations created before versioning are 0)"""
+        return f'"{self._id}-{self.version or 0}"'
     
     def to_dict(self):
         """Convert to dictionary"""
@@ -28,23 +94,37 @@ class Organization:
             "collection_name": self.collection_name,
             "admin_id": self.admin_id,
             "created_at": self.created_at,
+            "cluster": self.cluster,
+            "version": self.version,
         }
     
     @staticmethod
     def from_dict(data: dict) -> "Organization":
-        """Create from dictionary"""
+        """Create from dictionary (raw documents are decoded lazily)"""
+        if isinstance(data, RawBSONDocument):
+            return Organization.wrap(data)
         return Organization(
             organization_name=data.get("organization_name"),
             collection_name=data.get("collection_name"),
             admin_id=data.get("admin_id"),
             created_at=data.get("created_at"),
             _id=data.get("_id"),
+            cluster=data.get("cluster"),
+            version=data.get("version"),
         )
 
 
-class AdminUser:
+class AdminUser(LazyDocument):
     """Admin user model for master database"""
     
+    __slots__ = FIELDS = (
+        "_id",
+        "email",
+        "hashed_password",
+        "organization_id",
+        "created_at",
+    )
+    
     def __init__(
         self,
         email: str,
@@ -53,11 +133,12 @@ class AdminUser:
         created_at: Optional[datetime] = None,
         _id: Optional[ObjectId] = None,
     ):
+        self._raw = None
         self._id = _id or ObjectId()
         self.email = email
         self.hashed_password = hashed_password
         self.organization_id = organization_id
-        self.created_at = created_at or datetime.utcnow()
+        self.created_at = created_at or utcnow_ms()
     
     def to_dict(self):
         """Convert to dictionary"""
@@ -71,7 +152,9 @@ class AdminUser:
     
     @staticmethod
     def from_dict(data: dict) -> "AdminUser":
-        """Create from dictionary"""
+        """Create from dictionary (raw documents are decoded lazily)"""
+        if isinstance(data, RawBSONDocument):
+            return AdminUser.wrap(data)
         return AdminUser(
             email=data.get("email"),
             hashed_password=data.get("hashed_password"),
@@ -79,3 +162,96 @@ class AdminUser:
             created_at=data.get("created_at"),
             _id=data.get("_id"),
         )
+
+
+class Job:
+    """Background job model for master database"""
+    
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    
+    def __init__(
+        self,
+        job_type: str,
+        organization_name: str,
+        params: Optional[dict] = None,
+        status: str = QUEUED,
+        documents_processed: int = 0,
+        documents_total: Optional[int] = None,
+        result: Optional[dict] = None,
+        error: Optional[str] = None,
+        attempts: int = 0,
+        created_at: Optional[datetime] = None,
+        started_at: Optional[datetime] = None,
+        finished_at: Optional[datetime] = None,
+        _id: Optional[ObjectId] = None,
+    ):
+        self._id = _id or ObjectId()
+        self.job_type = job_type
+        self.organization_name = organization_name
+        self.params = params or {}
+        self.status = status
+        self.documents_processed = documents_processed
+        self.documents_total = documents_total
+        self.result = result
+        self.error = error
+        self.attempts = attempts
+        self.created_at = created_at or utcnow_ms()
+        self.started_at = started_at
+        self.finished_at = finished_at
+    
+    @property
+    def progress(self) -> Optional[float]:
+        """Fraction of documents processed, when the total is known"""
+        if self.status == Job.SUCCEEDED:
+            return 1.0
+        if not self.documents_total:
+            return None
+        return min(1.0, self.documents_processed / self.documents_total)
+    
+    @property
+    def elapsed_seconds(self) -> Optional[float]:
+        """Seconds since the job started (until it finished)"""
+        if not self.started_at:
+            return None
+        end = self.finished_at or datetime.utcnow()
+        return (end - self.started_at).total_seconds()
+    
+    def to_dict(self):
+        """Convert to dictionary"""
+        return {
+            "_id": self._id,
+            "job_type": self.job_type,
+            "organization_name": self.organization_name,
+            "params": self.params,
+            "status": self.status,
+            "documents_processed": self.documents_processed,
+            "documents_total": self.documents_total,
+            "result": self.result,
+            "error": self.error,
+            "attempts": self.attempts,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+    
+    @staticmethod
+    def from_dict(data: dict) -> "Job":
+        """Create from dictionary"""
+        return Job(
+            job_type=data.get("job_type"),
+            organization_name=data.get("organization_name"),
+            params=data.get("params"),
+            status=data.get("status", Job.QUEUED),
+            documents_processed=data.get("documents_processed", 0),
+            documents_total=data.get("documents_total"),
+            result=data.get("result"),
+            error=data.get("error"),
+            attempts=data.get("attempts", 0),
+            created_at=data.get("created_at"),
+            started_at=data.get("started_at"),
+            finished_at=data.get("finished_at"),
+            _id=data.get("_id"),
+        )
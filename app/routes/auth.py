@@ -1,54 +1,85 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Request, status
 from datetime import timedelta
-from app.schemas.schemas import AdminLoginRequest, TokenResponse
-from app.services.services import AdminUserService
+from app.schemas.schemas import AdminLoginRequest, RefreshTokenRequest, TokenResponse, DataResponse
+from app.services.services import AsyncAdminUserService, AsyncRefreshTokenService
 from app.core.security import create_access_token
+from app.core.responses import respond
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
 
-@router.post("/login", response_model=dict)
-async def admin_login(request: AdminLoginRequest):
-    """Admin login endpoint"""
-    success, admin_user, message = AdminUserService.authenticate(
+def _token_response(
+    route: str, message: str, admin_id: str, organization_id: str, organization_name: str, email: str, refresh_token: str
+):
+    """Sign an access token and wrap it with the refresh token"""
+    token_data = {
+        "sub": admin_id,
+        "admin_id": admin_id,
+        "organization_id": organization_id,
+        "organization_name": organization_name,
+        "email": email,
+    }
+    access_token = create_access_token(data=token_data)
+
+    return respond(route, DataResponse[TokenResponse](
+        message=message,
+        data=TokenResponse(
+            access_token=access_token,
+            token_type="bearer",
+            refresh_token=refresh_token,
+            admin_id=admin_id,
+            organization_id=organization_id,
+            organization_name=organization_name,
+        ),
+    ))
+
+
+@router.post("/login", response_model=DataResponse[TokenResponse])
+async def admin_login(request: AdminLoginRequest, http_request: Request):
+    """Admin login endpoint (throttled per client IP and email; 429 when over the limit)"""
+    success, admin_user, org, message = await AsyncAdminUserService.authenticate_with_organization(
         email=request.email,
         password=request.password,
+        client_ip=http_request.client.host if http_request.client else None,
     )
-    
+
     if not success:
         raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
+            status_code=status.HTTP_401_UNAUTHORIZED if admin_user is None else status.HTTP_400_BAD_REQUEST,
             detail=message,
         )
-    
-    # Get organization details
-    org_success, org, org_message = AdminUserService.get_organization_by_admin(
-        admin_id=str(admin_user._id)
+
+    refresh_token = await AsyncRefreshTokenService.issue(
+        str(admin_user._id), str(org._id), org.organization_name, admin_user.email
     )
-    
-    if not org_success:
+    return _token_response(
+        "/admin/login",
+        "Login successful",
+        str(admin_user._id),
+        str(org._id),
+        org.organization_name,
+        admin_user.email,
+        refresh_token,
+    )
+
+
+@router.post("/refresh", response_model=DataResponse[TokenResponse])
+async def admin_refresh(request: RefreshTokenRequest):
+    """Exchange a refresh token for a new access token and refresh token (no password check)"""
+    success, session, refresh_token, message = await AsyncRefreshTokenService.rotate(request.refresh_token)
+
+    if not success:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=org_message,
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=message,
         )
-    
-    # Create access token
-    token_data = {
-        "sub": str(admin_user._id),
-        "admin_id": str(admin_user._id),
-        "organization_id": str(org._id),
-        "organization_name": org.organization_name,
-        "email": admin_user.email,
-    }
-    access_token = create_access_token(data=token_data)
-    
-    return {
-        "message": "Login successful",
-        "data": {
-            "access_token": access_token,
-            "token_type": "bearer",
-            "admin_id": str(admin_user._id),
-            "organization_id": str(org._id),
-            "organization_name": org.organization_name,
-        },
-    }
+
+    return _token_response(
+        "/admin/refresh",
+        "Token refreshed",
+        session["admin_id"],
+        session["organization_id"],
+        session["organization_name"],
+        session["email"],
+        refresh_token,
+    )
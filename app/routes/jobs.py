@@ -0,0 +1,40 @@
+from fastapi import APIRouter, HTTPException, status, Depends
+from app.core.dependencies import get_token_payload
+from app.core.responses import respond
+from app.schemas.schemas import DataResponse, JobResponse
+from app.services.jobs import job_runner
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+@router.get("/{job_id}", response_model=DataResponse[JobResponse])
+async def get_job(
+    job_id: str,
+    payload: dict = Depends(get_token_payload),
+):
+    """Get background job progress (requires authentication)"""
+    job = await job_runner.get(job_id)
+    
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found",
+        )
+    
+    return respond("/jobs/{job_id}", DataResponse[JobResponse](
+        message="Job retrieved successfully",
+        data=JobResponse(
+            job_id=str(job._id),
+            job_type=job.job_type,
+            organization_name=job.organization_name,
+            status=job.status,
+            progress=job.progress,
+            documents_processed=job.documents_processed,
+            documents_total=job.documents_total,
+            elapsed_seconds=job.elapsed_seconds,
+            attempts=job.attempts,
+            result=job.result,
+            error=job.error,
+            created_at=job.created_at,
+        ),
+    ))
@@ -1,6 +1,7 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Header
+import json
 from typing import Optional
-from datetime import timedelta
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Request, Response
+from pydantic import ValidationError
 from app.schemas.schemas import (
     CreateOrganizationRequest,
     UpdateOrganizationRequest,
@@ -8,20 +9,24 @@ from app.schemas.schemas import (
     DeleteOrganizationRequest,
     AdminLoginRequest,
     OrganizationResponse,
-    TokenResponse,
-    SuccessResponse,
+    OrganizationUpdateResponse,
+    OrganizationDeleteResponse,
+    OrganizationListResponse,
+    BulkCreateResponse,
+    DataResponse,
 )
-from app.services.services import OrganizationService, AdminUserService
-from app.core.security import create_access_token, decode_token
+from app.services.services import AsyncOrganizationService
 from app.core.config import settings
+from app.core.dependencies import get_token_payload
+from app.core.responses import etag_matches, respond
 
 router = APIRouter(prefix="/org", tags=["organizations"])
 
 
-@router.post("/create", response_model=dict)
+@router.post("/create", response_model=DataResponse[OrganizationResponse])
 async def create_organization(request: CreateOrganizationRequest):
     """Create a new organization"""
-    success, org, message = OrganizationService.create_organization(
+    success, org, message = await AsyncOrganizationService.create_organization(
         organization_name=request.organization_name,
         email=request.email,
         password=request.password,
@@ -33,21 +38,146 @@ async def create_organization(request: CreateOrganizationRequest):
             detail=message,
         )
     
-    return {
-        "message": "Organization created successfully",
-        "data": {
-            "organization_name": org.organization_name,
-            "collection_name": org.collection_name,
-            "admin_id": org.admin_id,
-            "created_at": org.created_at.isoformat(),
-        },
-    }
-
-
-@router.get("/get", response_model=dict)
-async def get_organization(organization_name: str):
-    """Get organization by name"""
-    success, org, message = OrganizationService.get_organization(
+    return respond("/org/create", DataResponse[OrganizationResponse](
+        message="Organization created successfully",
+        data=OrganizationResponse(
+            organization_name=org.organization_name,
+            collection_name=org.collection_name,
+            admin_id=org.admin_id,
+            created_at=org.created_at,
+        ),
+    ))
+
+
+def _parse_bulk_body(body: bytes, content_type: str) -> list:
+    """Parse a JSON array or NDJSON (one object per line) request body
+
+    An NDJSON line that is not valid JSON becomes a ValueError item, so
+    it fails on its own instead of failing the whole request.
+    """
+    if "ndjson" in content_type or "jsonlines" in content_type:
+        items = []
+        for number, line in enumerate(body.splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError as e:
+                items.append(ValueError(f"Invalid JSON on line {number}: {getattr(e, 'msg', e)}"))
+        return items
+    items = json.loads(body)
+    if not isinstance(items, list):
+        raise ValueError("Expected a JSON array of organizations")
+    return items
+
+
+@router.post("/bulk-create", response_model=DataResponse[BulkCreateResponse])
+async def bulk_create_organizations(request: Request):
+    """Create many organizations from a JSON array or NDJSON body"""
+    try:
+        items = _parse_bulk_body(
+            await request.body(), request.headers.get("content-type", "")
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid request body: {str(e)}",
+        )
+    
+    if len(items) > settings.BULK_CREATE_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.BULK_CREATE_MAX_ITEMS} organizations per request",
+        )
+    
+    # Validate each item on its own so one bad row does not fail the batch
+    results = [None] * len(items)
+    valid_indexes, valid_items = [], []
+    for index, item in enumerate(items):
+        if isinstance(item, ValueError):
+            results[index] = {"organization_name": None, "success": False, "message": str(item)}
+            continue
+        try:
+            parsed = CreateOrganizationRequest.model_validate(item)
+        except ValidationError as e:
+            results[index] = {
+                "organization_name": item.get("organization_name") if isinstance(item, dict) else None,
+                "success": False,
+                "message": "; ".join(
+                    f"{'.'.join(str(loc) for loc in error['loc'])}: {error['msg']}"
+                    if error["loc"] else error["msg"]
+                    for error in e.errors()
+                ),
+            }
+            continue
+        valid_indexes.append(index)
+        valid_items.append((parsed.organization_name, parsed.email, parsed.password))
+    
+    created = await AsyncOrganizationService.bulk_create_organizations(valid_items)
+    for index, result in zip(valid_indexes, created):
+        results[index] = result
+    
+    for index, result in enumerate(results):
+        result["index"] = index
+    
+    succeeded = sum(1 for result in results if result["success"])
+    return respond("/org/bulk-create", DataResponse[BulkCreateResponse](
+        message="Bulk create completed",
+        data=BulkCreateResponse(
+            total=len(results),
+            succeeded=succeeded,
+            failed=len(results) - succeeded,
+            results=results,
+        ),
+    ))
+
+
+@router.get("/list", response_model=DataResponse[OrganizationListResponse])
+async def list_organizations(
+    prefix: Optional[str] = None,
+    fields: Optional[str] = None,
+    limit: int = Query(settings.ORG_LIST_DEFAULT_LIMIT, ge=1, le=settings.ORG_LIST_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    payload: dict = Depends(get_token_payload),
+):
+    """List organizations by name, paged with an opaque cursor (requires authentication)"""
+    success, organizations, next_cursor, message = await AsyncOrganizationService.list_organizations(
+        prefix=prefix,
+        fields=[field.strip() for field in fields.split(",") if field.strip()] if fields else None,
+        limit=limit,
+        cursor=cursor,
+    )
+    
+    if not success:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=message,
+        )
+    
+    return respond("/org/list", DataResponse[OrganizationListResponse](
+        message=message,
+        data=OrganizationListResponse(organizations=organizations, next_cursor=next_cursor),
+    ))
+
+
+def _cache_headers(etag: str) -> dict:
+    """ETag and the configured Cache-Control of an organization response"""
+    headers = {"ETag": etag}
+    if settings.ORG_GET_CACHE_CONTROL:
+        headers["Cache-Control"] = settings.ORG_GET_CACHE_CONTROL
+    return headers
+
+
+@router.get("/get", response_model=DataResponse[OrganizationResponse])
+async def get_organization(organization_name: str, request: Request):
+    """Get organization by name (304 when If-None-Match has the current ETag)"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        success, org, _ = await AsyncOrganizationService.get_organization_version(organization_name)
+        if success and etag_matches(if_none_match, org.etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=_cache_headers(org.etag))
+    
+    success, org, message = await AsyncOrganizationService.get_organization(
         organization_name=organization_name
     )
     
@@ -57,45 +187,30 @@ async def get_organization(organization_name: str):
             detail=message,
         )
     
-    return {
-        "message": "Organization retrieved successfully",
-        "data": {
-            "organization_name": org.organization_name,
-            "collection_name": org.collection_name,
-            "admin_id": org.admin_id,
-            "created_at": org.created_at.isoformat(),
-        },
-    }
+    response = respond("/org/get", DataResponse[OrganizationResponse](
+        message="Organization retrieved successfully",
+        data=OrganizationResponse(
+            organization_name=org.organization_name,
+            collection_name=org.collection_name,
+            admin_id=org.admin_id,
+            created_at=org.created_at,
+        ),
+    ))
+    response.headers.update(_cache_headers(org.etag))
+    return response
 
 
-@router.put("/update", response_model=dict)
+@router.put(
+    "/update",
+    response_model=DataResponse[OrganizationUpdateResponse],
+    status_code=status.HTTP_202_ACCEPTED,
+)
 async def update_organization(
     request: UpdateOrganizationRequest,
-    authorization: Optional[str] = Header(None),
+    payload: dict = Depends(get_token_payload),
 ):
     """Update organization (requires authentication)"""
-    # Verify token
-    if not authorization:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Missing authorization header",
-        )
-    
-    try:
-        token = authorization.replace("Bearer ", "")
-        payload = decode_token(token)
-        if not payload:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token",
-            )
-    except Exception:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authorization",
-        )
-    
-    success, org, message = OrganizationService.update_organization(
+    success, org, job, message = await AsyncOrganizationService.update_organization(
         organization_name=request.organization_name,
         email=request.email,
         password=request.password,
@@ -107,44 +222,28 @@ async def update_organization(
             detail=message,
         )
     
-    return {
-        "message": "Organization updated successfully",
-        "data": {
-            "organization_name": org.organization_name,
-            "collection_name": org.collection_name,
-            "admin_id": org.admin_id,
-        },
-    }
+    return respond("/org/update", DataResponse[OrganizationUpdateResponse](
+        message=message,
+        data=OrganizationUpdateResponse(
+            organization_name=org.organization_name,
+            collection_name=org.collection_name,
+            admin_id=org.admin_id,
+            job_id=str(job._id),
+        ),
+    ), status_code=status.HTTP_202_ACCEPTED)
 
 
-@router.delete("/delete", response_model=dict)
+@router.delete(
+    "/delete",
+    response_model=DataResponse[OrganizationDeleteResponse],
+    status_code=status.HTTP_202_ACCEPTED,
+)
 async def delete_organization(
     organization_name: str,
-    authorization: Optional[str] = Header(None),
+    payload: dict = Depends(get_token_payload),
 ):
     """Delete organization (requires authentication)"""
-    # Verify token
-    if not authorization:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Missing authorization header",
-        )
-    
-    try:
-        token = authorization.replace("Bearer ", "")
-        payload = decode_token(token)
-        if not payload:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token",
-            )
-    except Exception:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authorization",
-        )
-    
-    success, message = OrganizationService.delete_organization(
+    success, message = await AsyncOrganizationService.delete_organization(
         organization_name=organization_name
     )
     
@@ -154,4 +253,7 @@ async def delete_organization(
             detail=message,
         )
     
-    return {"message": message}
+    return respond("/org/delete", DataResponse[OrganizationDeleteResponse](
+        message=message,
+        data=OrganizationDeleteResponse(organization_name=organization_name),
+    ), status_code=status.HTTP_202_ACCEPTED)
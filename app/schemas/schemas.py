@@ -1,8 +1,11 @@
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional
+from typing import Any, Dict, Generic, List, Optional, TypeVar
 from datetime import datetime
 
 
+T = TypeVar("T")
+
+
 class CreateOrganizationRequest(BaseModel):
     """Request schema for creating organization"""
     organization_name: str = Field(..., min_length=1, max_length=100)
@@ -33,6 +36,11 @@ class AdminLoginRequest(BaseModel):
     password: str
 
 
+class RefreshTokenRequest(BaseModel):
+    """Request schema for exchanging a refresh token"""
+    refresh_token: str = Field(..., min_length=1, max_length=512)
+
+
 class OrganizationResponse(BaseModel):
     """Response schema for organization"""
     organization_name: str
@@ -41,10 +49,54 @@ class OrganizationResponse(BaseModel):
     created_at: datetime
 
 
+class OrganizationUpdateResponse(BaseModel):
+    """Response schema for an accepted organization update"""
+    organization_name: str
+    collection_name: str
+    admin_id: str
+    job_id: str
+
+
+class OrganizationDeleteResponse(BaseModel):
+    """Response schema for an accepted organization deletion"""
+    organization_name: str
+
+
+class OrganizationListResponse(BaseModel):
+    """Response schema for a page of organizations"""
+    organizations: List[Dict[str, Any]]
+    next_cursor: Optional[str] = None
+
+
+class BulkCreateResponse(BaseModel):
+    """Response schema for bulk organization creation"""
+    total: int
+    succeeded: int
+    failed: int
+    results: List[Dict[str, Any]]
+
+
+class JobResponse(BaseModel):
+    """Response schema for background job progress"""
+    job_id: str
+    job_type: str
+    organization_name: str
+    status: str
+    progress: Optional[float] = None
+    documents_processed: int
+    documents_total: Optional[int] = None
+    elapsed_seconds: Optional[float] = None
+    attempts: int
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: datetime
+
+
 class TokenResponse(BaseModel):
     """Response schema for token"""
     access_token: str
     token_type: str
+    refresh_token: str
     admin_id: str
     organization_id: str
     organization_name: str
@@ -60,3 +112,9 @@ class SuccessResponse(BaseModel):
     """Generic success response"""
     message: str
     data: Optional[dict] = None
+
+
+class DataResponse(BaseModel, Generic[T]):
+    """Typed success response (`{"message": ..., "data": ...}`)"""
+    message: str
+    data: T
@@ -0,0 +1,295 @@
+"""
+Production launcher: a pre-fork master running N uvicorn workers
+
+    python -m app.server --workers 4 --max-requests 10000
+
+The master binds the listening socket once and forks the workers, which
+share it (the kernel spreads connections over them). Each worker imports
+the app after the fork (unless --preload) and runs the startup event, so
+it opens its own MongoDB clients; app.db.mongodb drops any client that
+was inherited over the fork.
+
+Signals to the master:
+
+  HUP         graceful reload: start a new set of workers and stop the old
+              ones once the new ones serve (new application code unless
+              --preload; settings are read once, at launch)
+  TERM, INT   graceful shutdown: workers finish in-flight requests for up
+              to --graceful-timeout seconds
+  TTIN, TTOU  one worker more / less
+
+Workers that exit (crashed, or --max-requests reached) are replaced.
+"""
+
+import argparse
+import os
+import select
+import signal
+import time
+from typing import Dict, List, Optional
+import uvicorn
+from app.core.config import settings
+
+
+APP = "app.main:app"
+
+# A worker that dies before serving is replaced after this long, so a
+# broken deploy doesn't fork in a tight loop
+RESPAWN_DELAY_SECONDS = 1.0
+
+
+class _WorkerServer(uvicorn.Server):
+    """uvicorn server that tells the master once it serves"""
+
+    def __init__(self, config: uvicorn.Config, ready_fd: int):
+        super().__init__(config)
+        self.ready_fd = ready_fd
+
+    async def startup(self, sockets=None):
+        await super().startup(sockets=sockets)
+        if not self.should_exit:
+            os.write(self.ready_fd, b"1")
+            os.close(self.ready_fd)
+
+
+class Worker:
+    """A forked worker process, as seen by the master"""
+
+    __slots__ = ("pid", "ready_fd", "started_at", "ready")
+
+    def __init__(self, pid: int, ready_fd: int):
+        self.pid = pid
+        self.ready_fd = ready_fd
+        self.started_at = time.monotonic()
+        self.ready = False
+
+
+class Master:
+    """Pre-fork master: keeps `workers` uvicorn workers running on one socket"""
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        workers: int,
+        max_requests: int,
+        max_requests_jitter: int,
+        graceful_timeout: float,
+        log_level: str = "info",
+    ):
+        self.host = host
+        self.port = port
+        self.target = workers
+        self.max_requests = max_requests
+        self.max_requests_jitter = max_requests_jitter
+        self.graceful_timeout = graceful_timeout
+        self.log_level = log_level
+        self.workers: Dict[int, Worker] = {}
+        # Workers being stopped (reload, scale down, shutdown): pid -> kill deadline
+        self.retiring: Dict[int, float] = {}
+        self._signals: List[int] = []
+        self._wakeup_r, self._wakeup_w = os.pipe()
+        self._next_spawn = 0.0
+        self.sock = None
+
+    # -- master -------------------------------------------------------
+
+    def run(self):
+        """Bind, fork the workers and supervise them until shut down"""
+        self.sock = uvicorn.Config(APP, host=self.host, port=self.port).bind_socket()
+        for sig in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT, signal.SIGTTIN, signal.SIGTTOU):
+            signal.signal(sig, self._on_signal)
+        print(f"✓ Master {os.getpid()} listening on {self.host}:{self.port} with {self.target} workers")
+        for _ in range(self.target):
+            self.spawn()
+
+        stopping = False
+        while not stopping or self.workers or self.retiring:
+            self._reap()
+            while self._signals:
+                sig = self._signals.pop(0)
+                if sig in (signal.SIGTERM, signal.SIGINT) and not stopping:
+                    stopping = True
+                    print("Shutting down workers")
+                    self._retire(list(self.workers))
+                elif sig == signal.SIGHUP and not stopping:
+                    self.reload()
+                elif sig == signal.SIGTTIN and not stopping:
+                    self.target += 1
+                elif sig == signal.SIGTTOU and not stopping and self.target > 1:
+                    self.target -= 1
+            if not stopping:
+                self._scale()
+            self._kill_overdue()
+            self._wait(1.0)
+        self.sock.close()
+        print("✓ Master shut down")
+
+    def _on_signal(self, signum, frame):
+        self._signals.append(signum)
+        os.write(self._wakeup_w, b"s")
+
+    def _wait(self, timeout: float):
+        """Sleep until a signal arrives or `timeout` passes"""
+        readable, _, _ = select.select([self._wakeup_r], [], [], timeout)
+        if readable:
+            os.read(self._wakeup_r, 1024)
+
+    def spawn(self) -> Worker:
+        """Fork one worker"""
+        ready_r, ready_w = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(ready_r)
+            self._run_worker(ready_w)
+        os.close(ready_w)
+        worker = Worker(pid, ready_r)
+        self.workers[pid] = worker
+        return worker
+
+    def _scale(self):
+        """Replace exited workers and apply TTIN/TTOU"""
+        extra = len(self.workers) - self.target
+        if extra > 0:
+            newest = sorted(self.workers.values(), key=lambda w: w.started_at)[-extra:]
+            self._retire([worker.pid for worker in newest])
+        while len(self.workers) < self.target and time.monotonic() >= self._next_spawn:
+            self.spawn()
+
+    def reload(self):
+        """Start a new set of workers, then gracefully stop the old ones"""
+        old = list(self.workers)
+        print(f"Reloading: starting {self.target} new workers")
+        fresh = [self.spawn() for _ in range(self.target)]
+        deadline = time.monotonic() + self.graceful_timeout
+        pending = {worker.ready_fd: worker for worker in fresh}
+        while pending and time.monotonic() < deadline:
+            readable, _, _ = select.select(list(pending), [], [], 0.1)
+            for fd in readable:
+                worker = pending.pop(fd)
+                worker.ready = os.read(fd, 1) == b"1"
+                if not worker.ready:
+                    # The worker exited during startup: keep the old set serving
+                    print(f"✗ New worker {worker.pid} failed to start, keeping the old workers")
+                    self._retire([w.pid for w in fresh])
+                    return
+        self._retire(old)
+        print(f"✓ Reloaded, stopping {len(old)} old workers")
+
+    def _retire(self, pids: List[int]):
+        """Ask workers to finish in-flight requests and exit"""
+        deadline = time.monotonic() + self.graceful_timeout + 5
+        for pid in pids:
+            worker = self.workers.pop(pid, None)
+            if worker is not None:
+                os.close(worker.ready_fd)
+            self.retiring[pid] = deadline
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def _kill_overdue(self):
+        now = time.monotonic()
+        for pid, deadline in list(self.retiring.items()):
+            if now > deadline:
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+
+    def _reap(self):
+        """Collect exited workers"""
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            self.retiring.pop(pid, None)
+            worker = self.workers.pop(pid, None)
+            if worker is None:
+                continue
+            os.close(worker.ready_fd)
+            code = os.waitstatus_to_exitcode(status)
+            if code == 0:
+                print(f"Worker {pid} exited after its request limit, replacing it")
+            else:
+                print(f"✗ Worker {pid} exited with status {code}, replacing it")
+            if time.monotonic() - worker.started_at < RESPAWN_DELAY_SECONDS:
+                self._next_spawn = time.monotonic() + RESPAWN_DELAY_SECONDS
+
+    # -- worker -------------------------------------------------------
+
+    def _run_worker(self, ready_fd: int):
+        """Serve in the forked child until told to stop; never returns"""
+        code = 0
+        try:
+            for sig in (signal.SIGHUP, signal.SIGTTIN, signal.SIGTTOU):
+                signal.signal(sig, signal.SIG_IGN)
+            # uvicorn installs its own TERM/INT handlers (graceful shutdown)
+            for sig in (signal.SIGTERM, signal.SIGINT):
+                signal.signal(sig, signal.SIG_DFL)
+            os.close(self._wakeup_r)
+            os.close(self._wakeup_w)
+            for worker in self.workers.values():
+                os.close(worker.ready_fd)
+            limit = None
+            if self.max_requests > 0:
+                limit = self.max_requests + int.from_bytes(os.urandom(4), "big") % (self.max_requests_jitter + 1)
+            config = uvicorn.Config(
+                APP,
+                limit_max_requests=limit,
+                timeout_graceful_shutdown=self.graceful_timeout,
+                log_level=self.log_level,
+            )
+            _WorkerServer(config, ready_fd).run(sockets=[self.sock])
+        except BaseException as e:
+            print(f"✗ Worker {os.getpid()} failed: {e!r}")
+            code = 1
+        finally:
+            os._exit(code)
+
+
+def default_workers() -> int:
+    """One worker per core"""
+    return len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Run the API with several worker processes")
+    parser.add_argument("--host", default=settings.WEB_HOST)
+    parser.add_argument("--port", type=int, default=settings.WEB_PORT)
+    parser.add_argument(
+        "--workers", type=int, default=settings.WEB_WORKERS or default_workers(), help="default: one per core"
+    )
+    parser.add_argument("--max-requests", type=int, default=settings.WEB_MAX_REQUESTS, help="0 = never restart")
+    parser.add_argument("--max-requests-jitter", type=int, default=settings.WEB_MAX_REQUESTS_JITTER)
+    parser.add_argument("--graceful-timeout", type=float, default=settings.WEB_GRACEFUL_TIMEOUT)
+    parser.add_argument("--log-level", default="info")
+    parser.add_argument(
+        "--preload", action="store_true",
+        help="import the app once in the master (faster worker starts, HUP keeps the old code)",
+    )
+    args = parser.parse_args(argv)
+
+    # N processes each sizing their bcrypt pool to all cores would oversubscribe them
+    if settings.PASSWORD_POOL_WORKERS == 0:
+        settings.PASSWORD_POOL_WORKERS = max(1, default_workers() // args.workers)
+    if args.preload:
+        import app.main  # noqa: F401
+
+    Master(
+        host=args.host,
+        port=args.port,
+        workers=max(1, args.workers),
+        max_requests=args.max_requests,
+        max_requests_jitter=args.max_requests_jitter,
+        graceful_timeout=args.graceful_timeout,
+        log_level=args.log_level,
+    ).run()
+
+
+if __name__ == "__main__":
+    main()
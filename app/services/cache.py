@@ -0,0 +1,59 @@
+from typing import Optional
+from app.core.config import settings
+from app.models.models import Organization
+from app.utils.cache import TTLCache
+
+
+class OrganizationCache:
+    """In-process read-through cache of Organization objects
+    
+    Organizations are indexed by name and by `_id`; both entries point to
+    the same Organization instance, so cache hits skip from_dict entirely.
+    Writers must call invalidate() after changing an organization.
+    """
+    
+    def __init__(self, maxsize: int, ttl: float):
+        self.by_name = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.by_id = TTLCache(maxsize=maxsize, ttl=ttl)
+    
+    def get_by_name(self, organization_name: str) -> Optional[Organization]:
+        """Cached organization by name"""
+        return self.by_name.get(organization_name)
+    
+    def get_by_id(self, org_id: str) -> Optional[Organization]:
+        """Cached organization by _id"""
+        return self.by_id.get(str(org_id))
+    
+    def put(self, org: Organization):
+        """Cache an organization under both keys"""
+        self.by_name.set(org.organization_name, org)
+        self.by_id.set(str(org._id), org)
+    
+    def invalidate(self, organization_name: Optional[str] = None, org_id: Optional[str] = None):
+        """Drop an organization from both indexes"""
+        if organization_name is not None:
+            org = self.by_name.pop(organization_name)
+            if org is not None:
+                self.by_id.pop(str(org._id))
+        if org_id is not None:
+            org = self.by_id.pop(str(org_id))
+            if org is not None:
+                self.by_name.pop(org.organization_name)
+    
+    def clear(self):
+        """Drop all cached organizations"""
+        self.by_name.clear()
+        self.by_id.clear()
+    
+    def stats(self) -> dict:
+        """Hit/miss counters for both indexes"""
+        return {
+            "by_name": self.by_name.stats(),
+            "by_id": self.by_id.stats(),
+        }
+
+
+organization_cache = OrganizationCache(
+    maxsize=settings.ORG_CACHE_SIZE,
+    ttl=settings.ORG_CACHE_TTL_SECONDS,
+)
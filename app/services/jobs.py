@@ -0,0 +1,464 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional
+from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from app.core.config import settings
+from app.db.migration import TenantMigrator
+from app.db.mongodb import mongodb_client, async_mongodb_client, tenant_placements
+from app.models.models import Job
+from app.services.cache import organization_cache
+
+
+def acquire_tenant_lease(org_name: str, holder_id, lease_seconds: int) -> bool:
+    """Take (or renew) the lease that serializes work on one tenant"""
+    now = datetime.utcnow()
+    leases = mongodb_client.get_master_db()["tenant_leases"]
+    try:
+        leases.update_one(
+            {
+                "_id": org_name,
+                "$or": [{"expires_at": {"$lt": now}}, {"job_id": holder_id}],
+            },
+            {
+                "$set": {
+                    "job_id": holder_id,
+                    "expires_at": now + timedelta(seconds=lease_seconds),
+                }
+            },
+            upsert=True,
+        )
+        return True
+    except DuplicateKeyError:
+        return False
+
+
+def release_tenant_lease(org_name: str, holder_id):
+    leases = mongodb_client.get_master_db()["tenant_leases"]
+    leases.delete_one({"_id": org_name, "job_id": holder_id})
+
+
+class LeaseLost(Exception):
+    """The job's claim or tenant lease passed to another worker"""
+
+
+class _LeaseKeeper:
+    """
+    Keeps a running job's heartbeat and tenant lease fresh
+
+    Handlers may block for longer than the lease without reporting
+    progress ($merge/$out copies, dropping a large tenant), so a timer
+    thread renews both every third of the lease. The heartbeat is only
+    renewed for this claim of the job (its `attempts` count); once either
+    renewal fails the job is lost, and check() raises LeaseLost at the
+    handler's next report() and before the result is written.
+    """
+
+    def __init__(self, runner: "JobRunner", job: Job):
+        self.runner = runner
+        self.job = job
+        self.interval = max(runner.lease_seconds / 3, 0.1)
+        self.lost = threading.Event()
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"job-lease-{job._id}", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._done.set()
+        self._thread.join(timeout=5)
+
+    def renew(self):
+        """Refresh the heartbeat and the tenant lease; flags the job as lost if either fails"""
+        claimed = mongodb_client.get_master_db()["jobs"].update_one(
+            {"_id": self.job._id, "status": Job.RUNNING, "attempts": self.job.attempts},
+            {"$set": {"heartbeat_at": datetime.utcnow()}},
+        ).matched_count
+        if not claimed or not self.runner._acquire_lease(self.job):
+            self.lost.set()
+
+    def check(self):
+        """Raise LeaseLost once another worker may have taken over"""
+        if self.lost.is_set():
+            raise LeaseLost(f"Job {self.job._id} lost its lease")
+
+    def _run(self):
+        while not self._done.wait(self.interval) and not self.lost.is_set():
+            try:
+                self.renew()
+            except Exception as e:
+                print(f"Warning: Job {self.job._id} lease renewal failed: {e}")
+
+
+def run_migrate_tenant_data(job: Job, report: Callable[[int, Optional[int]], None]) -> dict:
+    """Copy the tenant's `data` collection into `data_v2`"""
+    orgs_collection = mongodb_client.get_master_db()["organizations"]
+    live = orgs_collection.find_one(
+        {"organization_name": job.organization_name, "deleted_at": None}, {"_id": 1}
+    )
+    if live is None:
+        return {"skipped": "organization deleted"}
+    source_name = job.params.get("source", "data")
+    target_name = job.params.get("target", "data_v2")
+    cluster = mongodb_client.get_tenant_cluster(job.organization_name, refresh=True)
+    mongodb_client.provision_tenant(job.organization_name, target_name, cluster=cluster)
+    source = mongodb_client.get_tenant_collection(job.organization_name, source_name, cluster=cluster)
+    target = mongodb_client.get_tenant_collection(job.organization_name, target_name, cluster=cluster)
+    total = source.estimated_document_count()
+    report(0, total)
+    migrator = TenantMigrator(progress_callback=lambda processed: report(processed, total))
+    result = migrator.copy(source, target)
+    print(f"✓ Migrated tenant data: {result}")
+    return result.to_dict()
+
+
+def run_rebalance_tenant(job: Job, report: Callable[[int, Optional[int]], None]) -> dict:
+    """
+    Move the tenant's data to another cluster
+
+    1. Every tenant collection is streamed to the target cluster while the
+       tenant keeps using the source.
+    2. The organization is marked `moving_to` the target, which makes the
+       tenant's collections read-only (TenantWritesFrozen). The job waits
+       `drop_source_after` seconds (default: the placement cache TTL) for
+       every API process to see that.
+    3. A catch-up pass (TenantMigrator.sync) carries over what the source
+       took during the copy. Nothing routes to the target yet, so it is
+       made an exact copy of the frozen source.
+    4. The placement is switched to the target, which lifts the freeze,
+       and the source is dropped once the same grace period has passed
+       again. From the switch on, the move never writes to the target.
+
+    If the job fails before the switch, the freeze is lifted and the
+    tenant stays on the source.
+    """
+    org_name = job.organization_name
+    orgs_collection = mongodb_client.get_master_db()["organizations"]
+    source_cluster = mongodb_client.get_tenant_cluster(org_name, refresh=True)
+    target_cluster = job.params.get("target") or mongodb_client.place_tenant(org_name)
+    if source_cluster == target_cluster:
+        return {"moved": False, "cluster": source_cluster}
+
+    grace = job.params.get("drop_source_after")
+    if grace is None:
+        grace = settings.ORG_CACHE_TTL_SECONDS
+
+    sources = {
+        name: mongodb_client.get_tenant_collection(org_name, name, cluster=source_cluster)
+        for name in mongodb_client.list_tenant_collections(org_name, cluster=source_cluster)
+    }
+    total = sum(source.estimated_document_count() for source in sources.values())
+    report(0, total)
+
+    copied = 0
+    collections = []
+
+    def wait_for_placement_caches():
+        """Let other processes' cached placements expire (checks the lease)"""
+        deadline = time.monotonic() + grace
+        while time.monotonic() < deadline:
+            time.sleep(min(deadline - time.monotonic(), 5.0))
+            report(copied, total)
+        report(copied, total)
+
+    for name, source in sources.items():
+        mongodb_client.provision_tenant(org_name, name, cluster=target_cluster)
+        target = mongodb_client.get_tenant_collection(org_name, name, cluster=target_cluster)
+        # $merge/$out cannot write to another cluster, so always stream
+        migrator = TenantMigrator(
+            mode="stream",
+            progress_callback=lambda processed, done=copied: report(done + processed, total),
+        )
+        result = migrator.copy(source, target)
+        print(f"✓ Rebalanced tenant data: {result}")
+        copied += result.documents + result.duplicates
+        collections.append(result.to_dict())
+
+    # Raises LeaseLost if another worker took over during the copy
+    report(copied, total)
+    fence = orgs_collection.update_one(
+        {"organization_name": org_name, "deleted_at": None},
+        {"$set": {"moving_to": target_cluster}},
+    )
+    tenant_placements.pop(org_name)
+    if fence.matched_count == 0:
+        # Deleted while moving; the reaper only knows about the source
+        mongodb_client.drop_tenant(org_name, cluster=target_cluster)
+        return {"moved": False, "cluster": source_cluster, "collections": collections}
+
+    try:
+        wait_for_placement_caches()
+        # The source is frozen and the target unused: carry over the writes
+        # the source took during the copy, including collections created since
+        caught_up = []
+        for name in mongodb_client.list_tenant_collections(org_name, cluster=source_cluster):
+            report(copied, total)
+            mongodb_client.provision_tenant(org_name, name, cluster=target_cluster)
+            result = TenantMigrator(mode="stream").sync(
+                mongodb_client.get_tenant_collection(org_name, name, cluster=source_cluster),
+                mongodb_client.get_tenant_collection(org_name, name, cluster=target_cluster),
+            )
+            if result.documents or result.removed:
+                print(f"✓ Caught up tenant data: {result}")
+            caught_up.append(result.to_dict())
+        report(copied, total)
+        org_data = orgs_collection.find_one_and_update(
+            {"organization_name": org_name, "deleted_at": None, "moving_to": target_cluster},
+            {"$set": {"cluster": target_cluster}, "$unset": {"moving_to": ""}},
+            projection={"_id": 1},
+        )
+    except LeaseLost:
+        # The worker that took the job over owns the freeze now
+        raise
+    except Exception:
+        orgs_collection.update_one(
+            {"organization_name": org_name, "moving_to": target_cluster},
+            {"$unset": {"moving_to": ""}},
+        )
+        tenant_placements.pop(org_name)
+        raise
+    tenant_placements.pop(org_name)
+    if org_data is None:
+        # Deleted while moving; the reaper only knows about the source
+        mongodb_client.drop_tenant(org_name, cluster=target_cluster)
+        return {"moved": False, "cluster": source_cluster, "collections": collections}
+    organization_cache.invalidate(organization_name=org_name, org_id=str(org_data["_id"]))
+
+    # Processes that cached the source placement stop reading from it
+    wait_for_placement_caches()
+    # Never drop the source after losing the job to another worker
+    report(copied, total)
+    mongodb_client.drop_tenant(org_name, cluster=source_cluster)
+
+    return {
+        "moved": True,
+        "source": source_cluster,
+        "target": target_cluster,
+        "collections": collections,
+        "caught_up": caught_up,
+    }
+
+
+JOB_HANDLERS: Dict[str, Callable] = {
+    "migrate_tenant_data": run_migrate_tenant_data,
+    "rebalance_tenant": run_rebalance_tenant,
+}
+
+
+class JobRunner:
+    """
+    Runs long tenant operations on a worker pool
+
+    Job state lives in `master_db.jobs`, so any API process can report on
+    it and pick up queued work. A poller thread claims queued jobs (or
+    running jobs whose heartbeat went stale after a crash) and hands them
+    to the pool. Before a job touches a tenant it takes that tenant's
+    lease in `master_db.tenant_leases`; if another job holds it, the job
+    goes back to the queue and is retried later, so two jobs never work
+    on the same tenant at once. While a job runs, its heartbeat and lease
+    are renewed in the background (_LeaseKeeper).
+    """
+
+    def __init__(self, workers: int, lease_seconds: int, poll_interval: float):
+        self.workers = workers
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.worker_id = f"{ObjectId()}"
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._poller: Optional[threading.Thread] = None
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._slots = threading.Semaphore(workers)
+        self._active = 0
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the worker pool and the poller thread"""
+        if self._poller is not None:
+            return
+        self._stopping.clear()
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="job"
+        )
+        self._poller = threading.Thread(target=self._poll_loop, name="job-poller", daemon=True)
+        self._poller.start()
+
+    def stop(self):
+        """Stop claiming jobs and wait for running ones to finish"""
+        self._stopping.set()
+        self._wakeup.set()
+        if self._poller is not None:
+            self._poller.join(timeout=self.poll_interval * 2)
+            self._poller = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def _new_job(self, job_type: str, organization_name: str, params: Optional[dict]) -> Job:
+        if job_type not in JOB_HANDLERS:
+            raise ValueError(f"Unknown job type: {job_type}")
+        return Job(job_type=job_type, organization_name=organization_name, params=params)
+
+    async def enqueue(self, job_type: str, organization_name: str, params: Optional[dict] = None) -> Job:
+        """Persist a new job and wake the poller"""
+        job = self._new_job(job_type, organization_name, params)
+        jobs_collection = async_mongodb_client.get_master_db()["jobs"]
+        await jobs_collection.insert_one({**job.to_dict(), "run_after": job.created_at})
+        self._wakeup.set()
+        return job
+
+    def submit(self, job_type: str, organization_name: str, params: Optional[dict] = None) -> Job:
+        """Persist a new job from synchronous code (CLI commands)"""
+        job = self._new_job(job_type, organization_name, params)
+        jobs_collection = mongodb_client.get_master_db()["jobs"]
+        jobs_collection.insert_one({**job.to_dict(), "run_after": job.created_at})
+        self._wakeup.set()
+        return job
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        """Load a job by id"""
+        if not ObjectId.is_valid(job_id):
+            return None
+        jobs_collection = async_mongodb_client.get_master_db()["jobs"]
+        job_data = await jobs_collection.find_one({"_id": ObjectId(job_id)})
+        return Job.from_dict(job_data) if job_data else None
+
+    def stats(self) -> dict:
+        """Worker pool utilisation"""
+        return {
+            "workers": self.workers,
+            "active": self._active,
+            "running": self._poller is not None,
+        }
+
+    def _poll_loop(self):
+        while not self._stopping.is_set():
+            try:
+                while not self._stopping.is_set() and self._slots.acquire(blocking=False):
+                    job = self._claim_next()
+                    if job is None:
+                        self._slots.release()
+                        break
+                    self._executor.submit(self._execute, job)
+            except Exception as e:
+                print(f"Warning: Job poller error: {e}")
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+    def _claim_next(self) -> Optional[Job]:
+        """Atomically move the oldest runnable job to `running`"""
+        if mongodb_client.get_master_db() is None:
+            return None
+        now = datetime.utcnow()
+        stale = now - timedelta(seconds=self.lease_seconds)
+        job_data = mongodb_client.get_master_db()["jobs"].find_one_and_update(
+            {
+                "$or": [
+                    {"status": Job.QUEUED, "run_after": {"$lte": now}},
+                    {"status": Job.RUNNING, "heartbeat_at": {"$lt": stale}},
+                ]
+            },
+            {
+                "$set": {"status": Job.RUNNING, "worker_id": self.worker_id, "heartbeat_at": now},
+                "$inc": {"attempts": 1},
+            },
+            sort=[("created_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+        return Job.from_dict(job_data) if job_data else None
+
+    @staticmethod
+    def _lease_holder(job: Job) -> str:
+        """Lease holder id of this claim of the job (a reclaimed job is a new holder)"""
+        return f"{job._id}:{job.attempts}"
+
+    def _acquire_lease(self, job: Job) -> bool:
+        """Take (or renew) the tenant lease for this job"""
+        return acquire_tenant_lease(job.organization_name, self._lease_holder(job), self.lease_seconds)
+
+    def _release_lease(self, job: Job):
+        release_tenant_lease(job.organization_name, self._lease_holder(job))
+
+    def _execute(self, job: Job):
+        """Run one claimed job (worker thread)"""
+        jobs_collection = mongodb_client.get_master_db()["jobs"]
+        with self._lock:
+            self._active += 1
+        try:
+            if not self._acquire_lease(job):
+                # Tenant is busy with another job; requeue
+                jobs_collection.update_one(
+                    {"_id": job._id},
+                    {
+                        "$set": {
+                            "status": Job.QUEUED,
+                            "run_after": datetime.utcnow() + timedelta(seconds=self.poll_interval),
+                        }
+                    },
+                )
+                return
+
+            # Writes below only apply while this claim still owns the job
+            claim = {"_id": job._id, "attempts": job.attempts}
+            started_at = job.started_at or datetime.utcnow()
+            jobs_collection.update_one(claim, {"$set": {"started_at": started_at}})
+            keeper = _LeaseKeeper(self, job)
+            keeper.start()
+
+            def report(processed: int, total: Optional[int] = None):
+                keeper.check()
+                update = {"documents_processed": processed, "heartbeat_at": datetime.utcnow()}
+                if total is not None:
+                    update["documents_total"] = total
+                jobs_collection.update_one(claim, {"$set": update})
+
+            try:
+                result = JOB_HANDLERS[job.job_type](job, report)
+                keeper.stop()
+                keeper.check()
+                jobs_collection.update_one(
+                    claim,
+                    {
+                        "$set": {
+                            "status": Job.SUCCEEDED,
+                            "result": result,
+                            "finished_at": datetime.utcnow(),
+                        }
+                    },
+                )
+            except LeaseLost as e:
+                # Another worker owns the job now; leave its state alone
+                print(f"Warning: {e}, abandoning it")
+            except Exception as e:
+                print(f"Warning: Job {job._id} ({job.job_type}) failed: {e}")
+                jobs_collection.update_one(
+                    claim,
+                    {
+                        "$set": {
+                            "status": Job.FAILED,
+                            "error": str(e),
+                            "finished_at": datetime.utcnow(),
+                        }
+                    },
+                )
+            finally:
+                keeper.stop()
+                self._release_lease(job)
+        except Exception as e:
+            print(f"Warning: Job {job._id} could not be executed: {e}")
+        finally:
+            with self._lock:
+                self._active -= 1
+            self._slots.release()
+            self._wakeup.set()
+
+
+job_runner = JobRunner(
+    workers=settings.JOB_WORKERS,
+    lease_seconds=settings.JOB_LEASE_SECONDS,
+    poll_interval=settings.JOB_POLL_INTERVAL_SECONDS,
+)
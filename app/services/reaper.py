@@ -0,0 +1,174 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Optional
+from pymongo import ReturnDocument
+from app.core.config import settings
+from app.db.mongodb import mongodb_client, tenant_placements
+from app.db.placement import DEFAULT_CLUSTER
+from app.services.jobs import acquire_tenant_lease, release_tenant_lease
+
+
+# Organization documents that have been deleted but whose tenant data
+# has not been dropped yet
+TOMBSTONE_FILTER = {"deleted_at": {"$type": "date"}}
+
+
+class TenantReaper:
+    """
+    Drops the tenant storage of deleted organizations in the background
+
+    Deleting an organization only marks its document with `deleted_at`
+    (a tombstone), which hides it from every read and keeps the name
+    reserved. The reaper claims tombstones whose `reap_after` has passed,
+    drops the tenant data on at most `concurrency` threads while holding
+    the tenant lease, and then removes the organization document. Failed
+    drops are retried with exponential backoff, up to `max_backoff`
+    seconds apart.
+    """
+
+    def __init__(self, concurrency: int, lease_seconds: int, poll_interval: float, max_backoff: float):
+        self.concurrency = concurrency
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.max_backoff = max_backoff
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._poller: Optional[threading.Thread] = None
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._slots = threading.Semaphore(concurrency)
+        self._lock = threading.Lock()
+        self._active = 0
+        self._queue_depth = 0
+        self._reaped = 0
+        self._failures = 0
+        self._total_drop = 0.0
+        self._max_drop = 0.0
+        self._last_drop = 0.0
+
+    def start(self):
+        """Start the drop pool and the poller thread"""
+        if self._poller is not None:
+            return
+        self._stopping.clear()
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.concurrency, thread_name_prefix="reaper"
+        )
+        self._poller = threading.Thread(target=self._poll_loop, name="reaper-poller", daemon=True)
+        self._poller.start()
+
+    def stop(self):
+        """Stop claiming tombstones and wait for running drops to finish"""
+        self._stopping.set()
+        self._wakeup.set()
+        if self._poller is not None:
+            self._poller.join(timeout=self.poll_interval * 2)
+            self._poller = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def wakeup(self):
+        """Check for new tombstones now instead of at the next poll"""
+        self._wakeup.set()
+
+    def stats(self) -> dict:
+        """Tombstone backlog and drop timings"""
+        reaped = self._reaped
+        return {
+            "concurrency": self.concurrency,
+            "active": self._active,
+            "queue_depth": self._queue_depth,
+            "reaped": reaped,
+            "failures": self._failures,
+            "avg_drop_ms": round(self._total_drop / reaped * 1000, 2) if reaped else 0.0,
+            "max_drop_ms": round(self._max_drop * 1000, 2),
+            "last_drop_ms": round(self._last_drop * 1000, 2),
+            "running": self._poller is not None,
+        }
+
+    def _poll_loop(self):
+        while not self._stopping.is_set():
+            try:
+                if mongodb_client.get_master_db() is not None:
+                    orgs_collection = mongodb_client.get_master_db()["organizations"]
+                    self._queue_depth = orgs_collection.count_documents(TOMBSTONE_FILTER)
+                    while not self._stopping.is_set() and self._slots.acquire(blocking=False):
+                        tombstone = self._claim_next()
+                        if tombstone is None:
+                            self._slots.release()
+                            break
+                        self._executor.submit(self._reap, tombstone)
+            except Exception as e:
+                print(f"Warning: Tenant reaper poller error: {e}")
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+    def _claim_next(self) -> Optional[dict]:
+        """Atomically claim the oldest due tombstone"""
+        now = datetime.utcnow()
+        return mongodb_client.get_master_db()["organizations"].find_one_and_update(
+            {**TOMBSTONE_FILTER, "reap_after": {"$lte": now}},
+            # Push reap_after out so other processes skip it while it is dropped
+            {"$set": {"reap_after": now + timedelta(seconds=self.lease_seconds)}},
+            sort=[("reap_after", 1)],
+            projection={"organization_name": 1, "cluster": 1, "reap_attempts": 1},
+            return_document=ReturnDocument.AFTER,
+        )
+
+    def _reschedule(self, tombstone: dict, delay: float, error: Optional[str] = None):
+        update = {"$set": {"reap_after": datetime.utcnow() + timedelta(seconds=delay)}}
+        if error is not None:
+            update["$set"]["reap_error"] = error
+            update["$inc"] = {"reap_attempts": 1}
+        mongodb_client.get_master_db()["organizations"].update_one({"_id": tombstone["_id"]}, update)
+
+    def _reap(self, tombstone: dict):
+        """Drop one tenant and remove its tombstone (worker thread)"""
+        org_name = tombstone["organization_name"]
+        with self._lock:
+            self._active += 1
+        try:
+            if not acquire_tenant_lease(org_name, tombstone["_id"], self.lease_seconds):
+                # A job is still working on this tenant
+                self._reschedule(tombstone, self.poll_interval)
+                return
+            try:
+                start = time.perf_counter()
+                mongodb_client.drop_tenant(org_name, cluster=tombstone.get("cluster") or DEFAULT_CLUSTER)
+                elapsed = time.perf_counter() - start
+                mongodb_client.get_master_db()["organizations"].delete_one({"_id": tombstone["_id"]})
+                tenant_placements.pop(org_name)
+                with self._lock:
+                    self._reaped += 1
+                    self._total_drop += elapsed
+                    self._max_drop = max(self._max_drop, elapsed)
+                    self._last_drop = elapsed
+            except Exception as e:
+                attempts = tombstone.get("reap_attempts", 0) + 1
+                print(f"Warning: Dropping tenant {org_name} failed (attempt {attempts}): {e}")
+                with self._lock:
+                    self._failures += 1
+                self._reschedule(
+                    tombstone,
+                    min(self.max_backoff, self.poll_interval * 2 ** attempts),
+                    error=str(e),
+                )
+            finally:
+                release_tenant_lease(org_name, tombstone["_id"])
+        except Exception as e:
+            print(f"Warning: Tombstone for {org_name} could not be processed: {e}")
+        finally:
+            with self._lock:
+                self._active -= 1
+            self._slots.release()
+            self._wakeup.set()
+
+
+tenant_reaper = TenantReaper(
+    concurrency=settings.REAPER_CONCURRENCY,
+    lease_seconds=settings.JOB_LEASE_SECONDS,
+    poll_interval=settings.REAPER_POLL_INTERVAL_SECONDS,
+    max_backoff=settings.REAPER_MAX_BACKOFF_SECONDS,
+)
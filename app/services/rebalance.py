@@ -0,0 +1,99 @@
+"""
+Move tenants between clusters.
+
+Without arguments, every tenant whose recorded cluster differs from its
+hash-ring placement is moved, which is what you want after adding a
+cluster to MONGODB_CLUSTERS. Each move runs as a `rebalance_tenant` job,
+so it holds the tenant lease and shows up under /jobs/{job_id}. Jobs are
+picked up by the running API workers, or by this command with --wait.
+
+Usage:
+    python -m app.services.rebalance --dry-run
+    python -m app.services.rebalance --wait
+    python -m app.services.rebalance --tenant acme --to eu-2 --wait
+"""
+
+import argparse
+import time
+from typing import List, Optional, Tuple
+
+from app.db.mongodb import mongodb_client
+from app.db.placement import DEFAULT_CLUSTER, cluster_urls
+from app.models.models import Job
+from app.services.jobs import job_runner
+
+
+def plan_moves(tenant: Optional[str] = None, target: Optional[str] = None) -> List[Tuple[str, str, str]]:
+    """(organization_name, source cluster, target cluster) for every tenant to move"""
+    query = {"deleted_at": None}
+    if tenant:
+        query["organization_name"] = tenant
+    orgs = mongodb_client.get_master_db()["organizations"].find(
+        query, {"organization_name": 1, "cluster": 1}
+    )
+    moves = []
+    for org_data in orgs:
+        name = org_data["organization_name"]
+        source = org_data.get("cluster") or DEFAULT_CLUSTER
+        destination = target or mongodb_client.place_tenant(name)
+        if source != destination:
+            moves.append((name, source, destination))
+    return moves
+
+
+def wait_for(jobs: List[Job], poll_interval: float = 1.0):
+    """Run the jobs on a local worker pool and print their progress"""
+    jobs_collection = mongodb_client.get_master_db()["jobs"]
+    pending = {job._id: job.organization_name for job in jobs}
+    job_runner.start()
+    try:
+        while pending:
+            time.sleep(poll_interval)
+            for job_data in jobs_collection.find({"_id": {"$in": list(pending)}}):
+                job = Job.from_dict(job_data)
+                if job.status in (Job.SUCCEEDED, Job.FAILED):
+                    print(f"{pending.pop(job._id)}: {job.status} {job.error or job.result}")
+    finally:
+        job_runner.stop()
+
+
+def main(args):
+    if args.to and args.to not in cluster_urls():
+        raise SystemExit(f"Unknown cluster: {args.to}")
+    mongodb_client.connect()
+    try:
+        moves = plan_moves(args.tenant, args.to)
+        for name, source, target in moves:
+            print(f"{name}: {source} -> {target}")
+        if not moves:
+            print("Nothing to move")
+        if args.dry_run or not moves:
+            return
+        jobs = [
+            job_runner.submit(
+                "rebalance_tenant",
+                name,
+                params={"target": target, "drop_source_after": args.drop_source_after},
+            )
+            for name, _, target in moves
+        ]
+        print(f"Queued {len(jobs)} rebalance jobs")
+        if args.wait:
+            wait_for(jobs)
+    finally:
+        mongodb_client.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tenant", help="move only this organization")
+    parser.add_argument("--to", help="target cluster (default: hash-ring placement)")
+    parser.add_argument("--dry-run", action="store_true", help="print the plan only")
+    parser.add_argument("--wait", action="store_true", help="run the jobs here and wait for them")
+    parser.add_argument(
+        "--drop-source-after",
+        type=float,
+        default=None,
+        help="seconds to keep the source copy after switching (default: placement cache TTL)",
+    )
+    main(parser.parse_args())
@@ -1,12 +1,210 @@
-from typing import Optional, Tuple
-from pymongo.errors import DuplicateKeyError
+import asyncio
+import base64
+import binascii
+import json
+import re
+import weakref
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional, Tuple
+from pymongo import InsertOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 from bson import ObjectId
-from app.db.mongodb import mongodb_client
-from app.models.models import Organization, AdminUser
-from app.core.password import hash_password, verify_password
+from app.core.config import settings
+from app.db.mongodb import PLACEMENT_PROJECTION, mongodb_client, async_mongodb_client, placement_of
+from app.db.migration import RAW_CODEC_OPTIONS, TenantMigrator
+from app.db.tenancy import TenantWritesFrozen
+from app.models.models import Organization, AdminUser, Job
+from app.services.cache import organization_cache
+from app.services.jobs import job_runner
+from app.services.reaper import tenant_reaper
+from app.services.throttle import login_throttle, LoginThrottled
+from app.core.password import (
+    hash_password,
+    verify_password,
+    hash_password_async,
+    verify_password_async,
+    password_pool,
+    PasswordPoolBusy,
+    needs_rehash,
+)
+from app.core.security import create_refresh_token, hash_refresh_token
 from app.utils.validators import sanitize_org_name, validate_org_name
 
 
+def _build_organization(
+    organization_name: str, email: str, hashed_password: str, cluster: str
+) -> Tuple[Organization, AdminUser]:
+    """Build an organization and its admin with ids assigned client-side"""
+    org = Organization(
+        organization_name=organization_name,
+        collection_name=f"org_{sanitize_org_name(organization_name)}",
+        admin_id="",
+        cluster=cluster,
+    )
+    admin_user = AdminUser(
+        email=email,
+        hashed_password=hashed_password,
+        organization_id=str(org._id),
+    )
+    org.admin_id = str(admin_user._id)
+    return org, admin_user
+
+
+def _rollback_create(master_db, org: Organization, admin_user: AdminUser):
+    """Remove what a failed create wrote, so the name and email are free again
+
+    Deletes by the client-side ids, which never match another
+    organization's documents, whether or not the insert happened.
+    """
+    try:
+        master_db["admin_users"].delete_one({"_id": admin_user._id})
+        master_db["organizations"].delete_one({"_id": org._id})
+    except Exception as e:
+        print(f"Warning: Could not roll back organization {org.organization_name}: {e}")
+
+
+async def _rollback_create_async(master_db, org: Organization, admin_user: AdminUser):
+    """Async _rollback_create"""
+    try:
+        await master_db["admin_users"].delete_one({"_id": admin_user._id})
+        await master_db["organizations"].delete_one({"_id": org._id})
+    except Exception as e:
+        print(f"Warning: Could not roll back organization {org.organization_name}: {e}")
+
+
+def _duplicate_key_message(error: DuplicateKeyError) -> str:
+    """Map a unique-index violation to a client-facing message"""
+    key_pattern = (error.details or {}).get("keyPattern") or {}
+    if "organization_name" in key_pattern or "organization_name" in str(error):
+        return "Organization already exists"
+    return "Email already registered"
+
+
+# Fields each read path needs; everything else stays on the server
+ORGANIZATION_PROJECTION = {field: 1 for field in Organization.FIELDS}
+ORGANIZATION_VERSION_PROJECTION = {"_id": 1, "version": 1}
+ADMIN_AUTH_PROJECTION = {"email": 1, "hashed_password": 1, "organization_id": 1}
+ADMIN_PROJECTION = {"hashed_password": 0}
+
+
+def _raw(collection):
+    """Collection view returning undecoded documents, for lazily decoded models"""
+    return collection.with_options(codec_options=RAW_CODEC_OPTIONS)
+
+
+# Organization fields /org/list can return
+LISTABLE_FIELDS = tuple(field for field in Organization.FIELDS if field != "_id")
+
+
+def encode_cursor(organization_name: str) -> str:
+    """Opaque /org/list cursor pointing after an organization name"""
+    raw = json.dumps({"after": organization_name}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> str:
+    """Organization name encoded in a cursor; raises ValueError if malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        after = json.loads(raw)["after"]
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(after, str):
+        raise ValueError("Invalid cursor")
+    return after
+
+
+# Pool slots shared by all bulk creates, per event loop
+_bulk_hash_slots = weakref.WeakKeyDictionary()
+
+
+def _bulk_hash_semaphore() -> asyncio.Semaphore:
+    """Limit on concurrent bulk-create hashes (BULK_HASH_CONCURRENCY)
+
+    Kept below the pool size so a large batch never occupies every bcrypt
+    worker and interactive logins and creates still get one.
+    """
+    loop = asyncio.get_running_loop()
+    slots = _bulk_hash_slots.get(loop)
+    if slots is None:
+        limit = settings.BULK_HASH_CONCURRENCY or password_pool.workers // 2
+        slots = _bulk_hash_slots[loop] = asyncio.Semaphore(max(1, min(limit, password_pool.workers - 1)))
+    return slots
+
+
+# Running background rehashes, referenced until they finish
+_rehash_tasks = set()
+
+
+async def _rehash_password(admin_id: ObjectId, old_hash: str, password: str):
+    """Store the password hashed at BCRYPT_ROUNDS, unless it changed meanwhile"""
+    try:
+        new_hash = await hash_password_async(password)
+        await async_mongodb_client.get_master_db()["admin_users"].update_one(
+            {"_id": admin_id, "hashed_password": old_hash},
+            {"$set": {"hashed_password": new_hash}},
+        )
+    except PasswordPoolBusy:
+        pass  # Tried again on the next login
+    except Exception as e:
+        print(f"Warning: Password rehash failed: {e}")
+
+
+def _schedule_rehash(admin_user: AdminUser, password: str):
+    """Rehash after the response when the stored cost differs from BCRYPT_ROUNDS"""
+    if needs_rehash(admin_user.hashed_password):
+        task = asyncio.create_task(
+            _rehash_password(admin_user._id, admin_user.hashed_password, password)
+        )
+        _rehash_tasks.add(task)
+        task.add_done_callback(_rehash_tasks.discard)
+
+
+def _login_pipeline(email: str) -> list:
+    """
+    Aggregation that fetches an admin and their organization in one round trip
+    
+    Only the fields needed to verify the password and build the access
+    token are projected.
+    """
+    return [
+        {"$match": {"email": email}},
+        {"$limit": 1},
+        {
+            "$lookup": {
+                "from": "organizations",
+                "let": {
+                    "org_id": {
+                        "$convert": {
+                            "input": "$organization_id",
+                            "to": "objectId",
+                            "onError": None,
+                            "onNull": None,
+                        }
+                    }
+                },
+                "pipeline": [
+                    # A tombstoned organization logs nobody in, even if
+                    # removing its admins lagged or failed
+                    {"$match": {"$expr": {"$eq": ["$_id", "$$org_id"]}, "deleted_at": None}},
+                    {"$limit": 1},
+                    {"$project": {"_id": 1, "organization_name": 1}},
+                ],
+                "as": "organization",
+            }
+        },
+        {
+            "$project": {
+                "_id": 1,
+                "email": 1,
+                "hashed_password": 1,
+                "organization_id": 1,
+                "organization": 1,
+            }
+        },
+    ]
+
+
 class OrganizationService:
     """Service for organization operations"""
     
@@ -17,6 +215,10 @@ class OrganizationService:
         """
         Create a new organization with admin user
         
+        Uniqueness of the organization name and admin email is enforced by
+        the unique indexes, so there is no pre-check and no re-read: the
+        in-memory Organization is returned once both documents are written.
+        
         Returns:
             Tuple[success: bool, organization: Organization, message: str]
         """
@@ -27,51 +229,40 @@ class OrganizationService:
             
             master_db = mongodb_client.get_master_db()
             orgs_collection = master_db["organizations"]
-            
-            # Check if organization already exists
-            existing_org = orgs_collection.find_one(
-                {"organization_name": organization_name}
-            )
-            if existing_org:
-                return False, None, "Organization already exists"
-            
-            # Create admin user
-            hashed_password = hash_password(password)
-            admin_user = AdminUser(
-                email=email,
-                hashed_password=hashed_password,
-                organization_id=str(ObjectId()),  # Temporary, will update after org creation
-            )
-            
-            # Create organization
-            collection_name = f"org_{sanitize_org_name(organization_name)}"
-            org = Organization(
-                organization_name=organization_name,
-                collection_name=collection_name,
-                admin_id=str(admin_user._id),
-            )
-            
-            # Insert organization
-            org_result = orgs_collection.insert_one(org.to_dict())
-            org_id = str(org_result.inserted_id)
-            
-            # Update admin user with organization ID and insert
-            admin_user.organization_id = org_id
             admin_users_collection = master_db["admin_users"]
-            admin_users_collection.insert_one(admin_user.to_dict())
             
-            # Create tenant database collection (creates database if not exists)
-            tenant_db = mongodb_client.get_tenant_db(organization_name)
-            tenant_db.create_collection("data")
+            org, admin_user = _build_organization(
+                organization_name,
+                email,
+                hash_password(password),
+                mongodb_client.place_tenant(organization_name),
+            )
             
-            # Retrieve the created organization
-            org_data = orgs_collection.find_one({"_id": ObjectId(org_id)})
-            created_org = Organization.from_dict(org_data)
+            # Insert organization and admin user, then create tenant storage
+            # (database/collection per tenancy strategy); any failure undoes
+            # the inserts so the name isn't left reserved
+            try:
+                if settings.USE_TRANSACTIONS and mongodb_client.supports_transactions:
+                    def write(session):
+                        orgs_collection.insert_one(org.to_dict(), session=session)
+                        admin_users_collection.insert_one(admin_user.to_dict(), session=session)
+                    
+                    with mongodb_client.client.start_session() as session:
+                        session.with_transaction(write)
+                else:
+                    orgs_collection.insert_one(org.to_dict())
+                    admin_users_collection.insert_one(admin_user.to_dict())
+                
+                mongodb_client.provision_tenant(organization_name, cluster=org.cluster)
+            except Exception:
+                _rollback_create(master_db, org, admin_user)
+                raise
             
-            return True, created_org, "Organization created successfully"
+            organization_cache.put(org)
+            return True, org, "Organization created successfully"
             
-        except DuplicateKeyError:
-            return False, None, "Email already registered"
+        except DuplicateKeyError as e:
+            return False, None, _duplicate_key_message(e)
         except Exception as e:
             return False, None, f"Error creating organization: {str(e)}"
     
@@ -84,17 +275,23 @@ class OrganizationService:
             Tuple[success: bool, organization: Organization, message: str]
         """
         try:
+            cached_org = organization_cache.get_by_name(organization_name)
+            if cached_org is not None:
+                return True, cached_org, "Organization retrieved successfully"
+            
             master_db = mongodb_client.get_master_db()
             orgs_collection = master_db["organizations"]
             
-            org_data = orgs_collection.find_one(
-                {"organization_name": organization_name}
+            org_data = _raw(orgs_collection).find_one(
+                {"organization_name": organization_name, "deleted_at": None},
+                ORGANIZATION_PROJECTION,
             )
             
-            if not org_data:
+            if org_data is None:
                 return False, None, "Organization not found"
             
             org = Organization.from_dict(org_data)
+            organization_cache.put(org)
             return True, org, "Organization retrieved successfully"
             
         except Exception as e:
@@ -117,31 +314,33 @@ class OrganizationService:
             
             # Get existing organization
             org_data = orgs_collection.find_one(
-                {"organization_name": organization_name}
+                {"organization_name": organization_name, "deleted_at": None},
+                {"_id": 1, **PLACEMENT_PROJECTION},
             )
             
             if not org_data:
                 return False, None, "Organization not found"
             
             org_id = str(org_data["_id"])
-            old_collection_name = org_data["collection_name"]
+            cluster, frozen = placement_of(org_data)
+            
+            # Hash before any write: a full pool (PasswordPoolBusy) must
+            # leave the organization untouched
+            hashed_password = hash_password(password)
             
             # Create new collection name
             new_collection_name = f"org_{sanitize_org_name(organization_name)}_v2"
             
             # Migrate data from old collection to new collection
             try:
-                old_db = mongodb_client.get_tenant_db(organization_name)
-                old_collection = old_db[old_collection_name.replace("org_", "").replace(f"_{sanitize_org_name(organization_name)}", "")]
-                
-                new_db = mongodb_client.get_tenant_db(organization_name)
-                new_collection = new_db["data_v2"]
-                
-                # Copy all documents
-                if old_collection.count_documents({}) > 0:
-                    documents = list(old_collection.find({}))
-                    if documents:
-                        new_collection.insert_many(documents)
+                if frozen:
+                    raise TenantWritesFrozen(f"Tenant {organization_name} is being moved")
+                mongodb_client.provision_tenant(organization_name, "data_v2", cluster=cluster)
+                result = TenantMigrator().copy(
+                    mongodb_client.get_tenant_collection(organization_name, "data", cluster=cluster),
+                    mongodb_client.get_tenant_collection(organization_name, "data_v2", cluster=cluster),
+                )
+                print(f"✓ Migrated tenant data: {result}")
             except Exception as migration_error:
                 # If migration fails, still allow update but log the error
                 print(f"Warning: Data migration failed: {migration_error}")
@@ -152,19 +351,24 @@ class OrganizationService:
                 {
                     "$set": {
                         "collection_name": new_collection_name,
-                    }
+                    },
+                    # New ETag for /org/get
+                    "$inc": {"version": 1},
                 },
             )
+            organization_cache.invalidate(organization_name=organization_name, org_id=org_id)
             
-            # Update admin password
-            hashed_password = hash_password(password)
+            # Update admin password; sessions started with the old one end
             admin_users_collection.update_one(
                 {"organization_id": org_id, "email": email},
                 {"$set": {"hashed_password": hashed_password}},
             )
+            master_db["refresh_tokens"].delete_many({"organization_id": org_id, "email": email})
             
             # Retrieve updated organization
-            updated_org_data = orgs_collection.find_one({"_id": ObjectId(org_id)})
+            updated_org_data = _raw(orgs_collection).find_one(
+                {"_id": ObjectId(org_id)}, ORGANIZATION_PROJECTION
+            )
             updated_org = Organization.from_dict(updated_org_data)
             
             return True, updated_org, "Organization updated successfully"
@@ -177,6 +381,9 @@ class OrganizationService:
         """
         Delete organization and its collections
         
+        The organization is tombstoned and its admins removed right away;
+        dropping the tenant data is left to the tenant reaper.
+        
         Returns:
             Tuple[success: bool, message: str]
         """
@@ -185,9 +392,12 @@ class OrganizationService:
             orgs_collection = master_db["organizations"]
             admin_users_collection = master_db["admin_users"]
             
-            # Get organization
-            org_data = orgs_collection.find_one(
-                {"organization_name": organization_name}
+            # Tombstone the organization; the tenant reaper drops its data
+            now = datetime.utcnow()
+            org_data = orgs_collection.find_one_and_update(
+                {"organization_name": organization_name, "deleted_at": None},
+                {"$set": {"deleted_at": now, "reap_after": now, "reap_attempts": 0}},
+                projection={"_id": 1},
             )
             
             if not org_data:
@@ -195,20 +405,13 @@ class OrganizationService:
             
             org_id = str(org_data["_id"])
             
-            # Delete admin users
+            # Delete admin users and their refresh tokens
             admin_users_collection.delete_many({"organization_id": org_id})
+            master_db["refresh_tokens"].delete_many({"organization_id": org_id})
+            organization_cache.invalidate(organization_name=organization_name, org_id=org_id)
+            tenant_reaper.wakeup()
             
-            # Delete organization
-            orgs_collection.delete_one({"_id": ObjectId(org_id)})
-            
-            # Drop tenant database
-            try:
-                tenant_db = mongodb_client.get_tenant_db(organization_name)
-                mongodb_client.client.drop_database(tenant_db.name)
-            except Exception as db_error:
-                print(f"Warning: Failed to drop database: {db_error}")
-            
-            return True, "Organization deleted successfully"
+            return True, "Organization deletion accepted"
             
         except Exception as e:
             return False, f"Error deleting organization: {str(e)}"
@@ -218,30 +421,51 @@ class AdminUserService:
     """Service for admin user operations"""
     
     @staticmethod
-    def authenticate(email: str, password: str) -> Tuple[bool, Optional[AdminUser], str]:
+    def authenticate(
+        email: str, password: str, client_ip: Optional[str] = None
+    ) -> Tuple[bool, Optional[AdminUser], str]:
         """
         Authenticate admin user
         
+        Raises LoginThrottled, before any database read or bcrypt call,
+        when the client IP or email is over its login rate or locked out.
+        A stored hash with another cost than BCRYPT_ROUNDS is replaced
+        after a successful login.
+        
         Returns:
             Tuple[success: bool, admin_user: AdminUser, message: str]
         """
         try:
+            login_throttle.check(email, client_ip)
+            
             master_db = mongodb_client.get_master_db()
             admin_users_collection = master_db["admin_users"]
             
-            admin_data = admin_users_collection.find_one({"email": email})
+            admin_data = admin_users_collection.find_one({"email": email}, ADMIN_AUTH_PROJECTION)
             
             if not admin_data:
+                login_throttle.record_failure(email, client_ip)
                 return False, None, "Invalid email or password"
             
             admin_user = AdminUser.from_dict(admin_data)
             
             # Verify password
             if not verify_password(password, admin_user.hashed_password):
+                login_throttle.record_failure(email, client_ip)
                 return False, None, "Invalid email or password"
             
+            login_throttle.record_success(email)
+            
+            # Bring the stored hash to BCRYPT_ROUNDS (unless changed meanwhile)
+            if needs_rehash(admin_user.hashed_password):
+                admin_users_collection.update_one(
+                    {"_id": admin_user._id, "hashed_password": admin_user.hashed_password},
+                    {"$set": {"hashed_password": hash_password(password)}},
+                )
             return True, admin_user, "Authentication successful"
             
+        except LoginThrottled:
+            raise
         except Exception as e:
             return False, None, f"Error authenticating user: {str(e)}"
     
@@ -252,9 +476,11 @@ class AdminUserService:
             master_db = mongodb_client.get_master_db()
             admin_users_collection = master_db["admin_users"]
             
-            admin_data = admin_users_collection.find_one({"_id": ObjectId(admin_id)})
+            admin_data = _raw(admin_users_collection).find_one(
+                {"_id": ObjectId(admin_id)}, ADMIN_PROJECTION
+            )
             
-            if not admin_data:
+            if admin_data is None:
                 return False, None, "Admin user not found"
             
             admin_user = AdminUser.from_dict(admin_data)
@@ -271,20 +497,712 @@ class AdminUserService:
             admin_users_collection = master_db["admin_users"]
             orgs_collection = master_db["organizations"]
             
-            admin_data = admin_users_collection.find_one({"_id": ObjectId(admin_id)})
+            admin_data = admin_users_collection.find_one(
+                {"_id": ObjectId(admin_id)}, {"organization_id": 1}
+            )
             
             if not admin_data:
                 return False, None, "Admin not found"
             
-            org_data = orgs_collection.find_one(
-                {"_id": ObjectId(admin_data["organization_id"])}
+            org = organization_cache.get_by_id(admin_data["organization_id"])
+            if org is None:
+                org_data = _raw(orgs_collection).find_one(
+                    {"_id": ObjectId(admin_data["organization_id"]), "deleted_at": None},
+                    ORGANIZATION_PROJECTION,
+                )
+                
+                if org_data is None:
+                    return False, None, "Organization not found"
+                
+                org = Organization.from_dict(org_data)
+                organization_cache.put(org)
+            
+            return True, org, "Organization retrieved"
+            
+        except Exception as e:
+            return False, None, f"Error retrieving organization: {str(e)}"
+
+
+class AsyncOrganizationService:
+    """Async (Motor) counterpart of OrganizationService used by the API routes"""
+    
+    @staticmethod
+    async def create_organization(
+        organization_name: str, email: str, password: str
+    ) -> Tuple[bool, Optional[Organization], str]:
+        """
+        Create a new organization with admin user
+        
+        Uniqueness of the organization name and admin email is enforced by
+        the unique indexes, so there is no pre-check and no re-read: the
+        in-memory Organization is returned once both documents are written.
+        
+        Returns:
+            Tuple[success: bool, organization: Organization, message: str]
+        """
+        try:
+            # Validate organization name
+            if not validate_org_name(organization_name):
+                return False, None, "Invalid organization name format"
+            
+            master_db = async_mongodb_client.get_master_db()
+            orgs_collection = master_db["organizations"]
+            admin_users_collection = master_db["admin_users"]
+            
+            org, admin_user = _build_organization(
+                organization_name,
+                email,
+                await hash_password_async(password),
+                async_mongodb_client.place_tenant(organization_name),
             )
             
-            if not org_data:
+            # Insert organization and admin user, then create tenant storage
+            # (database/collection per tenancy strategy); any failure undoes
+            # the inserts so the name isn't left reserved
+            try:
+                if settings.USE_TRANSACTIONS and async_mongodb_client.supports_transactions:
+                    async def write(session):
+                        await orgs_collection.insert_one(org.to_dict(), session=session)
+                        await admin_users_collection.insert_one(admin_user.to_dict(), session=session)
+                    
+                    async with await async_mongodb_client.client.start_session() as session:
+                        await session.with_transaction(write)
+                else:
+                    await orgs_collection.insert_one(org.to_dict())
+                    await admin_users_collection.insert_one(admin_user.to_dict())
+                
+                await async_mongodb_client.provision_tenant(organization_name, cluster=org.cluster)
+            except Exception:
+                await _rollback_create_async(master_db, org, admin_user)
+                raise
+            
+            organization_cache.put(org)
+            return True, org, "Organization created successfully"
+            
+        except PasswordPoolBusy:
+            raise
+        except DuplicateKeyError as e:
+            return False, None, _duplicate_key_message(e)
+        except Exception as e:
+            return False, None, f"Error creating organization: {str(e)}"
+    
+    @staticmethod
+    async def bulk_create_organizations(items: List[Tuple[str, str, str]]) -> List[dict]:
+        """
+        Create many organizations at once, without stopping at the first error
+        
+        Passwords are hashed concurrently on the password pool, the
+        organization and admin documents are written with unordered
+        bulk_write calls, and tenant databases are provisioned
+        concurrently.
+        
+        Args:
+            items: (organization_name, email, password) tuples
+        
+        Returns:
+            One result dict per item, in input order
+        """
+        results = [
+            {"organization_name": name, "success": False, "message": ""}
+            for name, _, _ in items
+        ]
+        
+        # Validate names and reject duplicates inside the batch
+        pending = []
+        seen_names, seen_emails = set(), set()
+        for index, (organization_name, email, password) in enumerate(items):
+            if not validate_org_name(organization_name):
+                results[index]["message"] = "Invalid organization name format"
+            elif organization_name in seen_names:
+                results[index]["message"] = "Duplicate organization name in request"
+            elif email in seen_emails:
+                results[index]["message"] = "Duplicate email in request"
+            else:
+                seen_names.add(organization_name)
+                seen_emails.add(email)
+                pending.append(index)
+        
+        # Hash passwords in parallel on part of the pool (shared by all bulk creates)
+        hash_slots = _bulk_hash_semaphore()
+        
+        async def hash_item(index: int) -> str:
+            async with hash_slots:
+                return await hash_password_async(items[index][2], block=True)
+        
+        hashes = await asyncio.gather(*(hash_item(index) for index in pending))
+        
+        orgs, admins = {}, {}
+        for index, hashed_password in zip(pending, hashes):
+            organization_name, email, _ = items[index]
+            orgs[index], admins[index] = _build_organization(
+                organization_name,
+                email,
+                hashed_password,
+                async_mongodb_client.place_tenant(organization_name),
+            )
+        
+        master_db = async_mongodb_client.get_master_db()
+        
+        async def write_batch(collection, indexes: List[int], documents: List[dict], duplicate_message: str) -> List[int]:
+            """Unordered bulk insert; returns the indexes that were written"""
+            if not documents:
+                return []
+            failed = {}
+            try:
+                await collection.bulk_write(
+                    [InsertOne(document) for document in documents], ordered=False
+                )
+            except BulkWriteError as e:
+                for error in e.details.get("writeErrors", []):
+                    failed[error["index"]] = (
+                        duplicate_message if error.get("code") == 11000 else error.get("errmsg", "Write failed")
+                    )
+            except Exception as e:
+                # Part of the batch may have been written before the error:
+                # remove it so every item reported failed really is absent
+                failed = {position: f"Error creating organization: {str(e)}" for position in range(len(indexes))}
+                try:
+                    await collection.delete_many({"_id": {"$in": [document["_id"] for document in documents]}})
+                except Exception as cleanup_error:
+                    print(f"Warning: Could not remove a partly written bulk create batch: {cleanup_error}")
+            written = []
+            for position, index in enumerate(indexes):
+                if position in failed:
+                    results[index]["message"] = failed[position]
+                else:
+                    written.append(index)
+            return written
+        
+        org_indexes = list(orgs)
+        org_written = await write_batch(
+            master_db["organizations"],
+            org_indexes,
+            [orgs[index].to_dict() for index in org_indexes],
+            "Organization already exists",
+        )
+        admin_written = await write_batch(
+            master_db["admin_users"],
+            org_written,
+            [admins[index].to_dict() for index in org_written],
+            "Email already registered",
+        )
+        
+        # Roll back organizations whose admin could not be inserted
+        admin_written_set = set(admin_written)
+        orphaned = [orgs[index]._id for index in org_written if index not in admin_written_set]
+        if orphaned:
+            await master_db["organizations"].delete_many({"_id": {"$in": orphaned}})
+        
+        # Provision tenant databases concurrently
+        provision_slots = asyncio.Semaphore(settings.BULK_PROVISION_CONCURRENCY)
+        
+        async def provision(index: int):
+            async with provision_slots:
+                await async_mongodb_client.provision_tenant(
+                    orgs[index].organization_name, cluster=orgs[index].cluster
+                )
+        
+        outcomes = await asyncio.gather(
+            *(provision(index) for index in admin_written), return_exceptions=True
+        )
+        unprovisioned = []
+        for index, outcome in zip(admin_written, outcomes):
+            if isinstance(outcome, Exception):
+                results[index]["message"] = f"Error provisioning tenant database: {str(outcome)}"
+                unprovisioned.append(index)
+                continue
+            results[index].update(
+                success=True,
+                message="Organization created successfully",
+                admin_id=orgs[index].admin_id,
+                collection_name=orgs[index].collection_name,
+            )
+        
+        # Free the names of organizations without tenant storage, as a
+        # single create does
+        for index in unprovisioned:
+            await _rollback_create_async(master_db, orgs[index], admins[index])
+        
+        return results
+    
+    @staticmethod
+    async def get_organization(organization_name: str) -> Tuple[bool, Optional[Organization], str]:
+        """
+        Get organization by name
+        
+        Returns:
+            Tuple[success: bool, organization: Organization, message: str]
+        """
+        try:
+            cached_org = organization_cache.get_by_name(organization_name)
+            if cached_org is not None:
+                return True, cached_org, "Organization retrieved successfully"
+            
+            master_db = async_mongodb_client.get_master_db()
+            orgs_collection = master_db["organizations"]
+            
+            org_data = await _raw(orgs_collection).find_one(
+                {"organization_name": organization_name, "deleted_at": None},
+                ORGANIZATION_PROJECTION,
+            )
+            
+            if org_data is None:
                 return False, None, "Organization not found"
             
             org = Organization.from_dict(org_data)
+            organization_cache.put(org)
+            return True, org, "Organization retrieved successfully"
+            
+        except Exception as e:
+            return False, None, f"Error retrieving organization: {str(e)}"
+    
+    @staticmethod
+    async def get_organization_version(organization_name: str) -> Tuple[bool, Optional[Organization], str]:
+        """
+        Organization's current version, for validating an ETag
+        
+        Served from the organization cache when possible; otherwise one
+        lookup on the organization_name index returning only `_id` and
+        `version` (the other fields read as None and nothing is cached).
+        
+        Returns:
+            Tuple[success: bool, organization: Organization, message: str]
+        """
+        try:
+            cached_org = organization_cache.get_by_name(organization_name)
+            if cached_org is not None:
+                return True, cached_org, "Organization retrieved successfully"
+            
+            org_data = await _raw(async_mongodb_client.get_master_db()["organizations"]).find_one(
+                {"organization_name": organization_name, "deleted_at": None},
+                ORGANIZATION_VERSION_PROJECTION,
+            )
+            
+            if org_data is None:
+                return False, None, "Organization not found"
+            
+            return True, Organization.from_dict(org_data), "Organization retrieved successfully"
+            
+        except Exception as e:
+            return False, None, f"Error retrieving organization: {str(e)}"
+    
+    @staticmethod
+    async def list_organizations(
+        prefix: Optional[str] = None,
+        fields: Optional[Iterable[str]] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> Tuple[bool, List[dict], Optional[str], str]:
+        """
+        List organizations ordered by name, one page at a time
+        
+        Pages by keyset over the unique `organization_name` index: the
+        cursor carries the last name returned and the next page starts
+        strictly after it, so every page costs the same index scan however
+        deep it is. A prefix filter becomes an anchored regex, which is
+        also answered from the index bounds.
+        
+        Returns:
+            Tuple[success: bool, organizations: List[dict], next_cursor: str, message: str]
+        """
+        try:
+            fields = list(fields or LISTABLE_FIELDS)
+            unknown = [field for field in fields if field not in LISTABLE_FIELDS]
+            if unknown:
+                return False, [], None, f"Unknown fields: {', '.join(unknown)}"
+            
+            name_filter = {}
+            if cursor:
+                name_filter["$gt"] = decode_cursor(cursor)
+            if prefix:
+                name_filter["$regex"] = f"^{re.escape(prefix)}"
+            query = {"deleted_at": None}
+            if name_filter:
+                query["organization_name"] = name_filter
+            
+            # organization_name is always returned; the cursor is built from it
+            projection = {"_id": 0, "organization_name": 1, **{field: 1 for field in fields}}
+            orgs_collection = async_mongodb_client.get_master_db()["organizations"]
+            # One extra document tells whether there is a next page
+            organizations = await orgs_collection.find(
+                query,
+                projection,
+                sort=[("organization_name", 1)],
+                limit=limit + 1,
+                hint=[("organization_name", 1)],
+            ).to_list(length=limit + 1)
+            
+            next_cursor = None
+            if len(organizations) > limit:
+                organizations = organizations[:limit]
+                next_cursor = encode_cursor(organizations[-1]["organization_name"])
+            if "organization_name" not in fields:
+                for organization in organizations:
+                    del organization["organization_name"]
+            
+            return True, organizations, next_cursor, "Organizations retrieved successfully"
+            
+        except ValueError as e:
+            return False, [], None, str(e)
+        except Exception as e:
+            return False, [], None, f"Error listing organizations: {str(e)}"
+    
+    @staticmethod
+    async def update_organization(
+        organization_name: str, email: str, password: str
+    ) -> Tuple[bool, Optional[Organization], Optional[Job], str]:
+        """
+        Update organization (change admin credentials and collection)
+        
+        Credentials and metadata are updated immediately; copying the
+        tenant data into the new collection runs as a background job.
+        
+        Returns:
+            Tuple[success: bool, organization: Organization, job: Job, message: str]
+        """
+        try:
+            master_db = async_mongodb_client.get_master_db()
+            orgs_collection = master_db["organizations"]
+            admin_users_collection = master_db["admin_users"]
+            
+            # Get existing organization
+            org_data = await orgs_collection.find_one(
+                {"organization_name": organization_name, "deleted_at": None},
+                {"_id": 1},
+            )
+            
+            if not org_data:
+                return False, None, None, "Organization not found"
+            
+            org_id = str(org_data["_id"])
+            
+            # Hash before any write: a full pool (PasswordPoolBusy) must
+            # leave the organization untouched
+            hashed_password = await hash_password_async(password)
+            
+            # Create new collection name
+            new_collection_name = f"org_{sanitize_org_name(organization_name)}_v2"
+            
+            # Update organization with new collection name
+            await orgs_collection.update_one(
+                {"_id": ObjectId(org_id)},
+                {
+                    "$set": {
+                        "collection_name": new_collection_name,
+                    },
+                    # New ETag for /org/get
+                    "$inc": {"version": 1},
+                },
+            )
+            organization_cache.invalidate(organization_name=organization_name, org_id=org_id)
+            
+            # Update admin password; sessions started with the old one end
+            await admin_users_collection.update_one(
+                {"organization_id": org_id, "email": email},
+                {"$set": {"hashed_password": hashed_password}},
+            )
+            await AsyncRefreshTokenService.revoke(org_id, email)
+            
+            # Migrate data from old collection to new collection
+            job = await job_runner.enqueue(
+                "migrate_tenant_data",
+                organization_name,
+                params={"source": "data", "target": "data_v2"},
+            )
+            
+            # Retrieve updated organization
+            updated_org_data = await _raw(orgs_collection).find_one(
+                {"_id": ObjectId(org_id)}, ORGANIZATION_PROJECTION
+            )
+            updated_org = Organization.from_dict(updated_org_data)
+            
+            return True, updated_org, job, "Organization update accepted"
+            
+        except PasswordPoolBusy:
+            raise
+        except Exception as e:
+            return False, None, None, f"Error updating organization: {str(e)}"
+    
+    @staticmethod
+    async def delete_organization(organization_name: str) -> Tuple[bool, str]:
+        """
+        Delete organization and its collections
+        
+        The organization is tombstoned and its admins removed right away,
+        so it disappears from every read; dropping the tenant data is left
+        to the tenant reaper.
+        
+        Returns:
+            Tuple[success: bool, message: str]
+        """
+        try:
+            master_db = async_mongodb_client.get_master_db()
+            orgs_collection = master_db["organizations"]
+            admin_users_collection = master_db["admin_users"]
+            
+            # Tombstone the organization
+            now = datetime.utcnow()
+            org_data = await orgs_collection.find_one_and_update(
+                {"organization_name": organization_name, "deleted_at": None},
+                {"$set": {"deleted_at": now, "reap_after": now, "reap_attempts": 0}},
+                projection={"_id": 1},
+            )
+            
+            if not org_data:
+                return False, "Organization not found"
+            
+            org_id = str(org_data["_id"])
+            
+            # Delete admin users and their refresh tokens
+            await admin_users_collection.delete_many({"organization_id": org_id})
+            await AsyncRefreshTokenService.revoke(org_id)
+            organization_cache.invalidate(organization_name=organization_name, org_id=org_id)
+            tenant_reaper.wakeup()
+            
+            return True, "Organization deletion accepted"
+            
+        except Exception as e:
+            return False, f"Error deleting organization: {str(e)}"
+
+
+class AsyncAdminUserService:
+    """Async (Motor) counterpart of AdminUserService used by the API routes"""
+    
+    @staticmethod
+    async def authenticate(
+        email: str, password: str, client_ip: Optional[str] = None
+    ) -> Tuple[bool, Optional[AdminUser], str]:
+        """
+        Authenticate admin user
+        
+        Raises LoginThrottled, before any database read or bcrypt call,
+        when the client IP or email is over its login rate or locked out.
+        A stored hash with another cost than BCRYPT_ROUNDS is replaced in
+        the background after a successful login.
+        
+        Returns:
+            Tuple[success: bool, admin_user: AdminUser, message: str]
+        """
+        try:
+            await login_throttle.check_async(email, client_ip)
+            
+            master_db = async_mongodb_client.get_master_db()
+            admin_users_collection = master_db["admin_users"]
+            
+            admin_data = await admin_users_collection.find_one({"email": email}, ADMIN_AUTH_PROJECTION)
+            
+            if not admin_data:
+                await login_throttle.record_failure_async(email, client_ip)
+                return False, None, "Invalid email or password"
+            
+            admin_user = AdminUser.from_dict(admin_data)
+            
+            # Verify password
+            if not await verify_password_async(password, admin_user.hashed_password):
+                await login_throttle.record_failure_async(email, client_ip)
+                return False, None, "Invalid email or password"
+            
+            await login_throttle.record_success_async(email)
+            _schedule_rehash(admin_user, password)
+            return True, admin_user, "Authentication successful"
+            
+        except (PasswordPoolBusy, LoginThrottled):
+            raise
+        except Exception as e:
+            return False, None, f"Error authenticating user: {str(e)}"
+    
+    @staticmethod
+    async def get_admin_by_id(admin_id: str) -> Tuple[bool, Optional[AdminUser], str]:
+        """Get admin user by ID"""
+        try:
+            master_db = async_mongodb_client.get_master_db()
+            admin_users_collection = master_db["admin_users"]
+            
+            admin_data = await _raw(admin_users_collection).find_one(
+                {"_id": ObjectId(admin_id)}, ADMIN_PROJECTION
+            )
+            
+            if admin_data is None:
+                return False, None, "Admin user not found"
+            
+            admin_user = AdminUser.from_dict(admin_data)
+            return True, admin_user, "Admin retrieved successfully"
+            
+        except Exception as e:
+            return False, None, f"Error retrieving admin: {str(e)}"
+    
+    @staticmethod
+    async def get_organization_by_admin(admin_id: str) -> Tuple[bool, Optional[Organization], str]:
+        """Get organization by admin ID"""
+        try:
+            master_db = async_mongodb_client.get_master_db()
+            admin_users_collection = master_db["admin_users"]
+            orgs_collection = master_db["organizations"]
+            
+            admin_data = await admin_users_collection.find_one(
+                {"_id": ObjectId(admin_id)}, {"organization_id": 1}
+            )
+            
+            if not admin_data:
+                return False, None, "Admin not found"
+            
+            org = organization_cache.get_by_id(admin_data["organization_id"])
+            if org is None:
+                org_data = await _raw(orgs_collection).find_one(
+                    {"_id": ObjectId(admin_data["organization_id"]), "deleted_at": None},
+                    ORGANIZATION_PROJECTION,
+                )
+                
+                if org_data is None:
+                    return False, None, "Organization not found"
+                
+                org = Organization.from_dict(org_data)
+                organization_cache.put(org)
+            
             return True, org, "Organization retrieved"
             
         except Exception as e:
             return False, None, f"Error retrieving organization: {str(e)}"
+    
+    @staticmethod
+    async def authenticate_with_organization(
+        email: str, password: str, client_ip: Optional[str] = None
+    ) -> Tuple[bool, Optional[AdminUser], Optional[Organization], str]:
+        """
+        Authenticate admin user and load their organization in one query
+        
+        The returned Organization only carries `_id` and `organization_name`.
+        Throttled and rehashed like authenticate().
+        
+        Returns:
+            Tuple[success: bool, admin_user: AdminUser, organization: Organization, message: str]
+        """
+        try:
+            await login_throttle.check_async(email, client_ip)
+            
+            master_db = async_mongodb_client.get_master_db()
+            admin_users_collection = master_db["admin_users"]
+            
+            results = await admin_users_collection.aggregate(
+                _login_pipeline(email)
+            ).to_list(length=1)
+            
+            if not results:
+                await login_throttle.record_failure_async(email, client_ip)
+                return False, None, None, "Invalid email or password"
+            
+            admin_data = results[0]
+            admin_user = AdminUser.from_dict(admin_data)
+            
+            # Verify password
+            if not await verify_password_async(password, admin_user.hashed_password):
+                await login_throttle.record_failure_async(email, client_ip)
+                return False, None, None, "Invalid email or password"
+            
+            await login_throttle.record_success_async(email)
+            _schedule_rehash(admin_user, password)
+            if not admin_data["organization"]:
+                return False, admin_user, None, "Organization not found"
+            
+            org = Organization.from_dict(admin_data["organization"][0])
+            return True, admin_user, org, "Authentication successful"
+            
+        except (PasswordPoolBusy, LoginThrottled):
+            raise
+        except Exception as e:
+            return False, None, None, f"Error authenticating user: {str(e)}"
+
+
+class AsyncRefreshTokenService:
+    """
+    Rotating refresh tokens for /admin/refresh
+    
+    Tokens are opaque random strings; only their SHA-256 is stored, as the
+    `_id` of the refresh_tokens document, so a lookup is one indexed read.
+    Each refresh marks the presented token used and issues a new one in
+    the same family. Presenting a used token again means it was copied,
+    so the whole family is revoked.
+    """
+    
+    @staticmethod
+    async def issue(
+        admin_id: str,
+        organization_id: str,
+        organization_name: str,
+        email: str,
+        family_id: Optional[str] = None,
+    ) -> str:
+        """Store a new refresh token and return it"""
+        token = create_refresh_token()
+        now = datetime.utcnow()
+        await async_mongodb_client.get_master_db()["refresh_tokens"].insert_one({
+            "_id": hash_refresh_token(token),
+            "family_id": family_id or str(ObjectId()),
+            "admin_id": admin_id,
+            "organization_id": organization_id,
+            "organization_name": organization_name,
+            "email": email,
+            "created_at": now,
+            "expires_at": now + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+            "used_at": None,
+        })
+        return token
+    
+    @staticmethod
+    async def rotate(refresh_token: str) -> Tuple[bool, Optional[dict], Optional[str], str]:
+        """
+        Exchange a refresh token for a new one
+        
+        Returns:
+            Tuple[success: bool, session: dict (admin_id, organization_id,
+            organization_name, email), new refresh token: str, message: str]
+        """
+        try:
+            refresh_tokens = async_mongodb_client.get_master_db()["refresh_tokens"]
+            token_hash = hash_refresh_token(refresh_token)
+            now = datetime.utcnow()
+            
+            session = await refresh_tokens.find_one_and_update(
+                {"_id": token_hash, "used_at": None, "expires_at": {"$gt": now}},
+                {"$set": {"used_at": now}},
+                projection={
+                    "_id": 0, "family_id": 1, "admin_id": 1,
+                    "organization_id": 1, "organization_name": 1, "email": 1,
+                },
+            )
+            
+            if session is None:
+                reused = await refresh_tokens.find_one(
+                    {"_id": token_hash, "used_at": {"$ne": None}}, {"family_id": 1}
+                )
+                if reused:
+                    await refresh_tokens.delete_many({"family_id": reused["family_id"]})
+                return False, None, None, "Invalid refresh token"
+            
+            # Admins of a deleted organization get no new tokens
+            live = await async_mongodb_client.get_master_db()["organizations"].find_one(
+                {"_id": ObjectId(session["organization_id"]), "deleted_at": None}, {"_id": 1}
+            )
+            if live is None:
+                await refresh_tokens.delete_many({"organization_id": session["organization_id"]})
+                return False, None, None, "Invalid refresh token"
+            
+            new_token = await AsyncRefreshTokenService.issue(
+                session["admin_id"],
+                session["organization_id"],
+                session["organization_name"],
+                session["email"],
+                family_id=session.pop("family_id"),
+            )
+            return True, session, new_token, "Token refreshed"
+            
+        except Exception as e:
+            return False, None, None, f"Error refreshing token: {str(e)}"
+    
+    @staticmethod
+    async def revoke(organization_id: str, email: Optional[str] = None):
+        """Revoke the refresh tokens of an organization, or of one of its admins"""
+        query = {"organization_id": organization_id}
+        if email is not None:
+            query["email"] = email
+        await async_mongodb_client.get_master_db()["refresh_tokens"].delete_many(query)
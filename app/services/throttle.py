@@ -0,0 +1,355 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+from pymongo import ReturnDocument
+from app.core.config import settings
+from app.core.metrics import login_throttled
+from app.db.mongodb import mongodb_client, async_mongodb_client
+from app.utils.cache import TTLCache
+
+
+class LoginThrottled(Exception):
+    """Raised when a login attempt is refused by the throttle"""
+
+    def __init__(self, retry_after: int, reason: str):
+        super().__init__("Too many login attempts")
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+def lockout_seconds(failures: int) -> float:
+    """Lockout after `failures` consecutive failures (0 below the threshold)"""
+    if failures < settings.LOGIN_LOCKOUT_THRESHOLD:
+        return 0.0
+    exponent = failures - settings.LOGIN_LOCKOUT_THRESHOLD
+    # Cap the exponent so huge failure counts cannot overflow
+    return min(settings.LOGIN_LOCKOUT_MAX_SECONDS, settings.LOGIN_LOCKOUT_BASE_SECONDS * 2 ** min(exponent, 32))
+
+
+class _KeyState:
+    """Token bucket and failure count of one throttle key"""
+
+    __slots__ = ("tokens", "updated", "failures", "last_failure", "locked_until")
+
+    def __init__(self, burst: float, now: float):
+        self.tokens = burst
+        self.updated = now
+        self.failures = 0
+        self.last_failure = 0.0
+        self.locked_until = 0.0
+
+
+class MemoryThrottleBackend:
+    """
+    Throttle state held in this process
+
+    Keys idle for `idle_seconds` are dropped, as are the least recently
+    used keys beyond `max_keys`. Each worker process throttles on its
+    own; use the MongoDB backend to share the limits.
+    """
+
+    name = "memory"
+
+    def __init__(self, max_keys: int, idle_seconds: float):
+        self._states = TTLCache(maxsize=max_keys, ttl=idle_seconds)
+        self._lock = threading.Lock()
+
+    def _state(self, key: str, burst: float, now: float) -> _KeyState:
+        state = self._states.get(key)
+        if state is None:
+            state = _KeyState(burst, now)
+        # Re-setting the entry also restarts its idle timer
+        self._states.set(key, state)
+        return state
+
+    def admit(self, key: str, rate: float, burst: float) -> Tuple[float, bool]:
+        """Take a token; returns (seconds to wait, locked out), 0 when admitted"""
+        now = time.monotonic()
+        with self._lock:
+            state = self._state(key, burst, now)
+            if state.locked_until > now:
+                return state.locked_until - now, True
+            state.tokens = min(burst, state.tokens + (now - state.updated) * rate)
+            state.updated = now
+            if state.tokens < 1:
+                return (1 - state.tokens) / rate, False
+            state.tokens -= 1
+            return 0.0, False
+
+    def failure(self, key: str, burst: float):
+        """Count a failed login and lock the key out once over the threshold"""
+        now = time.monotonic()
+        with self._lock:
+            state = self._state(key, burst, now)
+            if now - state.last_failure > settings.LOGIN_FAILURE_WINDOW_SECONDS:
+                state.failures = 0
+            state.failures += 1
+            state.last_failure = now
+            lockout = lockout_seconds(state.failures)
+            if lockout:
+                state.locked_until = now + lockout
+
+    def success(self, key: str):
+        """Forget the failures of a key"""
+        with self._lock:
+            state = self._states.get(key)
+            if state is not None:
+                state.failures = 0
+                state.locked_until = 0.0
+
+    async def admit_async(self, key: str, rate: float, burst: float) -> Tuple[float, bool]:
+        return self.admit(key, rate, burst)
+
+    async def failure_async(self, key: str, burst: float):
+        self.failure(key, burst)
+
+    async def success_async(self, key: str):
+        self.success(key)
+
+
+class MongoThrottleBackend:
+    """
+    Throttle state shared through the `login_throttle` collection
+
+    Every check is one atomic find_one_and_update with an aggregation
+    pipeline (MongoDB 4.2+), so all workers and instances draw from the
+    same buckets. Documents expire through a TTL index on `expires_at`.
+    """
+
+    name = "mongodb"
+
+    @staticmethod
+    def _expires_at(now: datetime) -> dict:
+        window = now + timedelta(seconds=settings.LOGIN_FAILURE_WINDOW_SECONDS)
+        return {"$max": [window, {"$ifNull": ["$locked_until", now]}]}
+
+    @staticmethod
+    def _admit_update(rate: float, burst: float, now: datetime) -> list:
+        refilled = {
+            "$min": [
+                burst,
+                {
+                    "$add": [
+                        {"$ifNull": ["$tokens", burst]},
+                        {
+                            "$multiply": [
+                                rate / 1000,
+                                {"$subtract": [now, {"$ifNull": ["$updated_at", now]}]},
+                            ]
+                        },
+                    ]
+                },
+            ]
+        }
+        locked = {"$gt": [{"$ifNull": ["$locked_until", now]}, now]}
+        return [
+            {"$set": {"locked": locked}},
+            # A locked key keeps its bucket as it is
+            {"$set": {
+                "tokens": {"$cond": ["$locked", {"$ifNull": ["$tokens", burst]}, refilled]},
+                "updated_at": {"$cond": ["$locked", {"$ifNull": ["$updated_at", now]}, now]},
+            }},
+            {"$set": {"admitted": {"$and": [{"$eq": ["$locked", False]}, {"$gte": ["$tokens", 1]}]}}},
+            {"$set": {
+                "tokens": {"$cond": ["$admitted", {"$subtract": ["$tokens", 1]}, "$tokens"]},
+                "expires_at": MongoThrottleBackend._expires_at(now),
+            }},
+        ]
+
+    @staticmethod
+    def _admit_result(document: dict, rate: float, now: datetime) -> Tuple[float, bool]:
+        if document["locked"]:
+            return (document["locked_until"] - now).total_seconds(), True
+        if not document["admitted"]:
+            return (1 - document["tokens"]) / rate, False
+        return 0.0, False
+
+    @staticmethod
+    def _failure_update(burst: float, now: datetime) -> list:
+        window_start = now - timedelta(seconds=settings.LOGIN_FAILURE_WINDOW_SECONDS)
+        failures = {
+            "$add": [
+                {"$cond": [{"$gte": [{"$ifNull": ["$last_failure", window_start]}, window_start]},
+                           {"$ifNull": ["$failures", 0]}, 0]},
+                1,
+            ]
+        }
+        # Same schedule as lockout_seconds()
+        lockout_ms = {
+            "$min": [
+                settings.LOGIN_LOCKOUT_MAX_SECONDS * 1000,
+                {
+                    "$multiply": [
+                        settings.LOGIN_LOCKOUT_BASE_SECONDS * 1000,
+                        {"$pow": [2, {"$min": [
+                            {"$subtract": ["$failures", settings.LOGIN_LOCKOUT_THRESHOLD]}, 32
+                        ]}]},
+                    ]
+                },
+            ]
+        }
+        return [
+            {"$set": {
+                "failures": failures,
+                "last_failure": now,
+                "tokens": {"$ifNull": ["$tokens", burst]},
+                "updated_at": {"$ifNull": ["$updated_at", now]},
+            }},
+            {"$set": {"locked_until": {"$cond": [
+                {"$gte": ["$failures", settings.LOGIN_LOCKOUT_THRESHOLD]},
+                {"$add": [now, lockout_ms]},
+                {"$ifNull": ["$locked_until", None]},
+            ]}}},
+            {"$set": {"expires_at": MongoThrottleBackend._expires_at(now)}},
+        ]
+
+    SUCCESS_UPDATE = {"$set": {"failures": 0, "locked_until": None}}
+
+    def admit(self, key: str, rate: float, burst: float) -> Tuple[float, bool]:
+        """Take a token; returns (seconds to wait, locked out), 0 when admitted"""
+        now = datetime.utcnow()
+        document = mongodb_client.get_master_db()["login_throttle"].find_one_and_update(
+            {"_id": key}, self._admit_update(rate, burst, now),
+            upsert=True, return_document=ReturnDocument.AFTER,
+        )
+        return self._admit_result(document, rate, now)
+
+    def failure(self, key: str, burst: float):
+        """Count a failed login and lock the key out once over the threshold"""
+        mongodb_client.get_master_db()["login_throttle"].update_one(
+            {"_id": key}, self._failure_update(burst, datetime.utcnow()), upsert=True
+        )
+
+    def success(self, key: str):
+        """Forget the failures of a key"""
+        mongodb_client.get_master_db()["login_throttle"].update_one({"_id": key}, self.SUCCESS_UPDATE)
+
+    async def admit_async(self, key: str, rate: float, burst: float) -> Tuple[float, bool]:
+        now = datetime.utcnow()
+        document = await async_mongodb_client.get_master_db()["login_throttle"].find_one_and_update(
+            {"_id": key}, self._admit_update(rate, burst, now),
+            upsert=True, return_document=ReturnDocument.AFTER,
+        )
+        return self._admit_result(document, rate, now)
+
+    async def failure_async(self, key: str, burst: float):
+        await async_mongodb_client.get_master_db()["login_throttle"].update_one(
+            {"_id": key}, self._failure_update(burst, datetime.utcnow()), upsert=True
+        )
+
+    async def success_async(self, key: str):
+        await async_mongodb_client.get_master_db()["login_throttle"].update_one(
+            {"_id": key}, self.SUCCESS_UPDATE
+        )
+
+
+class LoginThrottle:
+    """
+    Admission control for admin logins
+
+    Every attempt takes a token from the bucket of the client IP and from
+    the bucket of the email, and is refused while the email or IP is
+    locked out. Failed logins count towards an exponential lockout
+    (LOGIN_LOCKOUT_BASE_SECONDS doubling per failure past the threshold,
+    up to LOGIN_LOCKOUT_MAX_SECONDS); a successful login clears the
+    email's count. Checks run before any database read or bcrypt call,
+    so a refused attempt costs next to nothing.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._admitted = 0
+        self._throttled = 0
+        self._locked_out = 0
+        self._failures = 0
+
+    @staticmethod
+    def _keys(email: str, client_ip: Optional[str]) -> list:
+        """(key, rate, burst) for each bucket an attempt draws from"""
+        keys = []
+        if client_ip:
+            keys.append((f"ip:{client_ip}", settings.LOGIN_IP_RATE, settings.LOGIN_IP_BURST))
+        keys.append((f"email:{email.lower()}", settings.LOGIN_EMAIL_RATE, settings.LOGIN_EMAIL_BURST))
+        return keys
+
+    def _refuse(self, retry_after: float, locked: bool, key: str):
+        reason = "lockout" if locked else key.split(":", 1)[0]
+        if locked:
+            self._locked_out += 1
+        else:
+            self._throttled += 1
+        if settings.METRICS_ENABLED:
+            login_throttled.inc(reason)
+        raise LoginThrottled(max(1, int(retry_after + 0.999)), reason)
+
+    def check(self, email: str, client_ip: Optional[str] = None):
+        """Admit a login attempt or raise LoginThrottled"""
+        if not settings.LOGIN_THROTTLE_ENABLED:
+            return
+        for key, rate, burst in self._keys(email, client_ip):
+            retry_after, locked = self.backend.admit(key, rate, burst)
+            if retry_after > 0:
+                self._refuse(retry_after, locked, key)
+        self._admitted += 1
+
+    def record_failure(self, email: str, client_ip: Optional[str] = None):
+        """Count a failed login against the email and the client IP"""
+        if not settings.LOGIN_THROTTLE_ENABLED:
+            return
+        self._failures += 1
+        for key, _, burst in self._keys(email, client_ip):
+            self.backend.failure(key, burst)
+
+    def record_success(self, email: str):
+        """Clear the email's failures after a successful login"""
+        if not settings.LOGIN_THROTTLE_ENABLED:
+            return
+        self.backend.success(f"email:{email.lower()}")
+
+    async def check_async(self, email: str, client_ip: Optional[str] = None):
+        if not settings.LOGIN_THROTTLE_ENABLED:
+            return
+        for key, rate, burst in self._keys(email, client_ip):
+            retry_after, locked = await self.backend.admit_async(key, rate, burst)
+            if retry_after > 0:
+                self._refuse(retry_after, locked, key)
+        self._admitted += 1
+
+    async def record_failure_async(self, email: str, client_ip: Optional[str] = None):
+        if not settings.LOGIN_THROTTLE_ENABLED:
+            return
+        self._failures += 1
+        for key, _, burst in self._keys(email, client_ip):
+            await self.backend.failure_async(key, burst)
+
+    async def record_success_async(self, email: str):
+        if not settings.LOGIN_THROTTLE_ENABLED:
+            return
+        await self.backend.success_async(f"email:{email.lower()}")
+
+    def stats(self) -> dict:
+        """Admission counters"""
+        return {
+            "enabled": settings.LOGIN_THROTTLE_ENABLED,
+            "backend": self.backend.name,
+            "admitted": self._admitted,
+            "throttled": self._throttled,
+            "locked_out": self._locked_out,
+            "failures": self._failures,
+        }
+
+
+def get_throttle_backend():
+    """Throttle backend selected by LOGIN_THROTTLE_BACKEND"""
+    if settings.LOGIN_THROTTLE_BACKEND == "mongodb":
+        return MongoThrottleBackend()
+    if settings.LOGIN_THROTTLE_BACKEND == "memory":
+        return MemoryThrottleBackend(
+            max_keys=settings.LOGIN_THROTTLE_MAX_KEYS,
+            idle_seconds=max(settings.LOGIN_FAILURE_WINDOW_SECONDS, settings.LOGIN_LOCKOUT_MAX_SECONDS),
+        )
+    raise ValueError(f"Unknown LOGIN_THROTTLE_BACKEND: {settings.LOGIN_THROTTLE_BACKEND}")
+
+
+login_throttle = LoginThrottle(get_throttle_backend())
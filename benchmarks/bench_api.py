@@ -0,0 +1,277 @@
+"""
+End-to-end API load test: throughput and latency per endpoint.
+
+Creates `--tenants` organizations and then drives them through the API
+with `--concurrency` concurrent clients, one phase per endpoint:
+
+  create   POST /org/create, one request per tenant
+  login    POST /admin/login, one per tenant (tokens are used later)
+  get      GET /org/get, `--requests` requests for random tenants
+  update   PUT /org/update, one per tenant (each enqueues a migration job)
+  delete   DELETE /org/delete, one per tenant
+
+Targets:
+
+  (default)      the app in-process (ASGI, no HTTP server), using the
+                 MongoDB at MONGODB_URL and a throwaway master database
+  --in-memory    the app in-process against the in-memory MongoDB
+                 stand-in (benchmarks/inmemory.py)
+  --url URL      a running server (needs httpx); it uses its own database
+
+For each endpoint the run reports requests, RPS, p50/p95/p99 latency and
+error rate. With --repeat, each value is the median over the runs.
+--save-baseline writes the results to a JSON file. --baseline compares a
+run against that file and exits with status 1 if any endpoint regressed
+by more than --tolerance, meaning lower RPS or a higher p95/p99.
+Differences smaller than --min-delta-ms per request count as noise. The
+error rate may not exceed the baseline by more than one percentage point.
+
+Usage:
+    python -m benchmarks.bench_api --in-memory --tenants 50 --concurrency 10 --save-baseline baseline.json
+    python -m benchmarks.bench_api --in-memory --tenants 50 --concurrency 10 --repeat 3 --baseline baseline.json
+    python -m benchmarks.bench_api --url http://localhost:8000 --tenants 200 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+from benchmarks.common import asgi_request, print_table, summarize, use_bench_database
+
+PASSWORD = "load-test-password"
+ERROR_RATE_SLACK = 0.01
+
+# (method, path, query string, JSON body, bearer token)
+Call = Tuple[str, str, str, Optional[dict], Optional[str]]
+
+
+class InProcessTarget:
+    """The FastAPI app called directly, with its startup/shutdown events"""
+
+    def __init__(self, in_memory: bool):
+        self.settings = use_bench_database()
+        if in_memory:
+            from benchmarks.inmemory import install
+
+            install()
+        from app.main import app
+
+        self.app = app
+
+    async def start(self):
+        from app.db.readiness import database_readiness
+
+        await self.app.router.startup()
+        # Measure requests, not the background index build
+        if not await database_readiness.wait(timeout=30):
+            raise SystemExit(f"MongoDB not ready: {database_readiness.stats()['last_error']}")
+
+    async def request(self, method, path, query="", body=None, token=None) -> Tuple[int, bytes]:
+        headers = [(b"authorization", f"Bearer {token}".encode())] if token else []
+        payload = json.dumps(body).encode() if body is not None else b""
+        return await asgi_request(self.app, method, path, query, payload, headers)
+
+    async def stop(self):
+        from app.db.mongodb import mongodb_client
+
+        mongodb_client.client.drop_database(self.settings.MASTER_DB_NAME)
+        await self.app.router.shutdown()
+
+
+class HTTPTarget:
+    """A running server, reached over HTTP"""
+
+    def __init__(self, url: str, concurrency: int):
+        try:
+            import httpx
+        except ImportError as e:
+            raise SystemExit(f"--url needs httpx: {e}")
+        self.client = httpx.AsyncClient(
+            base_url=url,
+            timeout=60.0,
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+        )
+
+    async def start(self):
+        pass
+
+    async def request(self, method, path, query="", body=None, token=None) -> Tuple[int, bytes]:
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        response = await self.client.request(
+            method, f"{path}?{query}" if query else path, json=body, headers=headers
+        )
+        return response.status_code, response.content
+
+    async def stop(self):
+        await self.client.aclose()
+
+
+async def run_phase(target, calls: List[Call], concurrency: int):
+    """Send the calls from `concurrency` clients; returns (summary, bodies)"""
+    latencies: List[float] = []
+    bodies: List[Optional[bytes]] = [None] * len(calls)
+    errors = 0
+    next_call = 0
+
+    async def client():
+        nonlocal errors, next_call
+        while next_call < len(calls):
+            index = next_call
+            next_call += 1
+            start = time.perf_counter()
+            try:
+                status, body = await target.request(*calls[index])
+            except Exception:
+                status, body = 0, b""
+            if 200 <= status < 300:
+                latencies.append(time.perf_counter() - start)
+                bodies[index] = body
+            else:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(min(concurrency, len(calls)))))
+    return summarize(latencies, time.perf_counter() - start, errors), bodies
+
+
+def access_token(body: Optional[bytes]) -> Optional[str]:
+    return json.loads(body)["data"]["access_token"] if body else None
+
+
+async def run(target, tenants: int, requests: int, concurrency: int) -> Dict[str, dict]:
+    run_id = uuid.uuid4().hex[:8]
+    names = [f"load-{run_id}-{i}" for i in range(tenants)]
+    emails = [f"{name}@example.com" for name in names]
+    results = {}
+
+    results["/org/create"], _ = await run_phase(target, [
+        ("POST", "/org/create", "", {"organization_name": name, "email": email, "password": PASSWORD}, None)
+        for name, email in zip(names, emails)
+    ], concurrency)
+
+    results["/admin/login"], bodies = await run_phase(target, [
+        ("POST", "/admin/login", "", {"email": email, "password": PASSWORD}, None)
+        for email in emails
+    ], concurrency)
+    tokens = [access_token(body) for body in bodies]
+
+    results["/org/get"], _ = await run_phase(target, [
+        ("GET", "/org/get", f"organization_name={random.choice(names)}", None, None)
+        for _ in range(requests)
+    ], concurrency)
+
+    results["/org/update"], _ = await run_phase(target, [
+        ("PUT", "/org/update", "", {"organization_name": name, "email": email, "password": PASSWORD}, token)
+        for name, email, token in zip(names, emails, tokens)
+    ], concurrency)
+
+    results["/org/delete"], _ = await run_phase(target, [
+        ("DELETE", "/org/delete", f"organization_name={name}", None, token)
+        for name, token in zip(names, tokens)
+    ], concurrency)
+    return results
+
+
+def median_results(runs: List[Dict[str, dict]]) -> Dict[str, dict]:
+    """Per endpoint and metric, the median over repeated runs"""
+    results = {}
+    for endpoint, first in runs[0].items():
+        results[endpoint] = {
+            key: round(statistics.median(run[endpoint][key] for run in runs), 2) for key in first
+        }
+        results[endpoint]["requests"] = statistics.median_low(run[endpoint]["requests"] for run in runs)
+    return results
+
+
+def find_regressions(
+    results: Dict[str, dict],
+    baseline: Dict[str, dict],
+    tolerance: float,
+    min_delta_ms: float,
+    concurrency: int,
+) -> List[str]:
+    """Endpoints that are slower or fail more often than in the baseline"""
+    regressions = []
+    for endpoint, before in baseline.items():
+        after = results.get(endpoint)
+        if after is None:
+            continue
+        if after["rps"] and before["rps"] and after["rps"] < before["rps"] * (1 - tolerance):
+            # Time per request on each client, to apply the same noise floor
+            slower_ms = (concurrency / after["rps"] - concurrency / before["rps"]) * 1000
+            if slower_ms > min_delta_ms:
+                regressions.append(f"{endpoint}: rps {after['rps']} < baseline {before['rps']}")
+        for key in ("p95_ms", "p99_ms"):
+            if after[key] > before[key] * (1 + tolerance) and after[key] - before[key] > min_delta_ms:
+                regressions.append(f"{endpoint}: {key} {after[key]} > baseline {before[key]}")
+        if after["error_rate"] > before["error_rate"] + ERROR_RATE_SLACK:
+            regressions.append(f"{endpoint}: error_rate {after['error_rate']} > baseline {before['error_rate']}")
+    return regressions
+
+
+async def main(args):
+    if args.url:
+        target = HTTPTarget(args.url, args.concurrency)
+    else:
+        target = InProcessTarget(args.in_memory)
+    config = {
+        "target": args.url or ("in-memory" if args.in_memory else "mongodb"),
+        "tenants": args.tenants,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "repeat": args.repeat,
+    }
+
+    await target.start()
+    try:
+        runs = [await run(target, args.tenants, args.requests, args.concurrency) for _ in range(args.repeat)]
+    finally:
+        await target.stop()
+    results = median_results(runs)
+
+    print_table(
+        f"API load test ({config['target']}, {args.tenants} tenants, concurrency {args.concurrency})",
+        results,
+    )
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump({"config": config, "results": results}, f, indent=2)
+        print(f"\nBaseline written to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("config") != config:
+            print(f"\nWarning: baseline was recorded with {baseline.get('config')}")
+        regressions = find_regressions(
+            results, baseline["results"], args.tolerance, args.min_delta_ms, args.concurrency
+        )
+        if regressions:
+            print(f"\nFAIL: regressions beyond {args.tolerance:.0%} of {args.baseline}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print(f"\nOK: no regressions beyond {args.tolerance:.0%} of {args.baseline}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--in-memory", action="store_true", help="use the in-memory MongoDB stand-in")
+    target.add_argument("--url", help="load test a running server instead of the in-process app")
+    parser.add_argument("--tenants", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=2000, help="GET /org/get requests")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=1, help="runs to take the median of")
+    parser.add_argument("--baseline", help="baseline JSON to compare against")
+    parser.add_argument("--save-baseline", help="write this run's results as a baseline JSON")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed regression (fraction)")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="ignore smaller latency changes")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,117 @@
+"""
+Concurrency benchmark: sync (pymongo) vs async (Motor) service path.
+
+Emulates a single uvicorn worker: one event loop running `async def`
+handlers, like the routes in app/routes. The sync path calls
+OrganizationService directly from the handler (blocking the loop, as the
+routes used to); the async path awaits AsyncOrganizationService.
+
+Runs against MONGODB_URL, or the in-memory MongoDB stand-in with
+`--in-memory` (pip install mongomock mongomock-motor). The stand-in
+answers without waiting on a socket, so there it shows the per-request
+overhead of each path, not the overlap of I/O the async path buys.
+
+Usage:
+    python -m benchmarks.bench_async_db --concurrency 1 10 50 100 --duration 5
+    python -m benchmarks.bench_async_db --in-memory
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import datetime
+
+from benchmarks.common import Timer, print_table, summarize, use_bench_database
+
+settings = use_bench_database()
+
+from app.db.mongodb import mongodb_client, async_mongodb_client  # noqa: E402
+from app.services.cache import organization_cache  # noqa: E402
+from app.services.services import (  # noqa: E402
+    OrganizationService,
+    AsyncOrganizationService,
+)
+
+
+def seed(tenants: int):
+    """Insert organization documents directly (skips bcrypt and tenant DBs)"""
+    orgs = mongodb_client.get_master_db()["organizations"]
+    orgs.delete_many({})
+    orgs.insert_many(
+        [
+            {
+                "organization_name": f"bench-org-{i}",
+                "collection_name": f"org_bench_org_{i}",
+                "admin_id": "0" * 24,
+                "created_at": datetime.utcnow(),
+            }
+            for i in range(tenants)
+        ]
+    )
+
+
+# Both handlers drop the name from the organization cache first, so every
+# request reaches the database
+
+async def sync_handler(name: str):
+    organization_cache.invalidate(organization_name=name)
+    return OrganizationService.get_organization(organization_name=name)
+
+
+async def async_handler(name: str):
+    organization_cache.invalidate(organization_name=name)
+    return await AsyncOrganizationService.get_organization(organization_name=name)
+
+
+async def drive(handler, concurrency: int, duration: float, tenants: int):
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + duration
+
+    async def client(worker: int):
+        nonlocal errors
+        i = worker
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            success, _, _ = await handler(f"bench-org-{i % tenants}")
+            latencies.append(time.perf_counter() - start)
+            if not success:
+                errors += 1
+            i += concurrency
+
+    with Timer() as timer:
+        await asyncio.gather(*(client(w) for w in range(concurrency)))
+    return summarize(latencies, timer.elapsed, errors)
+
+
+async def main(args):
+    if args.in_memory:
+        from benchmarks.inmemory import install
+
+        install()
+    mongodb_client.connect()
+    await async_mongodb_client.connect()
+    seed(args.tenants)
+
+    rows = {}
+    for concurrency in args.concurrency:
+        rows[f"sync   c={concurrency}"] = await drive(
+            sync_handler, concurrency, args.duration, args.tenants
+        )
+        rows[f"async  c={concurrency}"] = await drive(
+            async_handler, concurrency, args.duration, args.tenants
+        )
+
+    print_table("GET organization throughput per worker (one event loop)", rows)
+
+    mongodb_client.client.drop_database(settings.MASTER_DB_NAME)
+    async_mongodb_client.disconnect()
+    mongodb_client.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50, 100])
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--tenants", type=int, default=1000)
+    parser.add_argument("--in-memory", action="store_true", help="use the in-memory MongoDB stand-in")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,175 @@
+"""
+Round trips per organization create: original flow vs streamlined flow.
+
+A pymongo CommandListener counts the commands each create sends to the
+server. "before" replays the original create_organization sequence
+(existence check, two inserts, create_collection, re-read); "after" is
+OrganizationService.create_organization, which relies on the unique
+indexes, skips the re-read and, on a replica set, writes both master
+documents in one transaction.
+
+Runs against MONGODB_URL, or the in-memory MongoDB stand-in with
+`--in-memory` (pip install mongomock mongomock-motor). The stand-in sends
+no commands, so there the outermost collection and database calls the
+application makes are counted instead, one per command it would send;
+it has no transactions, so "after" writes the master documents one by one.
+
+Usage:
+    python -m benchmarks.bench_create_roundtrips --iterations 50
+    python -m benchmarks.bench_create_roundtrips --in-memory
+"""
+
+import argparse
+import threading
+import time
+from collections import Counter
+
+from bson import ObjectId
+from pymongo import monitoring
+
+from benchmarks.common import percentile, use_bench_database
+
+settings = use_bench_database()
+
+IGNORED_COMMANDS = {"hello", "isMaster", "ismaster", "endSessions", "ping", "saslStart", "saslContinue"}
+
+
+class CommandCounter(monitoring.CommandListener):
+    """Counts commands sent to the server"""
+
+    def __init__(self):
+        self.commands = Counter()
+
+    def started(self, event):
+        if event.command_name not in IGNORED_COMMANDS:
+            self.commands[event.command_name] += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+counter = CommandCounter()
+monitoring.register(counter)
+
+# Stand-in method -> the command it replaces
+IN_MEMORY_COMMANDS = {
+    "find": "find",
+    "find_one": "find",
+    "insert_one": "insert",
+    "insert_many": "insert",
+    "update_one": "update",
+    "replace_one": "update",
+    "delete_one": "delete",
+    "delete_many": "delete",
+    "find_one_and_update": "findAndModify",
+    "aggregate": "aggregate",
+    "create_index": "createIndexes",
+    "create_indexes": "createIndexes",
+    "create_collection": "create",
+}
+
+
+def count_in_memory_calls():
+    """Count the stand-in's outermost collection/database calls as commands"""
+    from mongomock.collection import Collection
+    from mongomock.database import Database
+
+    depth = threading.local()
+
+    def counted(method, command):
+        def wrapper(*args, **kwargs):
+            outermost = not getattr(depth, "value", 0)
+            if outermost:
+                counter.commands[command] += 1
+            depth.value = getattr(depth, "value", 0) + 1
+            try:
+                return method(*args, **kwargs)
+            finally:
+                depth.value -= 1
+
+        return wrapper
+
+    for owner in (Collection, Database):
+        for name, command in IN_MEMORY_COMMANDS.items():
+            if hasattr(owner, name):
+                setattr(owner, name, counted(getattr(owner, name), command))
+
+from app.core.password import hash_password  # noqa: E402
+from app.db.mongodb import mongodb_client  # noqa: E402
+from app.db.placement import DEFAULT_CLUSTER  # noqa: E402
+from app.models.models import Organization, AdminUser  # noqa: E402
+from app.services.services import OrganizationService  # noqa: E402
+from app.utils.validators import sanitize_org_name  # noqa: E402
+
+
+def legacy_create(organization_name: str, email: str, password: str):
+    """The original create_organization sequence"""
+    master_db = mongodb_client.get_master_db()
+    orgs_collection = master_db["organizations"]
+    if orgs_collection.find_one({"organization_name": organization_name}):
+        return
+    admin_user = AdminUser(email=email, hashed_password=hash_password(password), organization_id=str(ObjectId()))
+    org = Organization(
+        organization_name=organization_name,
+        collection_name=f"org_{sanitize_org_name(organization_name)}",
+        admin_id=str(admin_user._id),
+    )
+    org_id = orgs_collection.insert_one(org.to_dict()).inserted_id
+    admin_user.organization_id = str(org_id)
+    master_db["admin_users"].insert_one(admin_user.to_dict())
+    mongodb_client.get_tenant_db(organization_name, cluster=DEFAULT_CLUSTER).create_collection("data")
+    Organization.from_dict(orgs_collection.find_one({"_id": org_id}))
+
+
+def streamlined_create(organization_name: str, email: str, password: str):
+    OrganizationService.create_organization(organization_name, email, password)
+
+
+def measure(name: str, func, iterations: int):
+    counter.commands.clear()
+    latencies = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        func(f"rt-{name}-{i}", f"rt-{name}-{i}@bench.example", "benchmark-password")
+        latencies.append(time.perf_counter() - start)
+    total = sum(counter.commands.values())
+    return {
+        "round_trips_per_create": round(total / iterations, 2),
+        "commands": dict(counter.commands),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def cleanup():
+    for name in mongodb_client.client.list_database_names():
+        if name.startswith("org_rt-"):
+            mongodb_client.client.drop_database(name)
+    mongodb_client.client.drop_database(settings.MASTER_DB_NAME)
+
+
+def main(args):
+    if args.in_memory:
+        from benchmarks.inmemory import install
+
+        install()
+        count_in_memory_calls()
+    mongodb_client.connect()
+    print(f"Transactions available: {mongodb_client.supports_transactions}")
+    try:
+        for name, func in (("before", legacy_create), ("after", streamlined_create)):
+            result = measure(name, func, args.iterations)
+            print(f"{name:<7} {result}")
+    finally:
+        cleanup()
+        mongodb_client.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--in-memory", action="store_true", help="use the in-memory MongoDB stand-in")
+    main(parser.parse_args())
@@ -0,0 +1,127 @@
+"""
+Login latency benchmark: three sequential queries vs one $lookup aggregation.
+
+"before" is the original /admin/login path (AdminUserService.authenticate
+followed by get_organization_by_admin, with the organization cache
+cleared so every login reaches the master DB). "after" is
+authenticate_with_organization. Both are measured with and without the
+bcrypt verification so the database share of the latency is visible.
+
+Runs against MONGODB_URL, or the in-memory MongoDB stand-in with
+`--in-memory` (pip install mongomock mongomock-motor).
+
+Usage:
+    python -m benchmarks.bench_login --iterations 500
+    python -m benchmarks.bench_login --in-memory
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime
+
+from bson import ObjectId
+
+from benchmarks.common import print_table, summarize, use_bench_database
+
+settings = use_bench_database()
+
+from app.core.password import hash_password, password_pool  # noqa: E402
+from app.db.mongodb import mongodb_client, async_mongodb_client  # noqa: E402
+from app.services.cache import organization_cache  # noqa: E402
+from app.services.services import AsyncAdminUserService, _login_pipeline  # noqa: E402
+
+PASSWORD = "benchmark-password"
+
+
+def seed(tenants: int):
+    """Insert admins and organizations sharing one bcrypt hash"""
+    master_db = mongodb_client.get_master_db()
+    master_db["organizations"].delete_many({})
+    master_db["admin_users"].delete_many({})
+    hashed = hash_password(PASSWORD)
+    orgs, admins = [], []
+    for i in range(tenants):
+        org_id, admin_id = ObjectId(), ObjectId()
+        orgs.append({
+            "_id": org_id,
+            "organization_name": f"bench-org-{i}",
+            "collection_name": f"org_bench_org_{i}",
+            "admin_id": str(admin_id),
+            "created_at": datetime.utcnow(),
+        })
+        admins.append({
+            "_id": admin_id,
+            "email": f"admin{i}@bench.example",
+            "hashed_password": hashed,
+            "organization_id": str(org_id),
+            "created_at": datetime.utcnow(),
+        })
+    master_db["organizations"].insert_many(orgs)
+    master_db["admin_users"].insert_many(admins)
+
+
+async def legacy_queries(email: str):
+    master_db = async_mongodb_client.get_master_db()
+    admin = await master_db["admin_users"].find_one({"email": email})
+    admin = await master_db["admin_users"].find_one({"_id": admin["_id"]})
+    await master_db["organizations"].find_one({"_id": ObjectId(admin["organization_id"])})
+
+
+async def lookup_query(email: str):
+    master_db = async_mongodb_client.get_master_db()
+    await master_db["admin_users"].aggregate(_login_pipeline(email)).to_list(length=1)
+
+
+async def legacy_login(email: str):
+    organization_cache.clear()
+    success, admin_user, _ = await AsyncAdminUserService.authenticate(email, PASSWORD)
+    await AsyncAdminUserService.get_organization_by_admin(str(admin_user._id))
+
+
+async def lookup_login(email: str):
+    await AsyncAdminUserService.authenticate_with_organization(email, PASSWORD)
+
+
+async def measure(func, iterations: int, tenants: int):
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(iterations):
+        email = f"admin{random.randrange(tenants)}@bench.example"
+        t0 = time.perf_counter()
+        await func(email)
+        latencies.append(time.perf_counter() - t0)
+    return summarize(latencies, time.perf_counter() - start)
+
+
+async def main(args):
+    if args.in_memory:
+        from benchmarks.inmemory import install
+
+        install()
+    mongodb_client.connect()
+    await async_mongodb_client.connect()
+    seed(args.tenants)
+
+    rows = {
+        "before db-only (3 RTT)": await measure(legacy_queries, args.iterations, args.tenants),
+        "after  db-only (1 RTT)": await measure(lookup_query, args.iterations, args.tenants),
+        "before full login": await measure(legacy_login, args.login_iterations, args.tenants),
+        "after  full login": await measure(lookup_login, args.login_iterations, args.tenants),
+    }
+    print_table("/admin/login latency", rows)
+
+    mongodb_client.client.drop_database(settings.MASTER_DB_NAME)
+    password_pool.shutdown()
+    async_mongodb_client.disconnect()
+    mongodb_client.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--login-iterations", type=int, default=100)
+    parser.add_argument("--tenants", type=int, default=1000)
+    parser.add_argument("--in-memory", action="store_true", help="use the in-memory MongoDB stand-in")
+    asyncio.run(main(parser.parse_args()))
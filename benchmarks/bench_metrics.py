@@ -0,0 +1,165 @@
+"""
+Metrics overhead benchmark: requests with METRICS_ENABLED off vs on.
+
+Requests are driven straight through the ASGI app, with no HTTP server
+or client in the way, so the instrumentation's share is as large as it
+can get. Scenarios:
+
+  /health                   middleware only (no I/O, worst case)
+  /org/get (cached)         middleware, organization served from cache (no I/O)
+  /org/get (uncached)       middleware + MongoDB command listener
+  /admin/login              middleware + MongoDB + bcrypt + JWT signing
+
+The command listener is attached when a client is created, so the clients
+are reconnected for every phase. Off and on phases alternate (in either
+order) for `--rounds` rounds. The overhead is the median of the per-round
+differences. That holds up on noisy machines better than comparing the
+fastest rounds.
+
+The no-I/O scenarios show the fixed cost per request, in microseconds,
+and are reported but not gated. The run fails if a scenario that reaches
+MongoDB is more than `--max-overhead` percent slower with metrics on.
+
+Requires a running MongoDB at MONGODB_URL.
+
+Usage:
+    python -m benchmarks.bench_metrics --requests 500 --rounds 20
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from datetime import datetime
+
+from bson import ObjectId
+
+from benchmarks.common import asgi_request, use_bench_database
+
+settings = use_bench_database()
+
+from app.core.password import hash_password, password_pool  # noqa: E402
+from app.db.mongodb import mongodb_client, async_mongodb_client  # noqa: E402
+from app.main import app  # noqa: E402
+from app.services.cache import organization_cache  # noqa: E402
+
+ORG_NAME = "bench-metrics-org"
+EMAIL = "admin@bench-metrics.example"
+PASSWORD = "benchmark-password"
+
+
+def seed():
+    master_db = mongodb_client.get_master_db()
+    master_db["organizations"].delete_many({})
+    master_db["admin_users"].delete_many({})
+    org_id, admin_id = ObjectId(), ObjectId()
+    master_db["organizations"].insert_one({
+        "_id": org_id,
+        "organization_name": ORG_NAME,
+        "collection_name": "org_bench_metrics_org",
+        "admin_id": str(admin_id),
+        "created_at": datetime.utcnow(),
+        "cluster": "default",
+    })
+    master_db["admin_users"].insert_one({
+        "_id": admin_id,
+        "email": EMAIL,
+        "hashed_password": hash_password(PASSWORD),
+        "organization_id": str(org_id),
+        "created_at": datetime.utcnow(),
+    })
+
+
+async def call(method: str, path: str, query: str = "", body: bytes = b"") -> int:
+    status, _ = await asgi_request(app, method, path, query, body)
+    return status
+
+
+async def health():
+    return await call("GET", "/health")
+
+
+async def org_get_cached():
+    return await call("GET", "/org/get", f"organization_name={ORG_NAME}")
+
+
+async def org_get_uncached():
+    organization_cache.clear()
+    return await call("GET", "/org/get", f"organization_name={ORG_NAME}")
+
+
+LOGIN_BODY = json.dumps({"email": EMAIL, "password": PASSWORD}).encode()
+
+
+async def login():
+    return await call("POST", "/admin/login", body=LOGIN_BODY)
+
+
+async def per_request_us(func, requests: int) -> float:
+    start = time.perf_counter()
+    for _ in range(requests):
+        status = await func()
+        assert status == 200, f"{func.__name__} returned {status}"
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+async def main(args):
+    # name -> (request, requests per round, gated)
+    scenarios = {
+        "/health": (health, args.requests, False),
+        "/org/get (cached)": (org_get_cached, args.requests, False),
+        "/org/get (uncached)": (org_get_uncached, args.requests, True),
+        # bcrypt dominates; a few calls are enough
+        "/admin/login": (login, args.login_requests, True),
+    }
+    samples = {name: {False: [], True: []} for name in scenarios}
+
+    mongodb_client.connect()
+    seed()
+    mongodb_client.disconnect()
+
+    for round_number in range(args.rounds):
+        for enabled in (False, True) if round_number % 2 else (True, False):
+            settings.METRICS_ENABLED = enabled
+            mongodb_client.connect()
+            await async_mongodb_client.connect()
+            for name, (func, requests, _) in scenarios.items():
+                await func()  # warm up
+                samples[name][enabled].append(await per_request_us(func, requests))
+            async_mongodb_client.disconnect()
+            mongodb_client.disconnect()
+
+    print(f"\nPer-request time, median of {args.rounds} rounds (us)")
+    print("-" * 76)
+    print(f"{'scenario':<24}{'metrics off':>13}{'metrics on':>13}{'added':>12}{'overhead':>12}")
+    failed = False
+    for name, (_, _, gated) in scenarios.items():
+        off, on = samples[name][False], samples[name][True]
+        added = statistics.median(b - a for a, b in zip(off, on))
+        overhead = added / statistics.median(off) * 100
+        failed = failed or (gated and overhead > args.max_overhead)
+        note = "" if gated else "  (no I/O, not gated)"
+        print(
+            f"{name:<24}{statistics.median(off):>13.1f}{statistics.median(on):>13.1f}"
+            f"{added:>12.2f}{overhead:>11.2f}%{note}"
+        )
+
+    mongodb_client.connect()
+    mongodb_client.client.drop_database(settings.MASTER_DB_NAME)
+    mongodb_client.disconnect()
+    password_pool.shutdown()
+    if failed:
+        print(f"\nFAIL: instrumentation overhead above {args.max_overhead}%")
+        sys.exit(1)
+    print(f"\nOK: instrumentation overhead within {args.max_overhead}%")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=500, help="requests per scenario and round")
+    parser.add_argument("--login-requests", type=int, default=5)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--max-overhead", type=float, default=2.0, help="percent")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,308 @@
+"""
+Microbenchmarks of the per-request CPU hot spots, with JSON output.
+
+Each helper is timed in isolation, as microseconds per call (best of
+`--repeat` runs of at least `--min-time` seconds each):
+
+  validators   sanitize_org_name, validate_org_name
+  security     create_access_token, decode_token
+  models       Organization.to_dict / from_dict (dict and raw BSON)
+  schemas      CreateOrganizationRequest / AdminLoginRequest validation (EmailStr)
+  placement    HashRing.node_for
+  responses    login / create response serialization
+  bcrypt       hashpw and checkpw at each `--bcrypt-rounds` cost factor
+
+The CPU budget then lists the helpers /admin/login and /org/create run
+for one request, in order, with their share of the request. bcrypt uses
+the application's own hash_password / verify_password. With
+--end-to-end, whole requests are measured as well: bcrypt is then the
+time the password pool spent per request, and the event loop's CPU time
+beyond the listed helpers is reported as "framework, routing and
+database driver". Motor runs the driver on its own threads, so against
+a real MongoDB that line covers the driver's event loop side only. in-memory uses the stand-in from benchmarks/inmemory.py, and
+mongodb uses MONGODB_URL.
+
+Results are printed as tables and, with --output, written as JSON
+(metadata, per-helper timings and budgets) for tracking over time.
+
+Runs without MongoDB unless --end-to-end mongodb is given.
+
+Usage:
+    python -m benchmarks.bench_micro --output micro.json
+    python -m benchmarks.bench_micro --end-to-end in-memory --output micro.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict
+
+import bcrypt
+import bson
+from bson import ObjectId
+from bson.raw_bson import RawBSONDocument
+
+from app.core.password import hash_password, verify_password
+from app.core.responses import respond
+from app.core.security import create_access_token, decode_token
+from app.db.placement import HashRing, placement_clusters
+from app.models.models import AdminUser, Organization
+from app.schemas.schemas import (
+    AdminLoginRequest,
+    CreateOrganizationRequest,
+    DataResponse,
+    OrganizationResponse,
+    TokenResponse,
+)
+from app.services.services import _build_organization
+from app.utils.validators import sanitize_org_name, validate_org_name
+
+ORG_NAME = "Acme Widgets-42"
+EMAIL = "admin@acme-widgets.example.com"
+PASSWORD = "correct-horse-battery"
+
+
+def measure(func: Callable, min_time: float, repeat: int) -> dict:
+    """Best of `repeat` timed runs, each lasting at least `min_time` seconds"""
+    iterations = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / 10:
+            break
+        iterations *= 10
+    iterations = max(1, int(iterations * min_time / elapsed))
+
+    best = elapsed / (iterations if elapsed >= min_time else 1)
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        best = min(best, (time.perf_counter() - start) / iterations)
+    return {"us_per_call": round(best * 1e6, 3), "calls_per_sec": round(1 / best, 1), "iterations": iterations}
+
+
+def fixtures() -> dict:
+    org, admin = _build_organization(ORG_NAME, EMAIL, hash_password(PASSWORD), "default")
+    org_document = org.to_dict()
+    admin_document = admin.to_dict()
+    claims = {
+        "sub": str(admin._id),
+        "admin_id": str(admin._id),
+        "organization_id": str(org._id),
+        "organization_name": org.organization_name,
+        "email": admin.email,
+    }
+    return {
+        "org": org,
+        "admin": admin,
+        "org_document": org_document,
+        "org_raw": RawBSONDocument(bson.encode(org_document)),
+        "admin_document": admin_document,
+        "claims": claims,
+        "token": create_access_token(claims),
+        "create_body": json.dumps({"organization_name": ORG_NAME, "email": EMAIL, "password": PASSWORD}),
+        "login_body": json.dumps({"email": EMAIL, "password": PASSWORD}),
+        "ring": HashRing(placement_clusters()),
+    }
+
+
+def helper_benchmarks(f: dict, bcrypt_rounds) -> Dict[str, Callable]:
+    token_response = lambda: DataResponse[TokenResponse](  # noqa: E731
+        message="Login successful",
+        data=TokenResponse(
+            access_token=f["token"],
+            token_type="bearer",
+            refresh_token="x" * 43,
+            admin_id=f["claims"]["admin_id"],
+            organization_id=f["claims"]["organization_id"],
+            organization_name=ORG_NAME,
+        ),
+    )
+    org_response = lambda: DataResponse[OrganizationResponse](  # noqa: E731
+        message="Organization created successfully",
+        data=OrganizationResponse(
+            organization_name=f["org"].organization_name,
+            collection_name=f["org"].collection_name,
+            admin_id=f["org"].admin_id,
+            created_at=f["org"].created_at,
+        ),
+    )
+    benchmarks = {
+        "validators.sanitize_org_name": lambda: sanitize_org_name(ORG_NAME),
+        "validators.validate_org_name": lambda: validate_org_name(ORG_NAME),
+        "security.create_access_token": lambda: create_access_token(f["claims"]),
+        "security.decode_token": lambda: decode_token(f["token"]),
+        "models.Organization.to_dict": f["org"].to_dict,
+        "models.Organization.from_dict": lambda: Organization.from_dict(f["org_document"]),
+        "models.Organization.from_dict(raw)+access": lambda: Organization.from_dict(f["org_raw"]).organization_name,
+        "models.AdminUser.from_dict": lambda: AdminUser.from_dict(f["admin_document"]),
+        "models.build_organization": lambda: _build_organization(ORG_NAME, EMAIL, "x", "default"),
+        "schemas.CreateOrganizationRequest": lambda: CreateOrganizationRequest.model_validate(
+            json.loads(f["create_body"])
+        ),
+        "schemas.AdminLoginRequest": lambda: AdminLoginRequest.model_validate(json.loads(f["login_body"])),
+        "placement.HashRing.node_for": lambda: f["ring"].node_for(ORG_NAME),
+        "responses.login": lambda: respond("/admin/login", token_response()),
+        "responses.create": lambda: respond("/org/create", org_response()),
+    }
+    for rounds in bcrypt_rounds:
+        hashed = bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(rounds=rounds))
+        benchmarks[f"bcrypt.hashpw(rounds={rounds})"] = (
+            lambda rounds=rounds: bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(rounds=rounds))
+        )
+        benchmarks[f"bcrypt.checkpw(rounds={rounds})"] = (
+            lambda hashed=hashed: bcrypt.checkpw(PASSWORD.encode(), hashed)
+        )
+    return benchmarks
+
+
+def budget_steps(f: dict) -> Dict[str, Dict[str, Callable]]:
+    """The helpers each request runs, in order"""
+    hashed = f["admin"].hashed_password
+    helpers = helper_benchmarks(f, [])
+    return {
+        "/admin/login": {
+            "request validation": helpers["schemas.AdminLoginRequest"],
+            "admin/org decode": lambda: (
+                AdminUser.from_dict(f["admin_document"]),
+                Organization.from_dict(f["org_document"]),
+            ),
+            "bcrypt verify_password": lambda: verify_password(PASSWORD, hashed),
+            "create_access_token": helpers["security.create_access_token"],
+            "response serialization": helpers["responses.login"],
+        },
+        "/org/create": {
+            "request validation": helpers["schemas.CreateOrganizationRequest"],
+            "validate_org_name": helpers["validators.validate_org_name"],
+            "bcrypt hash_password": lambda: hash_password(PASSWORD),
+            "tenant placement": helpers["placement.HashRing.node_for"],
+            "build models (sanitize, ids)": helpers["models.build_organization"],
+            "to_dict (org + admin)": lambda: (f["org"].to_dict(), f["admin"].to_dict()),
+            "response serialization": helpers["responses.create"],
+        },
+    }
+
+
+async def end_to_end_cpu_us(backend: str, requests: int) -> Dict[str, Dict[str, float]]:
+    """CPU time per request for sequential creates and logins
+
+    "loop" is CPU time on the event loop thread, "bcrypt" the time the
+    password pool spent on the request.
+    """
+    from benchmarks.bench_api import InProcessTarget
+    from app.core.password import password_pool
+
+    target = InProcessTarget(in_memory=backend == "in-memory")
+    await target.start()
+    totals = {"/org/create": [0.0, 0.0], "/admin/login": [0.0, 0.0]}
+    try:
+        for i in range(requests):
+            name, email = f"micro-{ObjectId()}", f"micro{i}@example.com"
+            for endpoint, body in (
+                ("/org/create", {"organization_name": name, "email": email, "password": PASSWORD}),
+                ("/admin/login", {"email": email, "password": PASSWORD}),
+            ):
+                start, bcrypt_start = time.thread_time(), password_pool._total_run
+                status, _ = await target.request("POST", endpoint, body=body)
+                totals[endpoint][0] += time.thread_time() - start
+                totals[endpoint][1] += password_pool._total_run - bcrypt_start
+                assert status == 200, f"{endpoint} returned {status}"
+    finally:
+        await target.stop()
+    return {
+        endpoint: {"loop": loop / requests * 1e6, "bcrypt": bcrypt_run / requests * 1e6}
+        for endpoint, (loop, bcrypt_run) in totals.items()
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def main(args):
+    f = fixtures()
+
+    results = {}
+    for name, func in helper_benchmarks(f, args.bcrypt_rounds).items():
+        results[name] = measure(func, args.min_time, args.repeat)
+    print(f"\nHelper timings (best of {args.repeat})")
+    print("-" * 64)
+    for name, row in results.items():
+        print(f"{name:<44}{row['us_per_call']:>14.2f} us")
+
+    measured = {}
+    if args.end_to_end:
+        measured = asyncio.run(end_to_end_cpu_us(args.end_to_end, args.requests))
+
+    budgets = {}
+    for endpoint, steps in budget_steps(f).items():
+        timings = {step: measure(func, args.min_time, args.repeat)["us_per_call"] for step, func in steps.items()}
+        if endpoint in measured:
+            bcrypt_step = next(step for step in timings if step.startswith("bcrypt"))
+            timings[bcrypt_step] = measured[endpoint]["bcrypt"]
+            other = sum(us for step, us in timings.items() if step != bcrypt_step)
+            timings["framework, routing and database driver"] = max(0.0, measured[endpoint]["loop"] - other)
+            total = sum(timings.values())
+        else:
+            total = sum(timings.values())
+        budgets[endpoint] = {
+            "total_us": round(total, 2),
+            "measured": endpoint in measured,
+            "steps": {
+                step: {"us": round(us, 2), "share": round(us / total, 4) if total else 0.0}
+                for step, us in timings.items()
+            },
+        }
+        source = f"measured end-to-end ({args.end_to_end})" if endpoint in measured else "sum of steps"
+        print(f"\nCPU budget {endpoint}: {total:.0f} us per request ({source})")
+        print("-" * 64)
+        for step, row in budgets[endpoint]["steps"].items():
+            print(f"{step:<44}{row['us']:>12.2f} us{row['share']:>7.1%}")
+
+    if args.output:
+        report = {
+            "meta": {
+                "timestamp": datetime.utcnow().isoformat(),
+                "git_commit": git_commit(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+            },
+            "config": {
+                "repeat": args.repeat,
+                "min_time": args.min_time,
+                "bcrypt_rounds": args.bcrypt_rounds,
+                "end_to_end": args.end_to_end,
+            },
+            "benchmarks": results,
+            "budgets": budgets,
+        }
+        with open(args.output, "w") if args.output != "-" else sys.stdout as out:
+            json.dump(report, out, indent=2)
+        if args.output != "-":
+            print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per timed run")
+    parser.add_argument("--bcrypt-rounds", type=int, nargs="+", default=[4, 8, 10, 12])
+    parser.add_argument("--end-to-end", choices=["in-memory", "mongodb"], help="also measure whole requests")
+    parser.add_argument("--requests", type=int, default=5, help="requests per endpoint for --end-to-end")
+    parser.add_argument("--output", help="write JSON results to this file ('-' for stdout)")
+    main(parser.parse_args())
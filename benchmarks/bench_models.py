@@ -0,0 +1,181 @@
+"""
+Model memory and decode benchmark: dict-backed vs __slots__ models.
+
+Memory: tracemalloc measures the bytes retained per cached Organization
+for the original dict-backed class, the __slots__ model built from a
+decoded document, and the __slots__ model wrapping an undecoded
+RawBSONDocument (before and after its first field access).
+
+Decode time: microseconds per request to turn the BSON returned by the
+server into a model and read what the request needs, for full documents
+decoded eagerly (the original path) and for projected documents wrapped
+raw and decoded on first access.
+
+Runs without MongoDB.
+
+Usage:
+    python -m benchmarks.bench_models --objects 10000 --iterations 100000
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+from datetime import datetime
+
+import bson
+from bson import ObjectId
+from bson.raw_bson import RawBSONDocument
+
+from app.models.models import Organization
+from app.services.services import ADMIN_AUTH_PROJECTION, ORGANIZATION_PROJECTION
+
+
+class DictOrganization:
+    """The original dict-backed Organization model"""
+
+    def __init__(self, organization_name, collection_name, admin_id, created_at=None, _id=None, cluster=None):
+        self._id = _id or ObjectId()
+        self.organization_name = organization_name
+        self.collection_name = collection_name
+        self.admin_id = admin_id
+        self.created_at = created_at or datetime.utcnow()
+        self.cluster = cluster
+
+    @staticmethod
+    def from_dict(data):
+        return DictOrganization(
+            organization_name=data.get("organization_name"),
+            collection_name=data.get("collection_name"),
+            admin_id=data.get("admin_id"),
+            created_at=data.get("created_at"),
+            _id=data.get("_id"),
+            cluster=data.get("cluster"),
+        )
+
+
+def org_document(i: int) -> dict:
+    return {
+        "_id": ObjectId(),
+        "organization_name": f"bench-org-{i}",
+        "collection_name": f"org_bench_org_{i}",
+        "admin_id": str(ObjectId()),
+        "created_at": datetime.utcnow(),
+        "cluster": "default",
+    }
+
+
+def admin_document(i: int) -> dict:
+    return {
+        "_id": ObjectId(),
+        "email": f"admin{i}@bench.example",
+        "hashed_password": "$2b$12$" + "x" * 53,
+        "organization_id": str(ObjectId()),
+        "created_at": datetime.utcnow(),
+    }
+
+
+def project(document: dict, projection: dict) -> dict:
+    return {key: value for key, value in document.items() if key in projection or key == "_id"}
+
+
+def retained_bytes(build, count: int, touch=None) -> float:
+    """Bytes per object still allocated after building `count` objects"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [build(i) for i in range(count)]
+    if touch:
+        for obj in objects:
+            touch(obj)
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    return (after - before) / count
+
+
+def per_call_us(func, iterations: int, repeat: int = 5) -> float:
+    """Best of `repeat` runs, in microseconds per call"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        best = min(best, time.perf_counter() - start)
+    return best / iterations * 1e6
+
+
+def main(args):
+    docs = [org_document(i) for i in range(args.objects)]
+    encoded = [bson.encode(doc) for doc in docs]
+
+    memory = {
+        "dict-backed (before)": retained_bytes(
+            lambda i: DictOrganization.from_dict(bson.decode(encoded[i])), args.objects
+        ),
+        "slots, decoded": retained_bytes(
+            lambda i: Organization.from_dict(bson.decode(encoded[i])), args.objects
+        ),
+        "slots, raw (undecoded)": retained_bytes(
+            lambda i: Organization.from_dict(RawBSONDocument(encoded[i])), args.objects
+        ),
+        "slots, raw then accessed": retained_bytes(
+            lambda i: Organization.from_dict(RawBSONDocument(encoded[i])),
+            args.objects,
+            touch=lambda org: org.organization_name,
+        ),
+    }
+    print(f"\nMemory per cached Organization ({args.objects} objects)")
+    print("-" * 50)
+    for name, size in memory.items():
+        print(f"{name:<28}{size:>10.0f} bytes")
+
+    org_full = bson.encode(docs[0])
+    org_projected = bson.encode(project(docs[0], ORGANIZATION_PROJECTION))
+    admin = admin_document(0)
+    admin_full = bson.encode(admin)
+    admin_projected = bson.encode(project(admin, ADMIN_AUTH_PROJECTION))
+    admin_lookup = bson.encode({"_id": admin["_id"], "organization_id": admin["organization_id"]})
+
+    def org_eager():
+        DictOrganization.from_dict(bson.decode(org_full)).organization_name
+
+    def org_lazy():
+        Organization.from_dict(RawBSONDocument(org_projected)).organization_name
+
+    def org_cache_fill():
+        Organization.from_dict(RawBSONDocument(org_projected))
+
+    def admin_eager():
+        bson.decode(admin_full)["hashed_password"]
+
+    def admin_projected_decode():
+        bson.decode(admin_projected)["hashed_password"]
+
+    def admin_for_org_lookup_before():
+        bson.decode(admin_full)["organization_id"]
+
+    def admin_for_org_lookup_after():
+        bson.decode(admin_lookup)["organization_id"]
+
+    timings = {
+        "org: full decode + dict model": org_eager,
+        "org: raw wrap + 1st access": org_lazy,
+        "org: raw wrap, no access": org_cache_fill,
+        "admin auth: full document": admin_eager,
+        "admin auth: projected": admin_projected_decode,
+        "admin->org: full document": admin_for_org_lookup_before,
+        "admin->org: organization_id": admin_for_org_lookup_after,
+    }
+    print(f"\nDecode time per request ({args.iterations} iterations)")
+    print("-" * 50)
+    for name, func in timings.items():
+        print(f"{name:<34}{per_call_us(func, args.iterations):>8.2f} us")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--objects", type=int, default=10000)
+    parser.add_argument("--iterations", type=int, default=100000)
+    main(parser.parse_args())
@@ -0,0 +1,144 @@
+"""
+/org/list benchmark: keyset pagination vs skip/limit at 1M organizations.
+
+Seeds `--organizations` organization documents (reused across runs when
+the count already matches), then times single pages through
+AsyncOrganizationService.list_organizations: the first page, pages
+starting at a random depth (cursor after a random name), and prefix
+filtered pages. For comparison the same random depths are fetched with
+skip/limit. explain() at the deepest position shows how many index keys
+and documents each approach examines.
+
+Requires a running MongoDB at MONGODB_URL.
+
+Usage:
+    python -m benchmarks.bench_org_list --organizations 1000000 --iterations 200
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime
+
+from bson import ObjectId
+
+from benchmarks.common import print_table, summarize, use_bench_database
+
+settings = use_bench_database()
+
+from app.db.mongodb import mongodb_client, async_mongodb_client  # noqa: E402
+from app.services.services import AsyncOrganizationService, encode_cursor  # noqa: E402
+
+BATCH = 10000
+
+
+def org_name(i: int) -> str:
+    return f"bench-org-{i:07d}"
+
+
+def seed(organizations: int):
+    """Insert organization documents in batches"""
+    orgs_collection = mongodb_client.get_master_db()["organizations"]
+    if orgs_collection.estimated_document_count() == organizations:
+        return
+    orgs_collection.delete_many({})
+    start = time.perf_counter()
+    for offset in range(0, organizations, BATCH):
+        orgs_collection.insert_many(
+            [
+                {
+                    "_id": ObjectId(),
+                    "organization_name": org_name(i),
+                    "collection_name": f"org_bench_org_{i}",
+                    "admin_id": str(ObjectId()),
+                    "created_at": datetime.utcnow(),
+                    "cluster": "default",
+                }
+                for i in range(offset, min(offset + BATCH, organizations))
+            ],
+            ordered=False,
+        )
+    print(f"Seeded {organizations} organizations in {time.perf_counter() - start:.1f}s")
+
+
+async def keyset_page(depth: int, limit: int, prefix=None):
+    cursor = encode_cursor(org_name(depth)) if depth else None
+    success, organizations, _, message = await AsyncOrganizationService.list_organizations(
+        prefix=prefix, fields=["created_at"], limit=limit, cursor=cursor
+    )
+    assert success and organizations, message
+
+
+async def skip_page(depth: int, limit: int):
+    orgs_collection = async_mongodb_client.get_master_db()["organizations"]
+    await orgs_collection.find(
+        {"deleted_at": None}, {"_id": 0, "organization_name": 1, "created_at": 1}
+    ).sort("organization_name", 1).skip(depth).limit(limit + 1).to_list(length=limit + 1)
+
+
+async def measure(func, iterations: int):
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        await func()
+        latencies.append(time.perf_counter() - t0)
+    return summarize(latencies, time.perf_counter() - start)
+
+
+def explain_examined(depth: int, limit: int) -> dict:
+    """Keys/documents examined by a page at `depth`, keyset vs skip"""
+    orgs_collection = mongodb_client.get_master_db()["organizations"]
+    keyset = orgs_collection.find(
+        {"organization_name": {"$gt": org_name(depth)}, "deleted_at": None}
+    ).sort("organization_name", 1).limit(limit + 1).explain()["executionStats"]
+    skip = orgs_collection.find(
+        {"deleted_at": None}
+    ).sort("organization_name", 1).skip(depth).limit(limit + 1).explain()["executionStats"]
+    return {
+        "keyset": (keyset["totalKeysExamined"], keyset["totalDocsExamined"]),
+        "skip": (skip["totalKeysExamined"], skip["totalDocsExamined"]),
+    }
+
+
+async def main(args):
+    mongodb_client.connect()
+    await async_mongodb_client.connect()
+    seed(args.organizations)
+    n, limit = args.organizations, args.limit
+
+    def deep():
+        return random.randrange(n - limit)
+
+    def random_prefix():
+        # Prefixes matching ~1000 organizations
+        return org_name(deep())[:-3]
+
+    rows = {
+        "keyset first page": await measure(lambda: keyset_page(0, limit), args.iterations),
+        "keyset random depth": await measure(lambda: keyset_page(deep(), limit), args.iterations),
+        "keyset prefix": await measure(lambda: keyset_page(0, limit, random_prefix()), args.iterations),
+        "skip random depth": await measure(lambda: skip_page(deep(), limit), args.skip_iterations),
+    }
+    print_table(f"/org/list page latency ({n} organizations, limit {limit})", rows)
+
+    examined = explain_examined(n - limit - 1, limit)
+    print(f"\nExamined at depth {n - limit - 1} (keys, docs):")
+    for name, (keys, docs) in examined.items():
+        print(f"  {name:<8} keys={keys:<10} docs={docs}")
+
+    if not args.keep:
+        mongodb_client.client.drop_database(settings.MASTER_DB_NAME)
+    async_mongodb_client.disconnect()
+    mongodb_client.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--organizations", type=int, default=1000000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--skip-iterations", type=int, default=20)
+    parser.add_argument("--keep", action="store_true", help="keep the seeded organizations for the next run")
+    asyncio.run(main(parser.parse_args()))
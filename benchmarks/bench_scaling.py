@@ -0,0 +1,197 @@
+"""
+Worker scaling benchmark: throughput of `python -m app.server` with 1..N workers.
+
+For each worker count the launcher is started in a subprocess, one
+organization is seeded in the master before it forks (so the workers
+exercise the per-worker reconnect after fork), and `--clients` client
+processes with `--connections` keep-alive connections each drive one
+scenario at a time for `--duration` seconds:
+
+  health    GET /health            framework only, no I/O
+  get       GET /org/get           organization served from the worker's cache
+  login     POST /admin/login      MongoDB read + bcrypt + JWT signing
+
+Speedup is the RPS relative to one worker; efficiency divides it by the
+worker count. The load generator runs on the same machine and takes CPU
+from the workers, so efficiency flattens before the core count does.
+
+Runs against MONGODB_URL (the throwaway bench database), or the in-memory
+MongoDB stand-in with `--in-memory` (pip install mongomock mongomock-motor),
+where every worker gets a copy of the seeded data.
+
+Usage:
+    python -m benchmarks.bench_scaling --workers 1 2 4 --duration 5
+    python -m benchmarks.bench_scaling --in-memory --scenarios health get
+"""
+
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+
+from benchmarks.common import percentile, use_bench_database
+
+
+ORG = "bench-scale"
+EMAIL = "admin@bench-scale.example"
+PASSWORD = "bench-password-1"
+
+SCENARIOS = {
+    "health": ("GET", "/health", None),
+    "get": ("GET", f"/org/get?organization_name={ORG}", None),
+    "login": ("POST", "/admin/login", json.dumps({"email": EMAIL, "password": PASSWORD})),
+}
+
+SERVER = """
+from benchmarks.bench_scaling import serve
+serve({in_memory}, {argv!r})
+"""
+
+
+def serve(in_memory: bool, argv):
+    """Server subprocess: seed the bench database in the master, then run the launcher"""
+    use_bench_database()
+    if in_memory:
+        from benchmarks.inmemory import install
+
+        install()
+    from app.db.mongodb import mongodb_client
+    from app.server import main
+    from app.services.services import OrganizationService
+
+    mongodb_client.connect()
+    OrganizationService.create_organization(ORG, EMAIL, PASSWORD)
+    main(argv)
+
+
+def drive(port: int, scenario: str, connections: int, duration: float, results):
+    """Client process: `connections` threads, each on one keep-alive connection"""
+    method, path, body = SCENARIOS[scenario]
+    headers = {"Content-Type": "application/json"} if body else {}
+    latencies, errors = [], [0]
+    deadline = time.perf_counter() + duration
+
+    def loop():
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                response.read()
+            except (OSError, http.client.HTTPException):
+                errors[0] += 1
+                conn.close()
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+                continue
+            if response.status == 200:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors[0] += 1
+        conn.close()
+
+    threads = [threading.Thread(target=loop) for _ in range(connections)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    results.put((latencies, errors[0]))
+
+
+def wait_ready(port: int, workers: int, timeout: float) -> bool:
+    """Wait until /readyz answers 200 on (very likely) every worker"""
+    deadline = time.monotonic() + timeout
+    streak = 0
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/readyz", timeout=1) as response:
+                streak = streak + 1 if response.status == 200 else 0
+        except (urllib.error.URLError, OSError):
+            streak = 0
+        if streak >= 4 * workers:
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def measure(port: int, scenario: str, args) -> dict:
+    """RPS and latency of one scenario against the running server"""
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    clients = [
+        context.Process(target=drive, args=(port, scenario, args.connections, args.duration, results))
+        for _ in range(args.clients)
+    ]
+    for client in clients:
+        client.start()
+    latencies, errors = [], 0
+    for _ in clients:
+        client_latencies, client_errors = results.get()
+        latencies += client_latencies
+        errors += client_errors
+    for client in clients:
+        client.join()
+    return {
+        "rps": round(len(latencies) / args.duration, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "errors": errors,
+    }
+
+
+def run_workers(workers: int, args) -> dict:
+    """Start the launcher with `workers` workers and measure every scenario"""
+    argv = ["--workers", str(workers), "--host", "127.0.0.1", "--port", str(args.port), "--log-level", "warning"]
+    code = SERVER.format(in_memory=args.in_memory, argv=argv)
+    env = dict(os.environ, METRICS_ENABLED="false")
+    server = subprocess.Popen([sys.executable, "-c", code], env=env, stdout=subprocess.DEVNULL)
+    try:
+        if not wait_ready(args.port, workers, timeout=60):
+            raise SystemExit(f"Server with {workers} workers did not become ready")
+        return {scenario: measure(args.port, scenario, args) for scenario in args.scenarios}
+    finally:
+        server.terminate()
+        server.wait(timeout=60)
+
+
+def main(args):
+    results = {workers: run_workers(workers, args) for workers in args.workers}
+    base = results[args.workers[0]]
+    for scenario in args.scenarios:
+        print(f"\n{scenario} ({' '.join(SCENARIOS[scenario][:2])})")
+        print(f"{'workers':>8}{'rps':>10}{'p50_ms':>10}{'p99_ms':>10}{'errors':>8}{'speedup':>9}{'efficiency':>12}")
+        for workers, row in results.items():
+            row = row[scenario]
+            speedup = row["rps"] / base[scenario]["rps"] if base[scenario]["rps"] else 0.0
+            efficiency = speedup / (workers / args.workers[0])
+            print(
+                f"{workers:>8}{row['rps']:>10}{row['p50_ms']:>10}{row['p99_ms']:>10}"
+                f"{row['errors']:>8}{speedup:>9.2f}{efficiency:>12.0%}"
+            )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"cpu_count": os.cpu_count(), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    cores = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--workers", type=int, nargs="+",
+        default=sorted({1, *(2 ** i for i in range(1, cores.bit_length()) if 2 ** i <= cores), cores}),
+    )
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per scenario")
+    parser.add_argument("--clients", type=int, default=max(1, cores // 2), help="load generator processes")
+    parser.add_argument("--connections", type=int, default=8, help="keep-alive connections per client")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--in-memory", action="store_true", help="use the in-memory MongoDB stand-in")
+    parser.add_argument("--output", help="write the results as JSON")
+    main(parser.parse_args())
@@ -0,0 +1,147 @@
+"""
+Response serialization benchmark: standard vs fast JSON path.
+
+For representative payloads (a single organization, /org/list pages,
+a login token and a bulk-create result) this times, in microseconds per
+response, the work done between the route returning and the body bytes
+being ready:
+
+  dict (before)  hand-built dict with isoformat(), jsonable_encoder + json
+  standard       typed model, model_dump(mode="json") + json (FAST_JSON_RESPONSES=False)
+  fast           typed model, pydantic-core to_json (FAST_JSON_RESPONSES=True)
+
+Model construction is included for the typed paths.
+
+Runs without MongoDB.
+
+Usage:
+    python -m benchmarks.bench_serialization --iterations 20000
+"""
+
+import argparse
+import time
+from datetime import datetime
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.core.config import settings
+from app.core.responses import respond
+from app.schemas.schemas import (
+    BulkCreateResponse,
+    DataResponse,
+    OrganizationListResponse,
+    OrganizationResponse,
+    TokenResponse,
+)
+
+
+def organization(i: int) -> dict:
+    return {
+        "organization_name": f"bench-org-{i:07d}",
+        "collection_name": f"org_bench_org_{i}",
+        "admin_id": str(ObjectId()),
+        "created_at": datetime.utcnow(),
+    }
+
+
+def payloads(list_limit: int, bulk_items: int) -> dict:
+    """name -> (build dict body, build typed model, list items per response)"""
+    org = organization(0)
+    page = [organization(i) for i in range(list_limit)]
+    token = {
+        "access_token": "eyJ" + "x" * 240,
+        "token_type": "bearer",
+        "refresh_token": "x" * 43,
+        "admin_id": str(ObjectId()),
+        "organization_id": str(ObjectId()),
+        "organization_name": "bench-org-0000000",
+    }
+    bulk = [
+        {"index": i, "organization_name": f"bench-org-{i}", "success": True, "message": "Organization created successfully"}
+        for i in range(bulk_items)
+    ]
+
+    def org_dict():
+        return {"message": "Organization retrieved successfully", "data": {**org, "created_at": org["created_at"].isoformat()}}
+
+    def org_model():
+        return DataResponse[OrganizationResponse](
+            message="Organization retrieved successfully", data=OrganizationResponse(**org)
+        )
+
+    def list_dict():
+        organizations = [dict(item) for item in page]
+        for item in organizations:
+            item["created_at"] = item["created_at"].isoformat()
+        return {"message": "Organizations retrieved successfully", "data": {"organizations": organizations, "next_cursor": "abc"}}
+
+    def list_model():
+        return DataResponse[OrganizationListResponse](
+            message="Organizations retrieved successfully",
+            data=OrganizationListResponse(organizations=[dict(item) for item in page], next_cursor="abc"),
+        )
+
+    def token_dict():
+        return {"message": "Login successful", "data": token}
+
+    def token_model():
+        return DataResponse[TokenResponse](message="Login successful", data=TokenResponse(**token))
+
+    def bulk_dict():
+        return {"message": "Bulk create completed", "data": {"total": bulk_items, "succeeded": bulk_items, "failed": 0, "results": bulk}}
+
+    def bulk_model():
+        return DataResponse[BulkCreateResponse](
+            message="Bulk create completed",
+            data=BulkCreateResponse(total=bulk_items, succeeded=bulk_items, failed=0, results=bulk),
+        )
+
+    return {
+        "/org/get": (org_dict, org_model, 1),
+        f"/org/list ({list_limit})": (list_dict, list_model, list_limit),
+        "/admin/login": (token_dict, token_model, 1),
+        f"/org/bulk-create ({bulk_items})": (bulk_dict, bulk_model, bulk_items),
+    }
+
+
+def per_call_us(func, iterations: int, repeat: int = 5) -> float:
+    """Best of `repeat` runs, in microseconds per call"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        best = min(best, time.perf_counter() - start)
+    return best / iterations * 1e6
+
+
+def main(args):
+    print(f"\nSerialization time per response (us, best of 5 x {args.iterations})")
+    print("-" * 72)
+    print(f"{'payload':<26}{'dict (before)':>15}{'standard':>12}{'fast':>10}{'speedup':>9}")
+    for name, (build_dict, build_model, items) in payloads(args.list_limit, args.bulk_items).items():
+        # Keep large payloads from dominating the run time
+        iterations = max(10, args.iterations // items)
+
+        def before():
+            JSONResponse(content=jsonable_encoder(build_dict()))
+
+        def typed():
+            respond(name, build_model())
+
+        baseline = per_call_us(before, iterations)
+        settings.FAST_JSON_RESPONSES = False
+        standard = per_call_us(typed, iterations)
+        settings.FAST_JSON_RESPONSES = True
+        fast = per_call_us(typed, iterations)
+        print(f"{name:<26}{baseline:>15.1f}{standard:>12.1f}{fast:>10.1f}{baseline / fast:>8.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--list-limit", type=int, default=50)
+    parser.add_argument("--bulk-items", type=int, default=1000)
+    main(parser.parse_args())
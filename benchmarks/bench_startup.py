@@ -0,0 +1,106 @@
+"""
+Startup benchmark: time from process spawn to the first served request.
+
+Starts the app under uvicorn in a subprocess, with MONGODB_LAZY_CONNECT
+off (eager: connect, ping and create every index before serving) and on
+(lazy: serve at once, prepare the database in the background), and polls
+/livez and /readyz every `--poll-ms` until each answers 200:
+
+  livez     the process accepts and serves requests
+  readyz    the database answered and the master indexes exist
+
+The eager mode blocks for the whole server selection timeout when MongoDB
+is down, the lazy mode serves /livez regardless and reports 503 on
+/readyz until MongoDB is back. `--in-memory` runs against the in-memory
+MongoDB stand-in (needs `pip install mongomock mongomock-motor`), which
+measures the application's own startup cost.
+
+Usage:
+    python -m benchmarks.bench_startup --runs 5
+    python -m benchmarks.bench_startup --in-memory
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+from benchmarks.common import BENCH_MASTER_DB
+
+
+SERVER = """
+import sys, uvicorn
+if {in_memory}:
+    from benchmarks.inmemory import install
+    install()
+uvicorn.run("app.main:app", host="127.0.0.1", port={port}, log_level="warning")
+"""
+
+
+def status_of(url: str) -> int:
+    """HTTP status of a GET, 0 when nothing is listening yet"""
+    try:
+        with urllib.request.urlopen(url, timeout=1) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except (urllib.error.URLError, ConnectionError, OSError):
+        return 0
+
+
+def measure(lazy: bool, args) -> dict:
+    """Seconds from spawn to the first 200 on /livez and on /readyz"""
+    env = dict(
+        os.environ,
+        MONGODB_LAZY_CONNECT=str(lazy).lower(),
+        MASTER_DB_NAME=BENCH_MASTER_DB,
+        METRICS_ENABLED="false",
+    )
+    code = SERVER.format(in_memory=args.in_memory, port=args.port)
+    base = f"http://127.0.0.1:{args.port}"
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-c", code], env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    first = {"livez": None, "readyz": None}
+    try:
+        while time.perf_counter() - started < args.timeout and None in first.values():
+            for probe in first:
+                if first[probe] is None and status_of(f"{base}/{probe}") == 200:
+                    first[probe] = time.perf_counter() - started
+            if process.poll() is not None:
+                break
+            time.sleep(args.poll_ms / 1000)
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+    return first
+
+
+def main(args):
+    print(f"{'mode':<8}{'livez p50 ms':>16}{'readyz p50 ms':>16}{'readyz missed':>16}")
+    for lazy in (False, True):
+        runs = [measure(lazy, args) for _ in range(args.runs)]
+        row = []
+        for probe in ("livez", "readyz"):
+            times = [run[probe] for run in runs if run[probe] is not None]
+            row.append(f"{statistics.median(times) * 1000:.0f}" if times else "-")
+        missed = sum(1 for run in runs if run["readyz"] is None)
+        print(f"{'lazy' if lazy else 'eager':<8}{row[0]:>16}{row[1]:>16}{missed:>16}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5, help="process starts per mode")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--poll-ms", type=float, default=5.0)
+    parser.add_argument("--timeout", type=float, default=15.0, help="seconds to wait for each probe")
+    parser.add_argument("--in-memory", action="store_true", help="use the in-memory MongoDB stand-in")
+    main(parser.parse_args())
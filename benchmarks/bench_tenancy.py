@@ -0,0 +1,130 @@
+"""
+Tenancy strategy benchmark: database-per-tenant vs collection-per-tenant
+vs shared collection.
+
+For each strategy and tenant count, provisions the tenants, writes a few
+documents per tenant, then measures random single-tenant reads and writes
+and samples server memory from serverStatus (resident memory, WiredTiger
+cache usage, open data handles/files).
+
+Run this against a disposable local mongod only: it creates (and drops)
+up to 100k databases or collections. `--in-memory` runs against the
+in-memory MongoDB stand-in (pip install mongomock mongomock-motor), which
+has no serverStatus: only provisioning time and operation latencies are
+reported, and those show the application's routing cost, not the server's.
+
+Only the in-memory run at 100 and 1000 tenants has been recorded so far.
+Those numbers say nothing about how the strategies compare in server
+memory, file handles or indexed reads at 1k/10k/100k tenants; that needs
+the mongod run above.
+
+Usage:
+    python -m benchmarks.bench_tenancy --tenants 1000 10000 100000 --ops 5000
+    python -m benchmarks.bench_tenancy --in-memory --tenants 100 1000 --ops 2000
+"""
+
+import argparse
+import random
+import time
+
+from benchmarks.common import percentile, use_bench_database
+
+settings = use_bench_database()
+settings.TENANT_DB_NAME = "bench_tenants"
+
+from app.db.mongodb import mongodb_client  # noqa: E402
+from app.db.placement import DEFAULT_CLUSTER  # noqa: E402
+from app.db.tenancy import TENANCY_STRATEGIES, get_tenancy_strategy  # noqa: E402
+
+
+def tenant_name(i: int) -> str:
+    return f"bt{i}"
+
+
+def cleanup():
+    client = mongodb_client.client
+    for name in client.list_database_names():
+        if name.startswith("org_bt") or name == settings.TENANT_DB_NAME:
+            client.drop_database(name)
+    mongodb_client._shared_indexes.clear()
+
+
+def server_memory() -> dict:
+    status = mongodb_client.client.admin.command("serverStatus")
+    wired_tiger = status.get("wiredTiger", {})
+    return {
+        "resident_mb": status.get("mem", {}).get("resident"),
+        "wt_cache_mb": round(wired_tiger.get("cache", {}).get("bytes currently in the cache", 0) / 2**20, 1),
+        "wt_open_files": wired_tiger.get("connection", {}).get("files currently open"),
+        "wt_data_handles": wired_tiger.get("data-handle", {}).get("connection data handles currently active"),
+    }
+
+
+def provision(tenants: int, docs_per_tenant: int) -> float:
+    start = time.perf_counter()
+    for i in range(tenants):
+        name = tenant_name(i)
+        mongodb_client.provision_tenant(name, cluster=DEFAULT_CLUSTER)
+        mongodb_client.get_tenant_collection(name, cluster=DEFAULT_CLUSTER).insert_many(
+            [{"seq": n, "payload": "x" * 64} for n in range(docs_per_tenant)]
+        )
+    return time.perf_counter() - start
+
+
+def measure_ops(tenants: int, ops: int, docs_per_tenant: int) -> dict:
+    reads, writes = [], []
+    for _ in range(ops):
+        collection = mongodb_client.get_tenant_collection(
+            tenant_name(random.randrange(tenants)), cluster=DEFAULT_CLUSTER
+        )
+        start = time.perf_counter()
+        collection.find_one({"seq": random.randrange(docs_per_tenant)})
+        reads.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        collection.insert_one({"seq": -1, "payload": "y" * 64})
+        writes.append(time.perf_counter() - start)
+    return {
+        "read_p50_ms": round(percentile(reads, 50) * 1000, 3),
+        "read_p99_ms": round(percentile(reads, 99) * 1000, 3),
+        "write_p50_ms": round(percentile(writes, 50) * 1000, 3),
+        "write_p99_ms": round(percentile(writes, 99) * 1000, 3),
+    }
+
+
+def main(args):
+    sample_memory = server_memory
+    if args.in_memory:
+        from benchmarks.inmemory import install
+
+        install()
+        sample_memory = dict
+    mongodb_client.connect()
+    try:
+        for strategy in args.strategies:
+            mongodb_client.tenancy = get_tenancy_strategy(strategy)
+            for tenants in args.tenants:
+                cleanup()
+                baseline = sample_memory()
+                provision_seconds = provision(tenants, args.docs)
+                row = {
+                    "strategy": strategy,
+                    "tenants": tenants,
+                    "provision_s": round(provision_seconds, 1),
+                    **measure_ops(tenants, args.ops, args.docs),
+                    **sample_memory(),
+                    "baseline_resident_mb": baseline.get("resident_mb"),
+                }
+                print(row)
+    finally:
+        cleanup()
+        mongodb_client.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--strategies", nargs="+", default=list(TENANCY_STRATEGIES))
+    parser.add_argument("--tenants", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--docs", type=int, default=10, help="documents per tenant")
+    parser.add_argument("--ops", type=int, default=5000, help="random reads/writes per run")
+    parser.add_argument("--in-memory", action="store_true", help="use the in-memory MongoDB stand-in")
+    main(parser.parse_args())
@@ -0,0 +1,109 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Benchmarks talk to the MongoDB instance configured by MONGODB_URL and use
+a throwaway master database so they never touch real tenant data.
+"""
+
+import math
+import os
+import time
+from typing import Dict, List
+
+
+BENCH_MASTER_DB = os.environ.get("BENCH_MASTER_DB", "bench_master_db")
+
+
+def use_bench_database():
+    """Point the application settings at the benchmark master database
+
+    Also turns off login throttling for the benchmark process.
+    """
+    from app.core.config import settings
+
+    settings.MASTER_DB_NAME = BENCH_MASTER_DB
+    # Benchmarks log in far faster than the login throttle allows
+    settings.LOGIN_THROTTLE_ENABLED = False
+    return settings
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of samples"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(latencies: List[float], elapsed: float, errors: int = 0) -> Dict[str, float]:
+    """Summarize per-request latencies (seconds) collected over `elapsed` seconds"""
+    count = len(latencies)
+    total = count + errors
+    return {
+        "requests": count,
+        "rps": round(count / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "error_rate": round(errors / total, 4) if total else 0.0,
+    }
+
+
+def print_table(title: str, rows: Dict[str, Dict[str, float]]):
+    """Print a simple aligned results table"""
+    print(f"\n{title}")
+    print("-" * 78)
+    columns = ["requests", "rps", "p50_ms", "p95_ms", "p99_ms", "error_rate"]
+    widths = [max(9, len(c) + 1) for c in columns]
+    print(f"{'':<24}" + "".join(f"{c:>{w}}" for c, w in zip(columns, widths)))
+    for name, row in rows.items():
+        print(f"{name:<24}" + "".join(f"{row.get(c, ''):>{w}}" for c, w in zip(columns, widths)))
+
+
+class Timer:
+    """Context manager measuring wall time in seconds"""
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
+
+
+async def asgi_request(app, method: str, path: str, query: str = "", body: bytes = b"", headers=()):
+    """
+    Send one request straight to an ASGI app, without an HTTP server
+
+    Returns (status code, response body).
+    """
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": query.encode(),
+        "headers": [(b"host", b"bench"), (b"content-type", b"application/json"), *headers],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+    status = 0
+    chunks = []
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return status, b"".join(chunks)
@@ -0,0 +1,144 @@
+"""
+In-memory MongoDB stand-in for benchmark runs without a mongod.
+
+install() points the application's MongoDB clients at one shared
+mongomock client and fills the gaps between mongomock and the server
+features the service relies on:
+
+  - the `hello` command
+  - the driver's topology view (always a writable server) for /readyz
+  - reads through the RawBSONDocument codec (`with_options`), sync and async
+  - inserting RawBSONDocument batches (streaming migration)
+  - the `hint` option on find
+  - the admin -> organization `$lookup` in the login aggregation
+
+Numbers measured this way describe the application's own CPU cost, not
+MongoDB's. Use a real mongod to measure end-to-end behaviour.
+
+Requires `pip install mongomock mongomock-motor` (not part of
+requirements.txt).
+"""
+
+import bson
+from bson.raw_bson import RawBSONDocument
+
+
+def _raw(document):
+    return RawBSONDocument(bson.encode(document)) if document is not None else None
+
+
+def install():
+    """Replace the MongoDB clients used by app.db.mongodb with mongomock"""
+    try:
+        import mongomock
+        import mongomock_motor
+    except ImportError as e:
+        raise SystemExit(f"The in-memory backend needs mongomock and mongomock-motor: {e}")
+
+    from mongomock.collection import Collection
+    import app.db.mongodb as mongodb
+
+    shared = mongomock.MongoClient()
+    mongodb.MongoClient = lambda *args, **kwargs: shared
+    mongodb.AsyncIOMotorClient = lambda *args, **kwargs: mongomock_motor.AsyncMongoMockClient(
+        mock_mongo_client=shared
+    )
+
+    original_command = mongomock.database.Database.command
+
+    def command(self, command, *args, **kwargs):
+        if command == "hello":
+            return {"isWritablePrimary": True, "ok": 1.0}
+        return original_command(self, command, *args, **kwargs)
+
+    mongomock.database.Database.command = command
+
+    class WritableTopology:
+        def has_writable_server(self):
+            return True
+
+    mongomock_motor.AsyncMongoMockClient.topology_description = property(lambda self: WritableTopology())
+
+    class RawCollection:
+        """Read-only view of a collection that returns RawBSONDocuments"""
+
+        def __init__(self, collection):
+            self._collection = collection
+
+        def __getattr__(self, name):
+            return getattr(self._collection, name)
+
+        def find(self, *args, **kwargs):
+            kwargs.pop("batch_size", None)
+            return (_raw(document) for document in self._collection.find(*args, **kwargs))
+
+        def find_one(self, *args, **kwargs):
+            return _raw(self._collection.find_one(*args, **kwargs))
+
+    original_with_options = Collection.with_options
+
+    def with_options(self, codec_options=None, **kwargs):
+        if codec_options is not None and codec_options.document_class is RawBSONDocument:
+            return RawCollection(self)
+        return original_with_options(self, codec_options=codec_options, **kwargs)
+
+    Collection.with_options = with_options
+
+    original_insert_many = Collection.insert_many
+
+    def insert_many(self, documents, *args, **kwargs):
+        documents = [
+            bson.decode(document.raw) if isinstance(document, RawBSONDocument) else document
+            for document in documents
+        ]
+        return original_insert_many(self, documents, *args, **kwargs)
+
+    Collection.insert_many = insert_many
+
+    original_find = Collection.find
+
+    def find(self, *args, **kwargs):
+        kwargs.pop("hint", None)
+        return original_find(self, *args, **kwargs)
+
+    Collection.find = find
+
+    original_aggregate = Collection.aggregate
+
+    def aggregate(self, pipeline, *args, **kwargs):
+        # The login pipeline: $match by email, $limit 1, $lookup of the
+        # organization by the admin's organization_id
+        lookup = next((stage["$lookup"] for stage in pipeline if "$lookup" in stage), None)
+        if lookup is None or "let" not in lookup:
+            return original_aggregate(self, pipeline, *args, **kwargs)
+        results = []
+        for document in self.find(pipeline[0]["$match"]).limit(1):
+            try:
+                org_id = bson.ObjectId(document["organization_id"])
+            except (bson.errors.InvalidId, TypeError, KeyError):
+                org_id = None
+            organization = self.database[lookup["from"]].find_one(
+                {"_id": org_id, "deleted_at": None}, {"_id": 1, "organization_name": 1}
+            )
+            document[lookup["as"]] = [organization] if organization else []
+            results.append(document)
+        return iter(results)
+
+    Collection.aggregate = aggregate
+
+    def async_with_options(self, codec_options=None, **kwargs):
+        if codec_options is not None and codec_options.document_class is RawBSONDocument:
+            raw = RawCollection(self._AsyncMongoMockCollection__collection)
+            outer = self
+
+            class AsyncRawCollection:
+                def __getattr__(self, name):
+                    return getattr(outer, name)
+
+                async def find_one(self, *args, **kwargs):
+                    return raw.find_one(*args, **kwargs)
+
+            return AsyncRawCollection()
+        return self
+
+    mongomock_motor.AsyncMongoMockCollection.with_options = async_with_options